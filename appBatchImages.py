@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/appBatchImages.py
+#
+#  Headless (no GUI) batch processing of image files. A pipeline of operations
+#  from myImageOps.py, i.e. the Edit menu operations in appImageViewer1.py,
+#  is applied to every image file in an input folder, and the results are
+#  written to an output folder as soon as each image is ready.
+#  The files are processed in parallel by a pool of worker processes.
+#  The pipeline is given as text, or in a pipeline file (text, '#' lines are comments).
+#  Arguments not given in the pipeline may be taken from the dialog presets (clsPresets.py)
+#  for an image source, i.e. the values tuned in appImageViewer are used.
+
+# Example on how to use file:
+# (py38) C:\..\py3> python appBatchImages.py capture out -p "gray -> edges(k=3, s=5) -> otsu"
+# (py38) C:\..\py3> python appBatchImages.py capture out -f edges.txt --pattern "*.bmp" --ext .png
+# (py38) C:\..\py3> python appBatchImages.py capture out -p "gray -> edges -> otsu" --presets dice --preset sharp
+# (py38) C:\..\py3> python appBatchImages.py --list   # list operations that can be used
+
+_appFileName = "appBatchImages"
+_version = "2024.10.18"
+
+import sys
+import os
+import glob
+import time
+import argparse
+from functools import partial
+from multiprocessing import Pool, cpu_count
+import cv2
+import myImageOps as ops
+from clsPresets import Presets
+
+def _initWorker():
+	"""Each worker process does one image at a time, let OpenCV use one thread only."""
+	cv2.setNumThreads(1)
+	return
+
+def processFile(fName, steps, outDir, ext=''):
+	"""Read image file 'fName', run the pipeline 'steps' on it and write the result in 'outDir'.
+	Returns (fName, message), message is '' when ok.
+	"""
+	A = cv2.imread(fName, cv2.IMREAD_ANYCOLOR)   # 2D for gray files, else BGR
+	if A is None:
+		return (fName, "could not read file")
+	try:
+		B = ops.runPipeline(A, steps)
+	except cv2.error as e:
+		return (fName, f"OpenCV error: {str(e).strip()}")
+	except ValueError as e:
+		return (fName, str(e))
+	(base, oldExt) = os.path.splitext(os.path.basename(fName))
+	outName = os.path.join(outDir, base + (ext if ext else oldExt))
+	if not cv2.imwrite(outName, B):
+		return (fName, f"could not write file {outName}")
+	return (fName, '')
+
+def runBatch(files, steps, outDir, ext='', workers=0, verbose=True):
+	"""Process all 'files' in a pool of 'workers' processes (0: one for each cpu).
+	Results are written (streamed) as each file is done, returns number of failed files.
+	"""
+	os.makedirs(outDir, exist_ok=True)
+	workers = workers if (workers > 0) else cpu_count()
+	chunk = max(1, min(16, len(files) // (8*workers)))
+	fun = partial(processFile, steps=steps, outDir=outDir, ext=ext)
+	nFailed = 0
+	t0 = time.perf_counter()
+	with Pool(processes=workers, initializer=_initWorker) as pool:
+		for (i, (fName, msg)) in enumerate(pool.imap_unordered(fun, files, chunksize=chunk)):
+			if msg:
+				nFailed += 1
+				print( f"{_appFileName}: {fName}: {msg}" )
+			elif verbose:
+				print( f"  {i+1:6d}/{len(files)}  {fName}" )
+	t = time.perf_counter() - t0
+	print( (f"{_appFileName}: {len(files)-nFailed} of {len(files)} files done in {t:.1f} s" +
+			f" ({len(files)/max(t,1e-6):.1f} files/s, {workers} workers)") )
+	return nFailed
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog=_appFileName,
+			description="Run a pipeline of image operations on all image files in a folder.")
+	parser.add_argument('inDir', nargs='?', help='folder with image files')
+	parser.add_argument('outDir', nargs='?', help='folder for results (made if needed)')
+	parser.add_argument('-p', '--pipeline', help='pipeline as text, ex. "gray -> edges(k=3, s=5) -> otsu"')
+	parser.add_argument('-f', '--pipelineFile', help='file with pipeline text')
+	parser.add_argument('--pattern', default='*.*', help='file name pattern in inDir, default "*.*"')
+	parser.add_argument('--ext', default='', help='extension (format) for results, ex. ".png", default as input')
+	parser.add_argument('--presets', default='', help='image source (or .json file) with presets for arguments not given')
+	parser.add_argument('--preset', default='last', help='name of preset to use, default "last" (as last used in dialogs)')
+	parser.add_argument('-w', '--workers', type=int, default=0, help='number of processes, default one per cpu')
+	parser.add_argument('-q', '--quiet', action='store_true', help='print only errors and summary')
+	parser.add_argument('--list', action='store_true', help='list the operations and their arguments')
+	args = parser.parse_args(argv)
+	#
+	if args.list:
+		for (name, (fun, argNames)) in ops.operations.items():
+			print( f"  {name}({', '.join(argNames)})" )
+		return 0
+	if (args.inDir is None) or (args.outDir is None):
+		parser.error("inDir and outDir are needed")
+	if args.pipelineFile:
+		with open(args.pipelineFile) as f:
+			text = f.read()
+	elif args.pipeline:
+		text = args.pipeline
+	else:
+		parser.error("give pipeline by -p or -f")
+	try:
+		steps = ops.parsePipeline(text)
+	except ValueError as e:
+		print( f"{_appFileName}: {e}" )
+		return 2
+	if args.presets:
+		if args.presets.endswith('.json'):
+			presets = Presets(source=os.path.splitext(os.path.basename(args.presets))[0], fName=args.presets)
+		else:
+			presets = Presets(source=args.presets)
+		steps = presets.fillSteps(steps, name=args.preset)
+	#
+	files = sorted(f for f in glob.glob(os.path.join(args.inDir, args.pattern)) if os.path.isfile(f))
+	if (len(files) == 0):
+		print( f"{_appFileName}: no files match {os.path.join(args.inDir, args.pattern)}" )
+		return 1
+	print( f"{_appFileName}: {ops.pipelineText(steps)}  on {len(files)} files, results to {args.outDir}" )
+	nFailed = runBatch(files, steps, args.outDir, ext=args.ext, workers=args.workers, verbose=not args.quiet)
+	return 1 if nFailed else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
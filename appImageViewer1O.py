@@ -8,7 +8,7 @@
 #  A simple program to display an image, it has some more options than appImageViewer
 #    File menu: Open File, Save File, Clear Image, Print Info, and (Close and) Quit
 #    Scale menu: Scale 1, Scale Up, and Scale down
-#    Edit menu: Crop, to Gray, to Edges, Filter image, to Binary, and undo Last
+#    Edit menu: Crop, to Gray, to Edges, Filter image, to Binary, Rotate and flip, undo Last, and Redo
 #  In the bottom it display the value for pixel that mouse points on (without clicking)
 #  It can also print information for many of the attributes used
 #  The simple image processing methods use OpenCV on images represented as numpy arrays,
@@ -29,6 +29,7 @@ _version = "2022.06.27"
 
 import sys
 import os.path
+import time
 import numpy as np
 import cv2
 
@@ -36,7 +37,7 @@ try:
 	from PyQt5.QtCore import Qt, QPoint, QRect, QSize, QT_VERSION_STR, pyqtSignal  
 	from PyQt5.QtGui import QImage, QPixmap, QTransform
 	from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QFileDialog, QLabel, 
-				QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QRubberBand)
+				QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QRubberBand, QInputDialog)
 except ImportError:
 	raise ImportError( f"{_appFileName}: Requires PyQt5." )
 #end try, import PyQt5 classes 
@@ -47,7 +48,12 @@ from clsFilterDialog import FilterDialog
 from clsThresholdDialog import ThresholdDialog
 from clsResizeDialog import ResizeDialog
 # some simple methods for image processing
-from myImageTools import smoothFilter, qimage2np, np2qimage
+from myImageTools import qimage2np, np2qimage
+import myImageOps as ops
+from clsImageHistory import ImageHistory
+from clsImageState import ImageState
+from clsPreviewEngine import PreviewEngine
+from clsPresets import Presets
 
 try:
 	from myTools import DBpath # my DropBox
@@ -126,7 +132,8 @@ class MyGraphicsView(QGraphicsView):
 				else: # QImage.Format_RGB32, or other
 					(r,g,b,a) = (col.red(), col.green(), col.blue(), col.alpha())
 					if (a == 255):
-						p.posInfo.setText( f"(x,y) = ({x},{y}):  (r,g,b) = ({r},{g},{b})" )
+						name = p.colorName(r, g, b)   # '' if no color names are used
+						p.posInfo.setText( f"(x,y) = ({x},{y}):  (r,g,b) = ({r},{g},{b})  {name}" )
 					else:
 						p.posInfo.setText( f"(x,y) = ({x},{y}):  (r,g,b,a) = ({r},{g},{b},{a})" )
 			else: 
@@ -176,11 +183,16 @@ class MainWindow(QMainWindow):
 		self.scaleUpFactor = np.sqrt(2.0)
 		#
 		self.pixmap = QPixmap()      # a null pixmap
-		self.prevPixmap = QPixmap()  # another (for previous pixmap)
+		self.history = ImageHistory(maxBytes=512*2**20)  # previous npImages, for undo and redo
 		self.image = QImage()        # a null image
 		self.isAllGray = False       # true when self.image.allGray(), function is slow for images without color table
 		self.npImage = np.array([])  # size == 0 
+		self.imState = ImageState()  # gray, hsv, histogram, .. of npImage, made when needed
 		self.cropActive = False
+		self.preview = PreviewEngine(parent=self)   # run try..() methods in a worker thread
+		self.preview.resultReady.connect(self.showPreview)
+		self.previewScales = (0.25, 0.5, 1.0)   # coarse to full preview pyramid
+		self.presets = Presets(source='default')   # dialog parameters, file presets/default.json
 		#
 		self.scene = QGraphicsScene()
 		self.curItem = None          # (a pointer to) pixmap on scene
@@ -222,6 +234,9 @@ class MainWindow(QMainWindow):
 		a = qaPrintInfo = QAction('print Info', self)
 		a.setShortcut('Ctrl+I')
 		a.triggered.connect(self.printInfo)
+		a = qaPresetSource = QAction('Preset source', self)
+		a.setToolTip('Select image source (camera, setup ..), each source has its own dialog presets.')
+		a.triggered.connect(self.setPresetSource)
 		a = qaQuitProgram = QAction('Quit', self)
 		a.setShortcut('Ctrl+Q')
 		a.setToolTip('Close and quit program')
@@ -261,9 +276,29 @@ class MainWindow(QMainWindow):
 		a.triggered.connect(self.toBinary)
 		a.setToolTip('Threshold image to make binary image.')
 		a.setShortcut('Ctrl+B')
+		a = self.qaRotate90 = QAction('Rotate 90 clockwise', self)
+		a.triggered.connect(lambda: self.rotateFlip('rot90'))
+		a.setShortcut('Ctrl+Shift+R')
+		a = self.qaRotate180 = QAction('Rotate 180', self)
+		a.triggered.connect(lambda: self.rotateFlip('rot180'))
+		a = self.qaRotate270 = QAction('Rotate 90 counter clockwise', self)
+		a.triggered.connect(lambda: self.rotateFlip('rot270'))
+		a = self.qaRotateAngle = QAction('Rotate angle', self)
+		a.triggered.connect(lambda: self.rotateFlip('angle'))
+		a.setToolTip('Rotate any angle (degrees clockwise), the image is made larger to keep all of it.')
+		a = self.qaFlipH = QAction('Flip left-right', self)
+		a.triggered.connect(lambda: self.rotateFlip('h'))
+		a = self.qaFlipV = QAction('Flip upside-down', self)
+		a.triggered.connect(lambda: self.rotateFlip('v'))
+		a = self.qaTranspose = QAction('Transpose', self)
+		a.triggered.connect(lambda: self.rotateFlip('transpose'))
+		a.setToolTip('Mirror image about the main diagonal.')
 		a = self.qaUndoLast = QAction('Undo last', self)
 		a.setShortcut('Ctrl+Z')
 		a.triggered.connect(self.undoLast)
+		a = self.qaRedoLast = QAction('Redo', self)
+		a.setShortcut('Ctrl+Shift+Z')
+		a.triggered.connect(self.redoLast)
 		#
 		a = self.qaArrayProperties = QAction('Array Properties', self)
 		a.triggered.connect(self.ArrayProperties)
@@ -293,6 +328,7 @@ class MainWindow(QMainWindow):
 		self.fileMenu.addAction(self.qaSaveFileDlg)
 		self.fileMenu.addAction(self.qaClearImage)
 		self.fileMenu.addAction(qaPrintInfo)
+		self.fileMenu.addAction(qaPresetSource)
 		self.fileMenu.addAction(qaQuitProgram)
 		self.fileMenu.setToolTipsVisible(True)
 		#
@@ -308,7 +344,13 @@ class MainWindow(QMainWindow):
 		editMenu.addAction(self.qaToEdges)
 		editMenu.addAction(self.qaFilter)
 		editMenu.addAction(self.qaToBinary)
+		self.rotateMenu = editMenu.addMenu('Rotate and flip')
+		for a in (self.qaRotate90, self.qaRotate180, self.qaRotate270, self.qaRotateAngle,
+				self.qaFlipH, self.qaFlipV, self.qaTranspose):
+			self.rotateMenu.addAction(a)
+		self.rotateMenu.setToolTipsVisible(True)
 		editMenu.addAction(self.qaUndoLast)
+		editMenu.addAction(self.qaRedoLast)
 		editMenu.setToolTipsVisible(True)
 		# custom
 		homeworkMenu = self.mainMenu.addMenu('&Homework')
@@ -338,7 +380,10 @@ class MainWindow(QMainWindow):
 		self.qaToEdges.setEnabled(pixmapOK and self.isAllGray)
 		self.qaFilter.setEnabled(pixmapOK and self.isAllGray)
 		self.qaToBinary.setEnabled(pixmapOK and self.isAllGray)
-		self.qaUndoLast.setEnabled(not self.prevPixmap.isNull())
+		self.rotateMenu.setEnabled(pixmapOK)
+		self.qaUndoLast.setEnabled(self.history.canUndo() or 
+				((self.curItem is None) and (self.npImage.size > 0)))
+		self.qaRedoLast.setEnabled(self.history.canRedo())
 		return
 	
 	def setIsAllGray(self, value=-1):
@@ -358,6 +403,11 @@ class MainWindow(QMainWindow):
 		#
 		self.setMenuItems()
 		return
+	
+	def colorName(self, r, g, b):
+		"""Name of color (r,g,b), shown when the mouse is over the image, '' here but
+		inherited classes may name colors (appImageViewer3.py)."""
+		return ''
 		
 	def pixmap2image2np(self):
 		"""Display 'self.pixmap' on scene and copy it to 'self.image' and to 'self.npImage'."""
@@ -370,9 +420,12 @@ class MainWindow(QMainWindow):
 		#
 		self.image = self.pixmap.toImage()
 		self.setIsAllGray()
-		self.npImage = qimage2np(self.image)
-		if self.isAllGray and (len(self.npImage.shape) == 3):   # gray and 3D ?
-			self.npImage = self.npImage[:,:,0]
+		A = qimage2np(self.image)   # read-only view of self.image memory
+		if self.isAllGray and (len(A.shape) == 3):   # gray and 3D ?
+			self.npImage = np.ascontiguousarray(A[:,:,0])
+		else:
+			self.npImage = A.copy()   # own copy, as npImage may be edited in place
+		self.imState.set(self.npImage)
 		#
 		self.status.setText( f"pixmap: (w,h) = ({w},{h})" )
 		self.scaleOne() 
@@ -398,11 +451,50 @@ class MainWindow(QMainWindow):
 		#
 		if numpyAlso:
 			self.npImage = B
+			self.imState.set(B)   # new image version, forget gray, hsv, histogram, ..
 		#
 		self.setIsAllGray()
 		return
 	#end function np2image2pixmap
 	
+	def imageState(self):
+		"""Return 'self.imState', the cached gray, bgr, hsv, float32 and histogram of 'self.npImage'.
+		If 'self.npImage' was set without np2image2pixmap(), the state is made for it now.
+		"""
+		if not self.imState.isFor(self.npImage):
+			self.imState.set(self.npImage)
+		return self.imState
+	
+	def showPreview(self, jobNo, B, seconds):
+		"""Slot for 'self.preview.resultReady', display image B made by a try..() method,
+		unless a newer preview has been asked for, or the dialog is closed.
+		"""
+		if self.preview.isCurrent(jobNo) and isinstance(B, np.ndarray):
+			self.np2image2pixmap(B, numpyAlso=False)   # note: self.npImage is not updated
+			self.status.setText( f"preview made in {1000*seconds:.0f} ms" )
+		return
+	
+	def makePreviewPyramid(self, name='image'):
+		"""Make the downscaled versions of 'self.npImage' used by progressive previews,
+		they are cached in 'self.imState', done when a dialog is opened.
+		"""
+		for scale in self.previewScales:
+			self.imageState().scaled(name, scale)
+		return
+	
+	def saveUndo(self, label=''):
+		"""Store (a copy of) 'self.npImage' in history, call this before an edit operation."""
+		self.history.push(self.npImage, label)
+		return
+	
+	def cancelUndo(self):
+		"""The edit operation was cancelled: forget last saveUndo() and show 'self.npImage' again,
+		the try..() methods may have changed the pixmap but not the numpy image.
+		"""
+		self.history.discard()
+		self.np2image2pixmap(self.npImage, numpyAlso=True)
+		return
+	
 # Methods for actions on the File-menu
 	def openFileDlg(self):
 		"""Use the Qt open file name dialog to select an image to open."""
@@ -461,7 +553,6 @@ class MainWindow(QMainWindow):
 	def removePixmapItem(self):
 		"""Removes the current pixmap from the scene if it exists."""
 		if self.curItem: 
-			self.prevPixmap = self.pixmap
 			self.scene.removeItem(self.curItem)
 			self.curItem = None
 		self.setWindowTitle(self.appFileName)
@@ -513,7 +604,7 @@ class MainWindow(QMainWindow):
 			print( f"  .hasAlpha()        = {str(self.pixmap.hasAlpha())}" ) 
 			print( f"  .isQBitmap()       = {str(self.pixmap.isQBitmap())}" )
 		#end if pixmap
-		print( f"self.prevPixmap    = {str(self.prevPixmap)}" )
+		print( f"self.history       = {str(self.history)}" )
 		print( f"self.image         = {str(self.image)}" )
 		if not self.image.isNull():
 			if (self.image.format() == 3):
@@ -539,6 +630,17 @@ class MainWindow(QMainWindow):
 					f"of {self.npImage.dtype.name}, shape {str(self.npImage.shape)}") )
 		return
 	
+	def setPresetSource(self):
+		"""Ask for the image source, and use the presets (file) for it in the dialogs."""
+		(source, ok) = QInputDialog.getText(self, "Preset source",
+				"Image source, presets are in presets/<source>.json:", text=self.presets.source)
+		source = source.strip()
+		if ok and source:
+			self.presets = Presets(source=source)
+			print( f"{self.appFileName}: {self.presets}" )
+			self.status.setText( f"Dialog presets for source '{source}'" )
+		return
+	
 	def quitProgram(self):
 		"""Quit program."""
 		print( "Close the main window and quit program." )
@@ -592,8 +694,8 @@ class MainWindow(QMainWindow):
 		if (w > 5) and (h > 5):
 			print( (f"cropImage(): Rectangle from (x,y)=({p2.x()},{p2.y()})" +
 					f" and (w,h)=({w},{h})") )
-			self.prevPixmap = self.pixmap
-			self.pixmap = self.prevPixmap.copy(p2.x(), p2.y(), w, h)
+			self.saveUndo('crop')
+			self.pixmap = self.pixmap.copy(p2.x(), p2.y(), w, h)
 			self.pixmap2image2np()
 			self.setWindowTitle( "{self.appFileName} : cropped image" )
 		else: 
@@ -601,68 +703,19 @@ class MainWindow(QMainWindow):
 			print( "cropImage(): Rubber band rectangle is small  --> Special case")
 			print( "  Cut out any frame of black rows and columns.")
 			print( f"  A = npImage is an array of {A.dtype.name}, shape {str(A.shape)}." )
-			# find what to crop,  
-			(left,right,top,bottom) = (0,0,0,0)
-			if (len(A.shape) == 3) and (A.shape[2] >= 3):  # color img
-				print("  This is a color image")
-				for column in range(0,A.shape[1]):
-					if ((A[:,column,0].max() > 0) or 
-						(A[:,column,1].max() > 0) or 
-						(A[:,column,2].max() > 0)): break
-					else: left += 1
-				for column in range(A.shape[1]-1,-1,-1):
-					if ((A[:,column,0].max() > 0) or 
-						(A[:,column,1].max() > 0) or 
-						(A[:,column,2].max() > 0)): break
-					else: right += 1
-				for row in range(0,A.shape[0]):
-					if ((A[row,:,0].max() > 0) or 
-						(A[row,:,1].max() > 0) or 
-						(A[row,:,2].max() > 0)): break
-					else: top += 1
-				for row in range(A.shape[0]-1,-1,-1):
-					if ((A[row,:,0].max() > 0) or 
-						(A[row,:,1].max() > 0) or 
-						(A[row,:,2].max() > 0)): break
-					else: bottom += 1
-				print( f"  end using   (left,right,top,bottom) = ({left},{right},{top},{bottom})" )
-			else:  # grayscale img
-				print( "  This is a gray scale image")
-				print( "  start using (left,right,top,bottom) = ({left},{right},{top},{bottom})" )
-				for column in range(0, A.shape[1]):
-					if (A[:,column].max() > 0): break
-					else: left += 1
-				for column in range(A.shape[1]-1,-1,-1):
-					if (A[:,column].max() > 0): break
-					else: right += 1
-				for row in range(0,A.shape[0]):
-					if (A[row,:].max() > 0): break
-					else: top += 1
-				for row in range(A.shape[0]-1,-1,-1):
-					if (A[row,:].max() > 0): break
-					else: bottom += 1
-				print( f"  end using   (left,right,top,bottom) = ({left},{right},{top},{bottom})" )
-			# 
-			w = A.shape[1] - left - right
-			h = A.shape[0] - top - bottom
-			if max((left,right,top,bottom)):
-				if (w <= 0) or (h <= 0):
-					print( ("cropImage(): Don't crop since (left,right,top,bottom)" +
-							f" = ({left},{right},{top},{bottom})") )
-				else:
-					print( ("cropImage(): Crop outside of rectangle from (x,y)" +
-							f"=({left},{top}) and (w,h)=({w},{h})") )
-					self.prevPixmap = self.pixmap 
-					if (len(A.shape) == 3) and (A.shape[2] >= 3):  # color img
-						print("cropImage(): Crop color")
-						B = A[top:top+w,left:left+w,:].copy() 
-						self.np2image2pixmap(B, numpyAlso=True)
-					else:
-						print("cropImage(): Crop gray")
-						B = A[top:top+w,left:left+w].copy()
-						self.np2image2pixmap(B, numpyAlso=True)
-					self.setWindowTitle( f"{self.appFileName} : Black frame cut from image" )
-					self.setIsAllGray()
+			# find what to crop, i.e. the bounding box of the not black pixels
+			box = ops.find_nonzero_bbox(A)
+			if (box is None):
+				print( "cropImage(): Don't crop since all pixels are black" )
+			elif (box != (0, 0, A.shape[1], A.shape[0])):
+				(left, top, w, h) = box
+				print( ("cropImage(): Crop outside of rectangle from (x,y)" +
+						f"=({left},{top}) and (w,h)=({w},{h})") )
+				self.saveUndo('cut black frame')
+				B = A[top:top+h,left:left+w].copy() 
+				self.np2image2pixmap(B, numpyAlso=True)
+				self.setWindowTitle( f"{self.appFileName} : Black frame cut from image" )
+				self.setIsAllGray()
 			else:
 				print( "cropImage(): No black rows or black columns to crop." )
 			#
@@ -676,19 +729,16 @@ class MainWindow(QMainWindow):
 		and copy (move) it back to current pixmap
 		"""
 		B = self.npImage
-		oldPixmap = self.prevPixmap
-		self.prevPixmap = self.pixmap
-		d = ResizeDialog(parent=self)   # create object (but does not run it)
+		d = ResizeDialog(parent=self, presets=self.presets)   # create object (but does not run it)
 		(newWidth, newHight) = d.getValues()   # display dialog and return values
 		if d.result():   # 1 if accepted (OK), 0 if rejected (Cancel)
-			B = cv2.resize(B, (newWidth, newHight), interpolation= cv2.INTER_LINEAR)
+			self.saveUndo('resize')
+			B = ops.resizeImage(B, newWidth, newHight)
 			self.np2image2pixmap(B, numpyAlso=True)
 			(w, h) = (self.pixmap.width(), self.pixmap.height())
 			self.scene.setSceneRect(0, 0, w, h)
 			self.status.setText( f"pixmap: (w,h) = ({w},{h})" )
 			self.setWindowTitle( f"{self.appFileName} : resized image" )
-		else:
-			self.prevPixmap = oldPixmap
 		# 
 		self.setMenuItems()
 		return
@@ -698,11 +748,8 @@ class MainWindow(QMainWindow):
 		and copy (move) it back to current pixmap
 		"""
 		if (len(self.npImage.shape) == 3) and (self.npImage.shape[2] >= 3):
-			self.prevPixmap = self.pixmap
-			if (self.npImage.shape[2] == 3):
-				B = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
-			if (self.npImage.shape[2] == 4):
-				B = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2GRAY)
+			self.saveUndo('to gray')
+			B = self.imageState().gray().copy()   # npImage should be writeable
 			self.np2image2pixmap(B, numpyAlso=True)
 			self.setWindowTitle( f"{self.appFileName} : gray scale image" )
 		else:
@@ -718,23 +765,15 @@ class MainWindow(QMainWindow):
 	def tryEdges(self, valK, valS):
 		"""This method may be started from the edge dialog 
 		to (quickly) show results of new edge filter values.
+		The work is done in the preview thread, and the result is shown by showPreview().
+		The preview is progressive: first made from the image downscaled to 1/4, and when
+		the values have not changed for a moment, from 1/2 and then the full image.
 		"""
-		B = self.npImage
-		# B = cv2.GaussianBlur(B, 11, 2.5)  # sizeK and sigma ??
-		# Eh = cv2.Sobel(B, ddepth=cv2.CV_16S, dx=0, dy=1, ksize=valK)
-		# Ev = cv2.Sobel(B, ddepth=cv2.CV_16S, dx=1, dy=0, ksize=valK)
-		# Eh = Eh.astype(np.float32)
-		# Ev = Ev.astype(np.float32) 
-		Eh = cv2.Sobel(B, ddepth=cv2.CV_32F, dx=0, dy=1, ksize=valK)
-		Ev = cv2.Sobel(B, ddepth=cv2.CV_32F, dx=1, dy=0, ksize=valK)
-		# print( f"tryEdges: Eh is an array of {Eh.dtype.name}, shape {str(Eh.shape)}" )
-		B = np.sqrt( 1 + np.power(Eh,2) + np.power(Ev,2) )
-		# B = cv2.Sobel(B, ddepth=cv2.CV_16S, dx=1, dy=1, ksize=valK)  # hmmm
-		if (valS > 1):
-			a = smoothFilter(len=valS)
-			B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
-		B = np.floor(B * (255/np.max(B))).astype(np.uint8)
-		self.np2image2pixmap(B, numpyAlso=False)   # note: self.npImage is not updated
+		shape = self.npImage.shape
+		def makeJob(scale):
+			A = self.imageState().scaled('image', scale)
+			return (ops.atScale, (ops.toEdges, A, shape), dict(k=valK, s=ops.scaledOddSize(valS, scale)))
+		self.preview.submitProgressive(makeJob, self.previewScales)
 		return
 	#end function tryEdges()
 		
@@ -745,26 +784,17 @@ class MainWindow(QMainWindow):
 		Result is put into 'self.image' and 'self.pixmap'
 		"""
 		B = self.npImage
-		oldPixmap = self.prevPixmap
-		self.prevPixmap = self.pixmap
-		d = EdgeDialog(parent=self)   # create object (but does not run it)
+		self.saveUndo('to edges')
+		self.makePreviewPyramid('image')
+		d = EdgeDialog(parent=self, presets=self.presets)   # create object (but does not run it)
 		(valK,valS) = d.getValues()   # display dialog and return values
+		self.preview.cancel()   # previews not shown yet are not wanted now
 		if d.result():   # 1 if accepted (OK), 0 if rejected (Cancel)
-			Eh = cv2.Sobel(B, ddepth=cv2.CV_32F, dx=0, dy=1, ksize=valK)
-			Ev = cv2.Sobel(B, ddepth=cv2.CV_32F, dx=1, dy=0, ksize=valK)
-			B = np.sqrt( 1 + np.power(Eh,2) + np.power(Ev,2) )
-			if (valS > 1):
-				a = smoothFilter(len=valS)
-				B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
-			# print( f"toEdges: B is an array of {B.dtype.name}, shape {str(B.shape)}" )
-			# print( f"         min(B) {np.min(B):8.2f},  max(B) {np.max(B):8.2f}" )
-			B = np.floor(B * (255/np.max(B))).astype(np.uint8)
+			B = ops.toEdges(B, k=valK, s=valS)
 			self.np2image2pixmap(B, numpyAlso=True)
 			self.setWindowTitle( "{self.appFileName} : edge image" )
 		else:
-			self.pixmap = self.prevPixmap   # restore 
-			self.pixmap2image2np()
-			self.prevPixmap = oldPixmap
+			self.cancelUndo()
 		#
 		self.setMenuItems()
 		return
@@ -774,17 +804,9 @@ class MainWindow(QMainWindow):
 	def tryFilter(self, h, valS):
 		"""This method may be started from the filter dialog 
 		to (quickly) show results of new filter values.
+		The work is done in the preview thread, and the result is shown by showPreview().
 		"""
-		if (len(h) > 1):
-			B = cv2.filter2D(self.npImage, ddepth=cv2.CV_16S, kernel=h).astype(np.float32) 
-		else:
-			B = self.npImage.astype(np.float32)
-		if (valS > 1):
-			a = smoothFilter(len=valS)
-			B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
-		B = B - np.min(B)
-		B = np.floor(B * (255/np.max(B))).astype(np.uint8)
-		self.np2image2pixmap(B, numpyAlso=False)   # note: self.npImage is not updated
+		self.preview.submit(ops.filterImage, self.npImage, h, s=valS)
 		return
 	#end function tryFilter()
 		
@@ -795,26 +817,16 @@ class MainWindow(QMainWindow):
 		Result is put into 'self.image' and 'self.pixmap'
 		"""
 		B = self.npImage
-		oldPixmap = self.prevPixmap
-		self.prevPixmap = self.pixmap   
-		d = FilterDialog(parent=self)   # create object (but does not run it)
+		self.saveUndo('filter')
+		d = FilterDialog(parent=self, presets=self.presets)   # create object (but does not run it)
 		(h,valS) = d.getValues()   # display dialog and return values
+		self.preview.cancel()
 		if d.result():   # 1 if accepted (OK), 0 if rejected (Cancel)
-			if (len(h) > 1):
-				B = cv2.filter2D(B, ddepth=cv2.CV_16S, kernel=h).astype(np.float32)
-			else:
-				B = self.npImage.astype(np.float32)
-			if (valS > 1):
-				a = smoothFilter(len=valS)
-				B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
-			B = B - np.min(B)
-			B = np.floor(B * (255/np.max(B))).astype(np.uint8)
+			B = ops.filterImage(B, h, s=valS)
 			self.np2image2pixmap(B, numpyAlso=True)
 			self.setWindowTitle( f"{self.appFileName} : filtered image" ) 
 		else:
-			self.pixmap = self.prevPixmap   # restore 
-			self.pixmap2image2np()
-			self.prevPixmap = oldPixmap
+			self.cancelUndo()
 		#
 		self.setMenuItems()
 		return
@@ -824,15 +836,14 @@ class MainWindow(QMainWindow):
 	def tryBinary(self, t=0):
 		"""This method may be started from the threshold dialog 
 		to (quickly) show results of threshold 't'.
+		The work is done in the preview thread, and the result is shown by showPreview().
 		"""
-		B = self.npImage
-		if (t < 2):
-			(used_thr,B) = cv2.threshold(B, thresh=1, maxval=255, type=cv2.THRESH_OTSU)
-			print( f"tryBinary: The used Otsu threshold value is {used_thr}" ) 
-		else:
-			(used_thr,B) = cv2.threshold(B, thresh=t, maxval=255, type=cv2.THRESH_BINARY)
-		#
-		self.np2image2pixmap(B, numpyAlso=False)   # note: self.npImage is not updated
+		def binary(A, t):
+			(used_thr,B) = ops.toBinary(A, t)
+			if (t < 2):
+				print( f"tryBinary: The used Otsu threshold value is {used_thr}" ) 
+			return B
+		self.preview.submit(binary, self.npImage, t)
 		return
 	#end function tryBinary()
 	
@@ -843,41 +854,85 @@ class MainWindow(QMainWindow):
 		and result is put into 'self.image' and 'self.pixmap'
 		"""
 		B = self.npImage
-		oldPixmap = self.prevPixmap
-		self.prevPixmap = self.pixmap   
-		d = ThresholdDialog(parent=self)   # create object (but does not run it)
+		self.saveUndo('to binary')
+		d = ThresholdDialog(parent=self, presets=self.presets)   # create object (but does not run it)
 		t = d.getValues()   # display dialog and return values
+		self.preview.cancel()
 		if d.result():   # 1 if accepted (OK), 0 if rejected (Cancel)
-			if (t < 2):
-				(used_thr,B) = cv2.threshold(B, thresh=1, maxval=255, type=cv2.THRESH_OTSU)
-			else:
-				(used_thr,B) = cv2.threshold(B, thresh=t, maxval=255, type=cv2.THRESH_BINARY)
-			#
+			(used_thr,B) = ops.toBinary(B, t)
 			print( f"toBinary: The used threshold value is {used_thr}" )
 			self.np2image2pixmap(B, numpyAlso=True)
 			self.setWindowTitle( f"{self.appFileName} : binary image" )
 		else:
-			self.pixmap = self.prevPixmap   # restore 
-			self.pixmap2image2np()
-			self.prevPixmap = oldPixmap
+			self.cancelUndo()
 		#
 		self.setMenuItems()
 		return
 	#end function toBinary()
 		
+	def rotateFlip(self, kind='rot90'):
+		"""Rotate or flip the current numpy image, 'kind' is one of: 'rot90', 'rot180', 'rot270'
+		(clockwise), 'angle' (ask for angle), 'h' or 'v' (flip), or 'transpose'.
+		The functions in myImageOps.py return views, here they are copied (once) into a 
+		contiguous array that is used both as 'self.npImage' and as buffer for 'self.image'.
+		"""
+		A = self.npImage
+		if (kind in ('rot90', 'rot180', 'rot270')):
+			B = ops.rotate90(A, {'rot90': 1, 'rot180': 2, 'rot270': 3}[kind])
+		elif (kind == 'angle'):
+			(angle, ok) = QInputDialog.getDouble(self, "Rotate image", 
+					"Angle in degrees (clockwise)", value=0.0, min=-360.0, max=360.0, decimals=2)
+			if not ok: 
+				return
+			B = ops.rotateImage(A, angle, expand=True)
+		elif (kind in ('h', 'v')):
+			B = ops.flipImage(A, kind)
+		elif (kind == 'transpose'):
+			B = ops.transposeImage(A)
+		else:
+			print( f"rotateFlip: unknown kind '{kind}'" )
+			return
+		self.saveUndo(kind)
+		self.np2image2pixmap(np.ascontiguousarray(B), numpyAlso=True)
+		(w, h) = (self.pixmap.width(), self.pixmap.height())
+		self.status.setText( f"pixmap: (w,h) = ({w},{h})" )
+		self.setWindowTitle( f"{self.appFileName} : rotated or flipped image ({kind})" )
+		self.setMenuItems()
+		return
+	#end function rotateFlip
+	
 	def undoLast(self):
-		"""Undo last (edit) operation."""
-		(w, h) = (self.prevPixmap.width(), self.prevPixmap.height())
-		if (w > 0) and (h > 0):
-			# (self.pixmap, self.prevPixmap) = (self.prevPixmap, self.pixmap)  # swap
-			self.pixmap.swap(self.prevPixmap)   # better swap, see: https://doc.qt.io/qt-5/qpixmap.html#swap
-			self.pixmap2image2np()
+		"""Undo last (edit) operation, the numpy image is taken from 'self.history'
+		and displayed, i.e. it is not derived from the pixmap again.
+		If the image was cleared (File menu) it is just displayed again.
+		"""
+		if (self.curItem is None) and (self.npImage.size > 0):   # image was cleared
+			self.np2image2pixmap(self.npImage, numpyAlso=True)
 			self.setWindowTitle( f"{self.appFileName} : previous image" )
+		elif self.history.canUndo():
+			label = self.history.undoLabel()
+			B = self.history.undo(self.npImage)
+			self.np2image2pixmap(B, numpyAlso=True)
+			self.setWindowTitle( f"{self.appFileName} : previous image (undo {label})" )
+			self.status.setText( f"pixmap: (w,h) = ({B.shape[1]},{B.shape[0]})" )
 		# 
 		self.setMenuItems()
 		return
 	#end function undoLast
 	
+	def redoLast(self):
+		"""Redo the last undone (edit) operation."""
+		if self.history.canRedo():
+			label = self.history.redoLabel()
+			B = self.history.redo(self.npImage)
+			self.np2image2pixmap(B, numpyAlso=True)
+			self.setWindowTitle( f"{self.appFileName} : redo {label}" )
+			self.status.setText( f"pixmap: (w,h) = ({B.shape[1]},{B.shape[0]})" )
+		# 
+		self.setMenuItems()
+		return
+	#end function redoLast
+	
 # Finally, some methods used as slots for common actions
 	def resizeEvent(self, arg1):
 		"""Make the size of the view follow any changes in the size of the main window.
@@ -912,14 +967,14 @@ class MainWindow(QMainWindow):
 		cv2.destroyAllWindows()
 	
 	def ConvertToGray(self):
-		gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
+		gray_image = self.imageState().gray()
 		cv2.imshow('Image Window', gray_image)
 		cv2.waitKey(10000)
 		cv2.destroyAllWindows()
   
 	def histogramGray(self):
-		gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
-		hist = cv2.calcHist([gray_image], [0], None, [256], [0, 256])
+		import matplotlib.pyplot as plt   # only needed here
+		hist = self.imageState().histogram()   # for gray, or color made gray
 		hist = hist / hist.sum()
 		plt.figure(figsize=(10, 6))
 		plt.title("Histogram of the image in gray scale")
@@ -935,12 +990,7 @@ class MainWindow(QMainWindow):
 		if self.npImage is None or not isinstance(self.npImage, np.ndarray):
 			print("No valid image loaded.")
 			return
-		if len(self.npImage.shape) == 3 and self.npImage.shape[2] == 3:
-			gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
-		elif len(self.npImage.shape) == 3 and self.npImage.shape[2] == 4:
-			gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2GRAY)
-		else:
-			gray_image = self.npImage  
+		gray_image = self.imageState().gray()
 		sobel_x = cv2.Sobel(gray_image, cv2.CV_64F, 1, 0, ksize=3)
 		sobel_y = cv2.Sobel(gray_image, cv2.CV_64F, 0, 1, ksize=3)
 		sobel_magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
@@ -950,47 +1000,28 @@ class MainWindow(QMainWindow):
 		print("Edges emphasized using the Sobel filter.")
 		self.setMenuItems()
 
-	def detectCornersHarris(self):
-		try:
-			if self.npImage is None or not isinstance(self.npImage, np.ndarray):
-				print("No valid image loaded.")
-				return
-			max_dim = 1000
-			if max(self.npImage.shape[:2]) > max_dim:
-				scale_factor = max_dim / max(self.npImage.shape[:2])
-				self.npImage = cv2.resize(self.npImage, (0, 0), fx=scale_factor, fy=scale_factor)
-				print(f"Image resized to {self.npImage.shape[1]}x{self.npImage.shape[0]} for performance reasons.")
-			if len(self.npImage.shape) == 3 and self.npImage.shape[2] == 3:
-				gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
-			elif len(self.npImage.shape) == 3 and self.npImage.shape[2] == 4:
-				gray_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2GRAY)
-			else:
-				gray_image = self.npImage  
-			gray_image = np.float32(gray_image)
-			harris_response = cv2.cornerHarris(gray_image, blockSize=2, ksize=3, k=0.04)
-			harris_response = cv2.dilate(harris_response, None)
-			if len(self.npImage.shape) == 2:  
-				self.npImage = cv2.cvtColor(self.npImage, cv2.COLOR_GRAY2BGR)
-			threshold_value = 0.01 * harris_response.max()
-			corner_count = 0
-			for y in range(harris_response.shape[0]):
-				for x in range(harris_response.shape[1]):
-					if harris_response[y, x] > threshold_value:
-						if corner_count < 1000:  
-							x_int, y_int = int(x), int(y)
-							try:
-								cv2.circle(self.npImage, (x_int, y_int), 5, (0, 0, 255), 1)  
-								corner_count += 1
-							except Exception as e:
-								print(f"Error drawing circle at ({x_int}, {y_int}): {e}")
-						else:
-							break
-			self.np2image2pixmap(self.npImage, numpyAlso=False)
-			self.setWindowTitle(f"{self.appFileName} : Harris Corner Detection")
-			print(f"Corners detected using Harris Corner Detection: {corner_count} corners displayed.")
-			self.setMenuItems()
-		except Exception as e:
-			print(f"An error occurred during Harris corner detection: {e}")
+	def detectCornersHarris(self, maxCorners=1000):
+		"""Mark the (at most maxCorners) strongest Harris corners with red circles.
+		The corners are local maxima of the Harris response, found by myImageOps.findCornersHarris().
+		Only the displayed pixmap is changed, 'self.npImage' is not.
+		"""
+		if (not isinstance(self.npImage, np.ndarray)) or (self.npImage.size == 0):
+			print("No valid image loaded.")
+			return
+		t0 = time.perf_counter()
+		(xy, R) = ops.findCornersHarris(self.imageState().grayFloat32(), maxCorners=maxCorners)
+		t1 = time.perf_counter()
+		B = self.imageState().bgr().copy()
+		ops.drawCircles(B, xy, 5, (0, 0, 255), 1)
+		t2 = time.perf_counter()
+		self.np2image2pixmap(B, numpyAlso=False)   # note: self.npImage is not updated
+		self.setWindowTitle(f"{self.appFileName} : Harris Corner Detection")
+		self.status.setText( (f"Harris: {len(xy)} corners, found in {1000*(t1-t0):.1f} ms," + 
+				f" drawn in {1000*(t2-t1):.1f} ms") )
+		print(f"Corners detected using Harris Corner Detection: {len(xy)} corners displayed.")
+		self.setMenuItems()
+		return
+	#end function detectCornersHarris
    
 	def swapRandB(self):
 		if (len(self.npImage.shape) == 3) and (self.npImage.shape[2] >= 3):
@@ -1006,8 +1037,7 @@ class MainWindow(QMainWindow):
 		return
 
 	def drawlines(self):
-		img = self.npImage
-		gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+		gray = self.imageState().gray()
 		edges = cv2.Canny(gray, 50, 150, apertureSize=3)
 		lines = cv2.HoughLines(edges, 1, np.pi/180, 200)
 		
@@ -1030,14 +1060,12 @@ class MainWindow(QMainWindow):
 		self.np2image2pixmap(img_bgr, numpyAlso=False)
 		self.setWindowTitle(f"{self.appFileName}: Draw Lines")
 
-	def rotate_90_clockwise(matrix):
-		return [list(reversed(col)) for col in zip(*matrix)]
+	def rotate_90_clockwise(self, A):
+		return ops.rotate90(A, 1)
 
 	def rotate_image(self):
-		rotated_image = self.rotate_90_clockwise(self.npImage)
-		self.np2image2pixmap(rotated_image, numpyAlso=True)
-		self.setWindowTitle(f"{self.appFileName} : Rotated Image")
-		self.setMenuItems()
+		self.rotateFlip('rot90')
+		return
 
 		
 #end class MainWindow
@@ -82,6 +82,7 @@ except ImportError:
 from datetime import datetime
 from appImageViewer1O import myPath, MainWindow as inheritedMainWindow 
 from myImageTools import np2qimage
+import myImageOps as ops
 
 # from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QLabel, QVBoxLayout
 # from PyQt5.QtGui import QImage, QPixmap
@@ -150,6 +151,8 @@ class MainWindow(inheritedMainWindow):
 		# 
 		self.cam = None
 		self.camOn = False
+		self.neyes = 0    # number of eyes found by findCircles() or blackDots()
+		self.dots = {}    # the dots found by blackDots(), see myImageOps.findDots()
   
 		# Initialize variables for image sequence and folder
 		self.image_sequence = []
@@ -345,15 +348,14 @@ class MainWindow(inheritedMainWindow):
 		
 	def copy_image(self, image_data):
 		"""Copy an image from camera memory to numpy image array 'self.npImage'."""
-		tempBilde = image_data.as_1d_image()
-		if np.min(tempBilde) != np.max(tempBilde):
-			self.npImage = np.copy(tempBilde[:,:,[0,1,2]])  # or [2,1,0] ??  RGB or BGR?
-			print( ("copy_image(): 'self.npImage' is an ndarray" + 
-					f" of {self.npImage.dtype.name}, shape {str(self.npImage.shape)}.") )
-		else: 
-			self.npImage = np.array([])  # size == 0
-		#end if 
-		image_data.unlock()  # important action
+		with image_data:  # important action, the image memory is unlocked at the end
+			if not image_data.is_blank():  # sampled, not np.min() and np.max() of all pixels
+				self.npImage = image_data.as_1d_image()[:,:,:3].copy()  # the only copy; or [2,1,0] ??  RGB or BGR?
+				print( ("copy_image(): 'self.npImage' is an ndarray" + 
+						f" of {self.npImage.dtype.name}, shape {str(self.npImage.shape)}.") )
+			else: 
+				self.npImage = np.array([])  # size == 0
+			#end if 
 		return 
 		
 # Methods for actions on the Camera-menu 
@@ -440,7 +442,7 @@ class MainWindow(inheritedMainWindow):
 		"""Find focus"""
    
 		#Convert image in grey scale
-		gray = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
+		gray = self.imageState().gray()
 		
 		#Variance on Laplacian filter
 		laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
@@ -450,7 +452,7 @@ class MainWindow(inheritedMainWindow):
 		
 		for i in range(25):
 			self.getOneImage()
-			gray = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
+			gray = self.imageState().gray()   # npImage is a new image
 			laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
 			print(f"variance of the Laplacian filter: {laplacian_var}")
 			print("-------------- Round "+str(i+1)+"--------------")
@@ -476,7 +478,7 @@ class MainWindow(inheritedMainWindow):
 		retVal = ueye.is_WaitForNextImage(self.cam.handle(), 1000, imBuf.mem_ptr, imBuf.mem_id)
 		if retVal == ueye.IS_SUCCESS:
 			print( f"  ueye.IS_SUCCESS: image buffer id = {imBuf.mem_id}" )
-			self.copy_image( ImageData(self.cam.handle(), imBuf) )  
+			self.copy_image( ImageData(self.cam.handle(), imBuf, copy=False) )  # a view, copied once in copy_image()
 			if (self.npImage.size > 0): 
 				self.image = np2qimage(self.npImage)
 				if (not self.image.isNull()):
@@ -513,7 +515,7 @@ class MainWindow(inheritedMainWindow):
 			retVal = ueye.is_WaitForNextImage(self.cam.handle(), 1000, imBuf.mem_ptr, imBuf.mem_id)
 			if retVal == ueye.IS_SUCCESS:
 				print( f"  ueye.IS_SUCCESS: image buffer id = {imBuf.mem_id}" )
-				self.copy_image( ImageData(self.cam.handle(), imBuf) ) 
+				self.copy_image( ImageData(self.cam.handle(), imBuf, copy=False) ) 
 				if (self.npImage.size > 0):  
 					self.image = np2qimage(self.npImage)
 					if (not self.image.isNull()):
@@ -607,49 +609,18 @@ class MainWindow(inheritedMainWindow):
 		return
   
 	def blackDots(self):
-		grayscale_image = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY)
-		self.prevPixmap = self.pixmap   
-		#d = ThresholdDialog(parent=B)   # create object (but does not run it)
-		#t = 60  # display dialog and return values
-		(used_thr,grayscale_image) = cv2.threshold(grayscale_image, thresh=60, maxval=255, type=cv2.THRESH_BINARY)
-  
-		# Applica una soglia per ottenere un'immagine binaria
-		_, binary_image = cv2.threshold(grayscale_image, thresh=60, maxval=255, type=cv2.THRESH_BINARY_INV)
-
-		# Definisci un kernel (matrice) per le operazioni morfologiche
-		kernel = np.ones((3, 3), np.uint8)
-
-		# Applica l'operazione di apertura per rimuovere il rumore (erosione seguita da dilatazione)
-		opened_image = cv2.morphologyEx(binary_image, cv2.MORPH_OPEN, kernel)
-
-		# Trova i contorni nell'immagine binaria
-		contours, _ = cv2.findContours(opened_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-		# Crea un'immagine vuota per disegnare solo i cerchi trovati
-		output_image = np.zeros_like(grayscale_image)
-
-		# Filtro i contorni per mantenere solo i cerchi
-		for contour in contours:
-			# Calcola l'area del contorno
-			area = cv2.contourArea(contour)
-			
-			# Ignora i contorni troppo piccoli o troppo grandi
-			if area < 50 or area > 10000:
-				continue
-			
-			# Approssima il contorno a un cerchio e calcola la rotondità
-			perimeter = cv2.arcLength(contour, True)
-			circularity = 4 * np.pi * (area / (perimeter ** 2))
-			
-			# Se la rotondità è prossima a 1, è probabile che sia un cerchio
-			if 0.7 < circularity < 1.2:
-				cv2.drawContours(output_image, [contour], -1, 255, thickness=cv2.FILLED)
-	
-		inverted_image = cv2.bitwise_not(output_image)
-		self.npImage = inverted_image
-  
-		print( f"toBinary: The used threshold value is {used_thr}" )
-		self.np2image2pixmap(inverted_image, numpyAlso=True)
+		"""Find round black dots (dice eyes), the image is made binary with only the dots black.
+		The dots are in 'self.dots', a dict of arrays (area, x, y, circularity, ..), see
+		myImageOps.findDots(), and 'self.neyes' is the number of dots.
+		"""
+		t = 60   # threshold, darker pixels may be dots
+		(self.dots, L) = ops.findDots(self.imageState().gray(), t=t, area=(50, 10000), circularity=(0.7, 1.2))
+		self.neyes = len(self.dots['area'])
+		print( f"blackDots: threshold {t}, found {self.neyes} dots of {L.max()} dark blobs" )
+		for (x, y, a, c) in zip(self.dots['x'], self.dots['y'], self.dots['area'], self.dots['circularity']):
+			print( f"  dot at ({x:6.1f},{y:6.1f}), area {a:5d}, circularity {c:4.2f}" )
+		self.saveUndo('black dots')
+		self.np2image2pixmap(ops.dotsImage(self.dots, L), numpyAlso=True)
 		self.setWindowTitle( f"{self.appFileName} : binary image with only circle" )
 		return
 
@@ -658,16 +629,16 @@ class MainWindow(inheritedMainWindow):
 		if (self.A.size == 0):
 			if (len(self.npImage.shape) == 3):
 				if (self.npImage.shape[2] == 3):
-					self.A = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY )
+					self.A = self.imageState().gray()   # cached, read-only
 					self.B = self.npImage.copy()
 				elif (self.npImage.shape[2] == 4):
-					self.A = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2GRAY )
+					self.A = self.imageState().gray()   # cached, read-only
 					self.B = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2BGR )   
 				else:
 					print("prepareHoughCircles(): numpy 3D image is not as expected. --> return")
 					return
 			elif (len(self.npImage.shape) == 2):
-				self.A = self.npImage.copy()
+				self.A = self.imageState().gray()   # cached, read-only
 				self.B = cv2.cvtColor(self.npImage, cv2.COLOR_GRAY2BGR )   
 			else:
 				print("prepareHoughCircles(): numpy image is not as expected. --> return")
@@ -686,31 +657,25 @@ class MainWindow(inheritedMainWindow):
 		return
 		
 	def tryHoughCircles(self, t):
-		"""Simply display results for the parameters given in tuple 't', without committing."""
+		"""Simply display results for the parameters given in tuple 't', without committing.
+		The work is done in the preview thread, and the result is shown by showPreview().
+		"""
 		(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = t
 		print("tryHoughCircles(): now called using:")
 		print(f"t = (dp={dp}, minDist={minDist}, param1={param1}, param2={param2}, minRadius={minRadius}, maxRadius={maxRadius})")
-
-		self.prepareHoughCirclesA()  
-		C = cv2.HoughCircles(self.A, cv2.HOUGH_GRADIENT, dp=dp, minDist=minDist,
-					param1=param1, param2=param2, minRadius=minRadius, maxRadius=maxRadius)
-
-		self.prepareHoughCirclesB()  
-		if C is not None:
-			C = np.int16(np.around(C))
-			print(f"  'C'  is ndarray of {C.dtype.name}, shape: {str(C.shape)}")
-			print(f"  Found {C.shape[1]} circles with radius from {C[0,:,2].min()} to {C[0,:,2].max()}")
-			for i in range(min(maxCircles, C.shape[1])):
-				(x,y,r) = ( C[0,i,0], C[0,i,1], C[0,i,2] ) 
-				cv2.circle(self.B, (x,y), r, (255, 0, 255), 2) 
-				print(f"  circle {i} has center in ({x},{y}) and radius {r}")
-		self.np2image2pixmap(self.B, numpyAlso=False)   
+		#
+		self.prepareHoughCirclesA()  # check self.A
+		# progressive, coarse circles first, parameters and circles are scaled in houghCirclesImage()
+		B = self.imageState().bgr()
+		def makeJob(scale):
+			G = self.imageState().scaled('gray', scale) if (self.A is self.imageState().gray()) else self.A
+			return (ops.houghCirclesImage, (G, B, t), dict(scale=G.shape[0]/B.shape[0]))
+		self.preview.submitProgressive(makeJob, self.previewScales)
 		return
 	
 	def findCircles(self):
 		"""Find circles in active image using HoughCircles(..)."""
-		oldPixmap = self.prevPixmap  
-		self.prevPixmap = self.pixmap
+		self.saveUndo('find circles')
 		self.A = np.array([])  
 		self.prepareHoughCirclesA()  
 
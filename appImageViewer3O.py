@@ -26,7 +26,6 @@ import os.path
 #from math import hypot, pi, atan2, cos, sin    # sqrt, cos, sin, tan, log, ceil, floor 
 import numpy as np
 import cv2
-import pandas as pd
 import tkinter as tk
 
 try:
@@ -40,6 +39,11 @@ except ImportError:
 from appImageViewer2O import myPath, MainWindow as inheritedMainWindow 
 from clsHoughCirclesDialog import HoughCirclesDialog
 from clsSaturationDialog_O import SaturationDialog
+import myImageOps as ops
+import myColors
+import myDice
+from clsColorLUT import diceColorRule, diceClasses
+from clsColorNames import ColorNames
 from pyueye import ueye
 # import tkinter as tk
 
@@ -66,6 +70,7 @@ class MainWindow(inheritedMainWindow):
 		self.view.rubberBandRectGiven.connect(self.meanColorEnd)  
 		# signal is already connected to cropEnd (appImageViewer1), now connected to two slots!
 		self.meanColorActive = False  
+		self.colorNames = ColorNames.load('../colors.csv')   # read once
 		#
 		self.initMenu3()
 		self.setMenuItems3()
@@ -112,12 +117,12 @@ class MainWindow(inheritedMainWindow):
 		a = self.qaFindCircles = QAction( "Find circles", self)
 		a.triggered.connect(self.findCircles)
 		a.setToolTip("Find circles using cv2.HoughCircles(..)")
-		#a = self.qaFindDices = QAction( "Find dices", self)
-		#a.triggered.connect(self.findDices)
-		a.setToolTip("Find dices (TODO)")
+		a = self.qaFindDices = QAction( "Find dices", self)
+		a.triggered.connect(self.findDices)
+		a.setToolTip("Find dices, their color and position (myDice.py)")
 		a = self.qaFindEyes = QAction( "Find dice eyes", self)
 		a.triggered.connect(self.findEyes)
-		a.setToolTip("Find eyes for each dice (TODO)")
+		a.setToolTip("Find eyes for each dice (myDice.py)")
 		#
 		# a = self.qaChangeOption = QAction( "Change camera option", self)
 		# a.triggered.connect(self.apply_saturation)
@@ -147,7 +152,7 @@ class MainWindow(inheritedMainWindow):
 		# 
 		diceMenu = self.mainMenu.addMenu("Dice")
 		diceMenu.addAction(self.qaFindCircles)
-		#diceMenu.addAction(self.qaFindDices)
+		diceMenu.addAction(self.qaFindDices)
 		diceMenu.addAction(self.qaFindEyes)
 		diceMenu.setToolTipsVisible(True)
 		# diceMenu.addAction(self.qacolorcorrect)
@@ -172,7 +177,7 @@ class MainWindow(inheritedMainWindow):
 		self.qaBestDistColorRGB.setEnabled(pixmapOK)
 		self.qaAttractColorRGB.setEnabled(pixmapOK)
 		self.qaFindCircles.setEnabled(pixmapOK)   # and self.isAllGray ?
-		#self.qaFindDices.setEnabled(pixmapOK)   
+		self.qaFindDices.setEnabled(pixmapOK)   
 		self.qaFindEyes.setEnabled(pixmapOK)   
 		return
 		
@@ -190,7 +195,7 @@ class MainWindow(inheritedMainWindow):
 		Have no 'undo' here as doing the operation once more undo these changes, 
 		thus 'undo' will undo previous operation as before.
 		"""
-		# self.prevPixmap = self.pixmap   # to include 'undo', which is not needed here
+		# self.saveUndo('swap')   # to include 'undo', which is not needed here
 		if (len(self.npImage.shape) == 3) and (self.npImage.shape[2] >= 3):
 			B = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2RGBA)
 			self.np2image2pixmap(B, numpyAlso=True)
@@ -201,7 +206,7 @@ class MainWindow(inheritedMainWindow):
 			self.np2image2pixmap(B, numpyAlso=True)
 			self.setWindowTitle( f"{self.appFileName} : image where black and white are swapped" )
 		#
-		self.setMenuItems()   # prevPixmap may have changed from None to pixmap
+		self.setMenuItems()   # history may have changed
 		return
 		
 	def editColors(self):
@@ -269,6 +274,11 @@ class MainWindow(inheritedMainWindow):
 				QColorDialog.setCustomColor(cNo, QColor(r,g,b))
 				break
 		#
+		if verbose:
+			(r,g,b) = intRGB(rgb)
+			print( f"  mean color is {self.colorNames.name(r,g,b)}, pixel colors in rectangle are" +
+					f" {self.colorNames.regionNames(self.npImage[y0:y1,x0:x1])}" )
+		#
 		self.setMenuItems3()  # meanColor should be turned back on
 		#
 		return
@@ -312,7 +322,7 @@ class MainWindow(inheritedMainWindow):
 			print(f"  'A'  is ndarray of {A.dtype.name}, shape: {str(A.shape)}")
 			print(f"  'D'  is ndarray of {D.dtype.name}, shape: {str(D.shape)}, max: {D.max()}")
 			#
-			self.prevPixmap = self.pixmap   
+			self.saveUndo('distance to color')
 			self.np2image2pixmap(D, numpyAlso=True)
 			self.setWindowTitle(f"{self.appFileName} distColorRGB(): distance to color {color.name()}")
 			self.checkColor()
@@ -326,53 +336,44 @@ class MainWindow(inheritedMainWindow):
 					# value=25, min=0, max=255)
 			# print(f"QInputDialog.getInt(..) returned  'dist' = {dist},  'ok' = {ok}")
 			# if ok:
-				# # oldPixmap = self.prevPixmap
-				# self.prevPixmap = self.pixmap   
+				# self.saveUndo('approximate color')
 				# B = 255*(D <= dist).astype(np.uint8)
 				# self.np2image2pixmap(B, numpyAlso=True)
 				# self.setWindowTitle(f"{self.appFileName} approxColor(): binary image for color {color.name()}")
 				# self.setIsAllGray()
 			# else:
 				# pass  # 
-				# # self.pixmap = self.prevPixmap   # restore 
-				# # self.pixmap2image2np()
-				# # self.prevPixmap = oldPixmap
 			#
 		
+	def customPalette(self):
+		"""Return (colors, palette) for the custom colors that are not 'white',
+		colors is list of QColor and palette is array (K,3) of (b,g,r) as in npImage.
+		"""
+		colors = [QColorDialog.customColor(cNo) for cNo in range(QColorDialog.customCount())]
+		colors = [color for color in colors if not (color == QColor('white'))]
+		palette = np.array([(c.blue(), c.green(), c.red()) for c in colors], dtype=np.uint8).reshape(-1, 3)
+		return (colors, palette)
+		
 	def bestDistColorRGB(self):
 		"""Make binary image by testing if pixel color is close to one of custom RGB color.
 		Distance is measured for each pixel p with color (r,g,b) to custom colors (Ri,Gi,Bi) as
 		   d = min_i max(abs(r-Ri), abs(g-Gi), abs(b-Bi)),   i in range(nofCustomColors)
-		where d is pixel value for resulting gray scale image
+		where d is pixel value for resulting gray scale image.
+		All colors are done in one pass through the image, see myColors.colorDistance()
 		"""
 		color = QColorDialog.getColor(title="Check the colors to measure distance to.")
 		# but we don't use the returned color, does [Cancel] give not Valid color?
 		if color.isValid():  
 			# print(f"  selected color is {color.name()}")
-			A = self.npImage.astype(np.float32)   # active image
-			if (len(A.shape) > 2) and (A.shape[2] >= 3): 
-				A = A[:,:,[2,1,0]]  # bgr(a) --> rgb
-			D = 255*np.ones((A.shape[0], A.shape[1]), dtype=np.uint8)
-			for cNo in range(QColorDialog.customCount()):
-				color = QColorDialog.customColor(cNo)
-				if not (color == QColor('white')):
-					rgb = [color.red(), color.green(), color.blue()]
-					grayLevel = int((color.red() + color.green() + color.blue() + 0.5)/3)
-					if (len(A.shape) > 2) and (A.shape[2] >= 3): 
-						B = np.ones(shape=A.shape, dtype=np.float32)  # the one color image
-						B[:,:,:] = rgb  
-						Di = np.max(np.abs(A-B),axis=2).astype(np.uint8)  # the distance image
-						del B
-					else:
-						Di = np.abs(A - grayLevel).astype(np.uint8)
-					#end if
-					D = np.minimum(D,Di)
-				#end if
-			#end for
-			print(f"  'A'  is ndarray of {A.dtype.name}, shape: {str(A.shape)}")
+			(colors, palette) = self.customPalette()
+			if (len(colors) == 0):
+				print("bestDistColorRGB(): all custom colors are 'white' --> return")
+				return
+			(D, I) = myColors.colorDistance(self.npImage, palette, metric='chebyshev')
+			print(f"  'npImage'  is ndarray of {self.npImage.dtype.name}, shape: {str(self.npImage.shape)}")
 			print(f"  'D'  is ndarray of {D.dtype.name}, shape: {str(D.shape)}, max: {D.max()}")
 			#
-			self.prevPixmap = self.pixmap   
+			self.saveUndo('best distance to colors')
 			self.np2image2pixmap(D, numpyAlso=True)
 			self.setWindowTitle(f"{self.appFileName} image after bestDistColorRGB()")
 			self.checkColor()
@@ -384,16 +385,13 @@ class MainWindow(inheritedMainWindow):
 				return color_name
 		return 'Unknown'
  
-	def get_Color_Name(self,R,G,B, csv):
-  
-		minimum = 10000
-		for i in range(len(csv)):
-			d = abs(R- int(csv.loc[i,"R"])) + abs(G-int(csv.loc[i,"G"]))+ abs(B- int(csv.loc[i,"B"]))
-			if(d<=minimum):
-				minimum = d
-				cname = csv.loc[i,"color_name"]
+	def get_Color_Name(self,R,G,B, csv=None):
+		"""Name of the nearest color in ../colors.csv, 'csv' is not used (the colors are read once)."""
+		return self.colorNames.name(R,G,B)
 	
-		return cname
+	def colorName(self, r, g, b):
+		"""Name of color (r,g,b), shown when the mouse is over the image."""
+		return self.colorNames.name(r,g,b)
 
 	def draw_function(self, event, x,y,flags,param):
 		if event == cv2.EVENT_LBUTTONDBLCLK:
@@ -409,16 +407,14 @@ class MainWindow(inheritedMainWindow):
 	def ColorDetection(self):
 	# https://www.kaggle.com/code/mohammedlahsaini/color-detection-using-opencv
 	 
-		index=["color","color_name","hex","R","G","B"]
-		csv = pd.read_csv('../colors.csv', names=index, header=None)
-  
+		# the color names are read once, in __init__(), as self.colorNames
 		while(1):
 	
 			cv2.imshow("color detection",self.npImage)
 			if (clicked):
 				#cv2.rectangle(image, startpoint, endpoint, color, thickness)-1 fills entire rectangle 
 				cv2.rectangle(self.npImage,(20,20), (750,60), (b,g,r), -1)
-				color_name = self.getColorName(r,g,b, csv) + ' R='+ str(r) +  ' G='+ str(g) +  ' B='+ str(b)
+				color_name = self.colorNames.name(r,g,b) + ' R='+ str(r) +  ' G='+ str(g) +  ' B='+ str(b)
 				#cv2.putText(img,text,start,font(0-7),fontScale,color,thickness,lineType )
 				cv2.putText(self.npImage, color_name,(50,50),2,0.8,(255,255,255),2,cv2.LINE_AA)
 				#For very light colours we will display text in black colour
@@ -481,80 +477,19 @@ class MainWindow(inheritedMainWindow):
 			"gray" : 0
 		}
 		
-		for circle in self.circles:
-			valorex = circle[0]
-			valorey = circle[1]
-			raggio = circle[2]
-			#pixeldacampionare1 = (valorex + raggio*1.5, valorey)
-			#pixeldacampionare2 = (valorex, valorey + raggio*1.5)
-			print(valorex, valorey, raggio)
-			print(self.npImage.shape)
-			if valorex + round(raggio*1.2) < self.npImage.shape[1]:
-				color = self.npImage[valorey, valorex + round(raggio*1.2)]
-			elif valorey + round(raggio*1.2) < self.npImage.shape[1]: 
-				color = self.npImage[valorey + round(raggio*1.2), valorex ]
-			elif valorex - round(raggio*1.2) < self.npImage.shape[1]:
-				color = self.npImage[valorey, valorex - round(raggio*1.2)]
-			else:
-				color = self.npImage[valorey - round(raggio*1.2), valorex]
-
-			#color2 = self.npImage[valorex, valorey+ round(raggio*1.5)]
-   
-			# Converti il colore da BGR a HSV (se necessario)
-			#hsv_color = cv2.cvtColor(np.uint8([[color]]), cv2.COLOR_BGR2HSV)[0][0]
-   
-			# for color_name in color_ranges.keys():
-			# 	if color_ranges[color_name][0][0] < color[0] and color_ranges[color_name][1][0] > color[0] and color_ranges[color_name][0][1] < color[1] and color_ranges[color_name][1][1] > color[1] and color_ranges[color_name][0][2] < color[2] and color_ranges[color_name][1][2] > color[2]:
-			# 		#color_ranges[color_name][2] += 1
-			# 		# Estrai il tuple associato al colore 'red'
-			# 		current_tuple = color_ranges[color_name]
-
-			# 		# Converti il tuple in una lista per poterlo modificare
-			# 		current_list = list(current_tuple)
-
-			# 		# Incrementa il terzo valore (indice 2) di 1
-			# 		current_list[2] += 1
-
-			# 		# Riconverti la lista in un tuple e aggiorna il dizionario
-			# 		color_ranges[color_name] = tuple(current_list)
-			# 		#print("prova")
-
-			R = color[2]
-			G = color[1]
-			B = color[0]
-			print("\nCOLOR : ", R, G, B)
-			R, G, B = self.increase_saturation_single_pixel((R, G, B), 50)
-			print("\nNEW COLOR : ", R, G, B)
-
-			G = np.int16(G)
-			B = np.int16(B)
-			R = np.int16(R)
-
-
-			if R > 50 + G and G > 50 + B:
-				c = "orange"
-				print("ORANGE DICE")
-			elif abs(G - B) < 50 and max(G, B) < 50 + R:
-				c = "red"
-				print("RED DICE")
-			elif abs(R - G) < 50 and min(R, G) > 50 + B:
-				c = "yellow"
-				print("YELLOW DICE")
-			elif G > 50 + max(R, B):
-				c = "green"
-				print("GREEN DICE")
-			elif B > 50 + max(R, G) and abs(R - G) < 50:
-				c = "blue"
-				print("BLUE DICE")
-			elif B > 50 + R and R > 50 + G:
-				c = "purple"
-				print("PURPLE DICE")
-			elif B - R < 50 and B > 50 + G:
-				c = "pink"
-				print("PINK DICE")
-			else:
-				c = "gray"
-				print("GRAY DICE")
+		# median BGR color on a ring (36 points) at 1.2*radius for each circle (die eye),
+		# points outside the image are not used
+		M = myColors.ringColors(self.npImage, self.circles, radii=(1.2,), n=36)[:,0,:3]
+		inside = ~np.isnan(M[:,0])   # rings all outside the image have no color
+		colors = np.uint8(np.around(M[inside]))
+		for ((x,y,r), color) in zip(np.array(self.circles)[inside], colors):
+			print(f"  circle (x,y,r) = ({x},{y},{r}), color (R,G,B) = ({color[2]},{color[1]},{color[0]})")
+		#end for
+		# the rules (increase saturation, then test R, G, B) are in clsColorLUT.diceColorRule
+		# only a few colors, the rule is used directly (no look up table)
+		names = [diceClasses[k] for k in diceColorRule(colors[:,None])[0].ravel()] if len(colors) else []
+		for c in names:
+			print(f"{c.upper()} DICE")
 			col_dict[c] += 1
 		print(col_dict)
 		print("\n REAL OUTPUT : \n")
@@ -574,49 +509,28 @@ class MainWindow(inheritedMainWindow):
 		# but we don't use the returned color, does [Cancel] give not Valid color?
 		if color.isValid():  
 			# print(f"  selected color is {color.name()}")
-			A = self.npImage.astype(np.float32)   # active image
-			if (len(A.shape) > 2) and (A.shape[2] >= 3): 
-				A = A[:,:,[2,1,0]]  # bgr(a) --> rgb
-			D = 255*np.ones((A.shape[0], A.shape[1], QColorDialog.customCount()), dtype=np.uint8)   # 3D-array
-			for cNo in range(QColorDialog.customCount()):
-				color = QColorDialog.customColor(cNo)
-				if not (color == QColor('white')):
-					rgb = [color.red(), color.green(), color.blue()]
-					grayLevel = int((color.red() + color.green() + color.blue() + 0.5)/3)
-					if (len(A.shape) > 2) and (A.shape[2] >= 3): 
-						B = np.ones(shape=A.shape, dtype=np.float32)  # the one color image
-						B[:,:,:] = rgb  
-						D[:,:,cNo] = np.max(np.abs(A-B),axis=2).astype(np.uint8)  # the distance images
-						del B
-					else:
-						D[:,:,cNo] = np.abs(A - grayLevel).astype(np.uint8)
-					#end if
-				#end if
-			#end for
-			print(f"  'A'  is ndarray of {A.dtype.name}, shape: {str(A.shape)}")
-			print(f"  'D'  is ndarray of {D.dtype.name}, shape: {str(D.shape)}, max: {D.max()}")
+			(colors, palette) = self.customPalette()
+			if (len(colors) == 0):
+				print("attractColorRGB(): all custom colors are 'white' --> return")
+				return
+			(minD, I) = myColors.colorDistance(self.npImage, palette, metric='chebyshev')  # distance to and index of closest color
+			print(f"  'npImage'  is ndarray of {self.npImage.dtype.name}, shape: {str(self.npImage.shape)}")
+			print(f"  'minD'  is ndarray of {minD.dtype.name}, shape: {str(minD.shape)}, max: {minD.max()}")
 			(distLimit,ok) = QInputDialog.getInt(self,    # parent
 					f"attractColorRGB(): input 'distLimit'",  # title
 					"Give limit distance for attracted color (else 'white')",      # label
 					value=25, min=0, max=255)
 			print(f"QInputDialog.getInt(..) returned  'distLimit' = {distLimit},  'ok' = {ok}")
 			if ok:
-				B = 255*np.ones((A.shape[0], A.shape[1], 3), dtype=np.uint8)
-				minD = D.min(axis=2)  # distance to closest color
-				I = D.argmin(axis=2)  # indexes for best color
-				for cNo in range(QColorDialog.customCount()):
-					color = QColorDialog.customColor(cNo)
-					if not (color == QColor('white')):
-						idx = np.logical_and(I==cNo, minD<=distLimit)
-						print(f"  set {np.count_nonzero(idx)} pixels to color {color.name()}")
-						B[idx,0] = color.blue()   # numpy array is BGR!
-						B[idx,1] = color.green()
-						B[idx,2] = color.red()
-					#end if
-				#end for
+				I[minD > distLimit] = len(colors)   # index for 'white'
+				lut = np.vstack((palette, np.uint8([[255, 255, 255]])))
+				counts = np.bincount(I.ravel(), minlength=len(lut))
+				for (cNo, color) in enumerate(colors):
+					print(f"  set {counts[cNo]} pixels to color {color.name()}")
+				B = lut[I]   # numpy array is BGR!
 				print(f"  'B'  is ndarray of {B.dtype.name}, shape: {str(B.shape)}")
 				#
-				self.prevPixmap = self.pixmap   
+				self.saveUndo('attract colors')
 				self.np2image2pixmap(B, numpyAlso=True)
 				self.setWindowTitle(f"{self.appFileName} image after attractColorRGB()")
 				self.checkColor()
@@ -630,17 +544,17 @@ class MainWindow(inheritedMainWindow):
 			# make self.A a gray scale image
 			if (len(self.npImage.shape) == 3):
 				if (self.npImage.shape[2] == 3):
-					self.A = cv2.cvtColor(self.npImage, cv2.COLOR_BGR2GRAY )
+					self.A = self.imageState().gray()   # cached, read-only
 					self.B = self.npImage.copy()
 				elif (self.npImage.shape[2] == 4):
-					self.A = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2GRAY )
+					self.A = self.imageState().gray()   # cached, read-only
 					self.B = cv2.cvtColor(self.npImage, cv2.COLOR_BGRA2BGR )   
 				else:
 					print("prepareHoughCircles(): numpy 3D image is not as expected. --> return")
 					return
 				#end
 			elif (len(self.npImage.shape) == 2):
-				self.A = self.npImage.copy()
+				self.A = self.imageState().gray()   # cached, read-only
 				self.B = cv2.cvtColor(self.npImage, cv2.COLOR_GRAY2BGR )   
 			else:
 				print("prepareHoughCircles(): numpy image is not as expected. --> return")
@@ -662,39 +576,33 @@ class MainWindow(inheritedMainWindow):
 		return
 		
 	def tryHoughCircles(self, t):
-		"""Simply display results for the parameters given in tuple 't', without committing."""
+		"""Simply display results for the parameters given in tuple 't', without committing.
+		The work is done in the preview thread, and the result is shown by showPreview().
+		"""
 		(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = t
 		print("tryHoughCircles(): now called using:")
 		print(f"t = (dp={dp}, minDist={minDist}, param1={param1}, param2={param2}, minRadius={minRadius}, maxRadius={maxRadius})")
 		#
 		self.prepareHoughCirclesA()  # check self.A
-		C = cv2.HoughCircles(self.A, cv2.HOUGH_GRADIENT, dp=dp, minDist=minDist,
-					param1=param1, param2=param2, minRadius=minRadius, maxRadius=maxRadius)
-		#draw circles on B
-		self.prepareHoughCirclesB()  # make self.B
-		if C is not None:
-			C = np.int16(np.around(C))
-			print(f"  'C'  is ndarray of {C.dtype.name}, shape: {str(C.shape)}")
-			print(f"  Found {C.shape[1]} circles with radius from {C[0,:,2].min()} to {C[0,:,2].max()}")
-			for i in range(min(maxCircles, C.shape[1])):
-				(x,y,r) = ( C[0,i,0], C[0,i,1], C[0,i,2] )  # center and radius
-				cv2.circle(self.B, (x,y), r, (255, 0, 255), 2) # and circle outline 
-				print(f"  circle {i} has center in ({x},{y}) and radius {r}")
-			#end for
-		#end if
-		self.np2image2pixmap(self.B, numpyAlso=False)   # note: self.npImage is not updated
+		# progressive, coarse circles first, parameters and circles are scaled in houghCirclesImage()
+		B = self.imageState().bgr()
+		def makeJob(scale):
+			G = self.imageState().scaled('gray', scale) if (self.A is self.imageState().gray()) else self.A
+			return (ops.houghCirclesImage, (G, B, t), dict(scale=G.shape[0]/B.shape[0]))
+		self.preview.submitProgressive(makeJob, self.previewScales)
 		return
 	
 	def findCircles(self):
 		"""Find circles in active image using HoughCircles(..)."""
-		oldPixmap = self.prevPixmap  
-		self.prevPixmap = self.pixmap
+		self.saveUndo('find circles')
 		self.A = np.array([])  
 		self.circles = []
 		self.prepareHoughCirclesA()  # make self.A
+		self.makePreviewPyramid('gray')
 		#find circles, note that HoughCirclesDialog is in another file: clsHoughCirclesDialog.py
-		d = HoughCirclesDialog(self, title="Select parameters that locate the dice eyes") 
+		d = HoughCirclesDialog(self, title="Select parameters that locate the dice eyes", presets=self.presets) 
 		(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = d.getValues()   # display dialog and return values
+		self.preview.cancel()   # previews not shown yet are not wanted now
 		if d.result():
 			C = cv2.HoughCircles(self.A, cv2.HOUGH_GRADIENT, dp=dp, minDist=minDist,
 					param1=param1, param2=param2, minRadius=minRadius, maxRadius=maxRadius)
@@ -718,45 +626,46 @@ class MainWindow(inheritedMainWindow):
 			self.setWindowTitle(f"{self.appFileName} indicate found circles.")
 			self.checkColor()
 		else:
-			self.pixmap = self.prevPixmap   # restore 
-			self.pixmap2image2np()
-			self.prevPixmap = oldPixmap
+			self.cancelUndo()
 		#end if
 		return
 		
 	def findDices(self):
-		"""Find dices in active image using ??."""
-		print("findDices(..) function is not ready yet.")
-		print("Different approaches may be used, here we sketch one alternative that may (or may not) work.")
-		#
-		# -- your code may be written in between the comment lines below --
-		# find dices by looking for large rectangles (squares) in the image matching each color
-		# each color can be a small set of color point that can be loaded into custom color list
-		# for each color (point set)
-		#	find distance to this color (point set) and threshold
-		#	perhaps morphological operations on this binary image, erode and dilate
-		#	find large area (and check it is almost square)
-		#	(to find eyes too, the number of same size black wholes inside the square could be found)
-		#	print results, or indicate it on image
-		#
+		"""Find dices in active image, color and pose (center, side and angle) of each is printed
+		and a box is drawn around it. The pipeline is in myDice.py.
+		"""
+		if (len(self.npImage.shape) != 3):
+			print("findDices(): a color image is needed")
+			return
+		dice = myDice.findDice(self.npImage[:,:,:3])
+		print( f"findDices(): found {len(dice)} dices" )
+		for d in dice:
+			(x, y) = d['center']
+			print( f"  {d['color']:7s} dice at ({x:.0f},{y:.0f}), side {d['side']:.0f}, angle {d['angle']:.0f}" )
+		self.showDice(dice)
 		return
 		
 	def findEyes(self):
-		"""Find how many eyes each dice has using ??."""
-		print("findEyes(..) function is not ready yet.")
-		print("Different approaches may be used, here we sketch one alternative that may (or may not) work.")
-		#
-		# -- your code may be written in between the comment lines below --
-		# Make image into a gray scale image, either by straightforward BGR2GRAY or
-		#   by distance to all relevant dice colors, (2-4 sample points for each)
-		# Threshold this gray scale image by an appropriate value
-		# Find many circles (eyes) of appropriate size in this binary image
-		# for each circle
-		#	find colors for each circle at 0.8*radius and 1.2*radius, ex. 36 points for [0,10,..,350] degrees
-		#	check if the circle is an eye of an dice and the color of the dice
-		#	print results (and store it)
-		# Finally, print or indicate it on image how many eyes there are for each dice
-		#
+		"""Find how many eyes each dice has, the dices and their eyes are found by myDice.findDice()
+		and the eyes are indicated on the image.
+		"""
+		if (len(self.npImage.shape) != 3):
+			print("findEyes(): a color image is needed")
+			return
+		dice = myDice.findDice(self.npImage[:,:,:3])
+		for d in dice:
+			print( f"{d['color']} dice shows {d['eyes']} eyes" )
+		print( f"findEyes(): {sum(d['eyes'] for d in dice)} eyes on {len(dice)} dices" )
+		self.showDice(dice)
+		return
+	
+	def showDice(self, dice):
+		"""Draw the dices found by myDice.findDice() on (a copy of) the image."""
+		self.saveUndo('find dices')
+		B = myDice.drawDice(np.ascontiguousarray(self.npImage[:,:,:3]), dice)
+		self.np2image2pixmap(B, numpyAlso=True)
+		self.setWindowTitle(f"{self.appFileName} found {len(dice)} dices")
+		self.checkColor()
 		return
 
 	# def update_saturation(self, value):
@@ -24,11 +24,11 @@ import os.path
 #from math import hypot, pi, atan2, cos, sin    # sqrt, cos, sin, tan, log, ceil, floor 
 import numpy as np
 import cv2
-import datetime
 try:
 	from pyueye import ueye
 	from clsCamera import Camera
 	from pyueye_example_utils import ImageData, ImageBuffer  # FrameThread, 
+	from clsPipeline import Pipeline
 	ueyeOK = True
 except ImportError:
 	ueye_error = f"{_appFileName}: Requires IDS pyueye example files (and IDS camera)." 
@@ -38,7 +38,7 @@ import matplotlib.pyplot as plt
 import math
 
 try:
-	from PyQt5.QtCore import Qt, QPoint, QT_VERSION_STR, QTimer 
+	from PyQt5.QtCore import Qt, QPoint, QT_VERSION_STR 
 	from PyQt5.QtGui import QImage, QPixmap, QTransform, QColor
 	from PyQt5.QtWidgets import (QApplication, QAction, QFileDialog, QLabel, 
 			QGraphicsPixmapItem, QInputDialog)  # QColorDialog, 
@@ -64,11 +64,9 @@ class MainWindow(inheritedMainWindow):
 			self.setWindowTitle(self.appFileName)
    
 		self.capture_running = False
-		self.previous_capture_time = None  # Store the timestamp of the previous capture
 		self.previous_time_diff = None  # Store the previous time difference
 		self.same_time_count = 0  # Counter for how many times the time difference is the same
-		self.timer = QTimer(self)
-		self.timer.timeout.connect(self.check_for_trigger)
+		self.pipeline = None  # capture, analysis and saving in threads, see cameraOnTrigger()
 
 		# 
 		# self.view.rubberBandRectGiven.connect(self.methodUsingRubberbandEnd)  
@@ -97,14 +95,18 @@ class MainWindow(inheritedMainWindow):
 				# This function is currently not supported by the camera models USB 3 uEye XC and XS.
 				self.cam.set_aoi(0, 0, 720, 1280)  # but this is the size used
 				print("AOI set")
-				self.cam.alloc(3)  # argument is number of buffers
+				# the capture thread waits for the triggers, 2 workers analyse, a writer thread saves,
+				# and showTriggerResult() is called (in the GUI thread) with only the newest result
+				self.pipeline = Pipeline(self.cam, process=self.analyseTriggerImage, workers=2,
+						buffer_count=4, saveName='triggered_image_{stamp}.jpg', parent=self)
+				self.pipeline.resultReady.connect(self.showTriggerResult)
+				self.pipeline.start()  # allocates the buffers
 				print("Buffers allocated")
 				self.camOn = True
 				self.setMenuItems2()
 				print( f"{self.appFileName}: cameraOn() Camera started ok" )
 
 				self.capture_running = True
-				self.timer.start(30)  # Poll for trigger every 30ms
 
 			except Exception as e:
 				print(f"Error starting camera: {e}")
@@ -129,64 +131,68 @@ class MainWindow(inheritedMainWindow):
 		angular_speed = 360 / time_diff
 		print(f"\n\nAngular speed: {angular_speed} degrees per second")
 
-	def check_for_trigger(self):
-		"""Check if the camera trigger has been activated, and capture the image."""
-		if self.camOn:
-			frame = self.cam.capture()  # This waits for the trigger to capture an image
-			if frame is not None:
-				# current capture time
-				current_capture_time = datetime.datetime.now()	
-	
-				# Convert the NumPy array (frame) to QImage
-				height, width, channel = frame.shape
-				bytes_per_line = 3 * width
-				self.image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-				
-				# Convert QImage to QPixmap
-				self.pixmap = QPixmap.fromImage(self.image)
-				
-				# Update the QGraphicsScene
-				if self.curItem is not None:
-					self.scene.removeItem(self.curItem)  # Remove previous pixmap if any
-				self.curItem = self.scene.addPixmap(self.pixmap)  # Add the new pixmap to the scene
-				
-				# Fit the view to the scene
-				self.view.fitInView(self.scene.sceneRect(), mode=1)
-				self.status.setText("Image captured and displayed.")
-
-				# Optionally save the captured image
-				timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-				cv2.imwrite(f'triggered_image_{timestamp}.jpg', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-				print(f"Image captured at {timestamp}")
-				
-				if self.previous_capture_time is not None:
-					time_diff = current_capture_time - self.previous_capture_time
-					print(f"Time between captures: {time_diff.total_seconds()} seconds")
-					time_diff = time_diff.total_seconds()
+	def analyseTriggerImage(self, image, info):
+		"""Find the red sector center in a triggered image, run in a worker thread (no GUI here)."""
+		hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)  # image is RGB
+		mask_red = cv2.inRange(hsv, (0, 50, 50), (10, 255, 255)) | cv2.inRange(hsv, (170, 50, 50), (180, 255, 255))
+		M = cv2.moments(mask_red, binaryImage=True)
+		center = (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"])) if (M["m00"] > 0) else None
+		return {'redCenter': center}
+
+	def showTriggerResult(self):
+		"""Show the newest triggered image (and result), called in the GUI thread by the pipeline."""
+		result = self.pipeline.latest() if (self.camOn and self.pipeline) else None
+		if result is not None:
+			frame = result['image']
+			# Convert the NumPy array (frame) to QImage
+			height, width, channel = frame.shape
+			bytes_per_line = frame.strides[0]
+			self.image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
+			
+			# Convert QImage to QPixmap
+			self.pixmap = QPixmap.fromImage(self.image)
+			
+			# Update the QGraphicsScene
+			if self.curItem is not None:
+				self.scene.removeItem(self.curItem)  # Remove previous pixmap if any
+			self.curItem = self.scene.addPixmap(self.pixmap)  # Add the new pixmap to the scene
+			
+			# Fit the view to the scene
+			self.view.fitInView(self.scene.sceneRect(), mode=1)
+			self.status.setText("Image captured and displayed.")
+
+			# the image is saved by the pipeline writer thread
+			timestamp = result['stamp'].strftime("%Y%m%d_%H%M%S")
+			print(f"Image {result['number']} captured at {timestamp}, red sector center {result['redCenter']}")
+			
+			if result['interval'] is not None:  # time from the previous capture, also if that was not shown
+				time_diff = result['interval']
+				print(f"Time between captures: {time_diff} seconds")
 	 
-					if self.previous_time_diff is not None:
-						if abs(time_diff - self.previous_time_diff) < 0.00001:  # Check if the time difference is the same
-							self.same_time_count += 1
-							print(f"Same time difference detected {self.same_time_count} times")
-							if self.same_time_count >= 1:  # Stop after detecting same time twice
-								self.capture_running = False
-								self.cameraOff()   
-								self.status.setText("Process stopped due to same time difference.")
-								self.angularSpeed(time_diff)
-								return
-						else:
-							self.same_time_count = 0
-
-					self.previous_time_diff = time_diff
-				self.previous_capture_time = current_capture_time
+				if self.previous_time_diff is not None:
+					if abs(time_diff - self.previous_time_diff) < 0.00001:  # Check if the time difference is the same
+						self.same_time_count += 1
+						print(f"Same time difference detected {self.same_time_count} times")
+						if self.same_time_count >= 1:  # Stop after detecting same time twice
+							self.capture_running = False
+							self.cameraOff()   
+							self.status.setText("Process stopped due to same time difference.")
+							self.angularSpeed(time_diff)
+							return
+					else:
+						self.same_time_count = 0
+
+				self.previous_time_diff = time_diff
 	
 	
 	def cameraOff(self):
 		"""Turn IDS camera off and print some information."""
 		if ueyeOK and self.camOn:
+			if self.pipeline is not None:  # stop the threads before the camera
+				self.pipeline.stop()
+				self.pipeline = None
 			self.cam.exit()
 			self.camOn = False
-			self.timer.stop()  # Stop the timer when stopping the camera
 			self.setMenuItems2()
 			print( f"{self.appFileName}: cameraOff() Camera stopped ok" )
 		return
@@ -229,12 +235,15 @@ class MainWindow(inheritedMainWindow):
 
 	def findCircles(self):
 		"""Find circles in active image using HoughCircles(..)."""
-		oldPixmap = self.prevPixmap  
-		self.prevPixmap = self.pixmap
+		self.saveUndo('find circles')
 		self.A = np.array([])  
 		self.prepareHoughCirclesA()  
 
-		(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = (2, 270, 327, 83, 185, 800, 1)
+		# the disk parameters may be tuned (and saved as preset 'disk') in HoughCirclesDialog
+		t = {'dp': 2, 'minDist': 270, 'param1': 327, 'param2': 83, 'minRadius': 185, 'maxRadius': 800, 'maxCircles': 1}
+		t.update(self.presets.get('circles', 'disk', {}))
+		(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = (t['dp'], t['minDist'], 
+				t['param1'], t['param2'], int(t['minRadius']), int(t['maxRadius']), int(t['maxCircles']))
 		C = cv2.HoughCircles(self.A, cv2.HOUGH_GRADIENT, dp=dp, minDist=minDist,
 				param1=param1, param2=param2, minRadius=minRadius, maxRadius=maxRadius)
 
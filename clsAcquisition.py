@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsAcquisition.py
+#
+#  The classes Acquisition and Frame, continuous image acquisition from an IDS uEye camera
+#
+#  Acquisition uses a camera object as clsCamera.Camera (or pyueye_example_camera.Camera),
+#  it allocates N image memories (camera.alloc(N)) that the camera fills in turn in live
+#  video, and a thread waits for each new image (is_WaitForNextImage()). Each image is
+#  given to the user as a Frame: frame number, time stamp and a numpy view of the image
+#  memory (no copy). The memory is locked until the frame is released, then the camera
+#  may use it again. The frames are passed in a collections.deque, append() and popleft()
+#  are atomic so the queue needs no lock. If the user does not keep up, the oldest frame
+#  in the queue is released (dropped). The queue holds at most N-2 frames, so there is
+#  always a free memory for the camera while the user holds one frame (use N >= 3).
+#  The user must release each frame, ex. by 'with frame:', and should not keep the
+#  image after that (use frame.copy() to keep it).
+#  Without a camera, myFakeUeye.py can be used (myFakeUeye.install() before the imports).
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsAcquisition.py   # test with simulated camera (myFakeUeye.py)
+# Example on how to use file in a program:
+#   from clsCamera import Camera
+#   from clsAcquisition import Acquisition
+#   cam = Camera(0)
+#   cam.init(width=1280, height=1024, exposure=2.0)
+#   acq = Acquisition(cam, buffer_count=4)
+#   acq.start()
+#   frame = acq.get(timeout=1.0)   # None if no frame
+#   with frame:                    # released at the end of the block
+#       process(frame.image)
+#   acq.stop()
+
+import time
+import threading
+from collections import deque
+if __name__ == '__main__':
+	import myFakeUeye
+	myFakeUeye.install()   # the test uses the simulated camera
+from pyueye import ueye
+from pyueye_example_utils import ImageBuffer, check, wrap_image
+
+class Frame:
+	"""One image from the camera, 'image' is a numpy view of the image memory, valid until released.
+	number     frame number (0, 1, ..) given by Acquisition, frames dropped also have numbers
+	timestamp  time.perf_counter() when the frame was received from the camera
+	"""
+	def __init__(self, acquisition, number, timestamp, buffer, image):
+		self.acquisition = acquisition
+		self.number = number
+		self.timestamp = timestamp
+		self.buffer = buffer   # ImageBuffer, pointer and id of the image memory
+		self.image = image
+		self.released = False
+
+	def release(self):
+		"""Unlock the image memory, the camera may use it for a new image."""
+		if not self.released:
+			self.released = True
+			self.acquisition.unlock(self.buffer)
+			self.image = None
+		return
+
+	def copy(self):
+		return self.image.copy()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, _type, value, traceback):
+		self.release()
+
+	def __str__(self):
+		return f"Frame {self.number} at {self.timestamp:.3f} s, shape {None if self.image is None else self.image.shape}"
+# end class Frame
+
+class Acquisition:
+	"""Continuous acquisition (live video) in N image memories, frames are given in a queue.
+	example of use:
+		acq = Acquisition(cam, buffer_count=4)   # cam is initialized clsCamera.Camera
+		acq.start()
+		frame = acq.get(timeout=1.0)    # next frame, or None
+		frame = acq.latest()            # newest frame, older frames in the queue are released
+		frame.release()
+		acq.stop()
+	"""
+	def __init__(self, camera, buffer_count=4, queue_size=0, timeout=1000):
+		self.camera = camera
+		self.buffer_count = buffer_count
+		self.queue_size = queue_size if queue_size else max(1, buffer_count - 2)   # one for the camera, one for the user
+		self.timeout = timeout   # ms, for each is_WaitForNextImage()
+		self.frames = deque()
+		self.newFrame = threading.Event()
+		self.memInfo = {}   # mem id: (width, height, bits, pitch)
+		self.thread = None
+		self.running = False
+		(self.frameCount, self.dropCount, self.timeoutCount) = (0, 0, 0)   # counted in the acquisition thread
+		self.skipCount = 0   # frames released by latest(), counted in the user thread
+
+	def start(self):
+		"""Allocate the image memories and start live video and the acquisition thread."""
+		self.camera.alloc(self.buffer_count)
+		self.memInfo = {}
+		check(self.camera.capture_video(wait=False))
+		self.running = True
+		self.thread = threading.Thread(target=self.run, name='Acquisition', daemon=True)
+		self.thread.start()
+		return
+
+	def stop(self):
+		"""Stop the thread and live video, frames still in the queue are released."""
+		self.running = False
+		if self.thread is not None:
+			self.thread.join()
+			self.thread = None
+		self.camera.stop_video()
+		while self.frames:
+			self.frames.popleft().release()
+		return
+
+	def info(self, buffer):
+		"""Return (width, height, bits, pitch) of the image memory, found once for each memory."""
+		key = buffer.mem_id.value
+		if key not in self.memInfo:
+			(w, h, bits, pitch) = (ueye.int(), ueye.int(), ueye.int(), ueye.int())
+			check(ueye.is_InquireImageMem(self.camera.handle(), buffer.mem_ptr, buffer.mem_id, w, h, bits, pitch))
+			self.memInfo[key] = (w.value, h.value, bits.value, pitch.value)
+		return self.memInfo[key]
+
+	def wrap(self, buffer):
+		"""Return numpy view (height, width, channels) or (height, width) of the image memory."""
+		(w, h, bits, pitch) = self.info(buffer)
+		return wrap_image(buffer.mem_ptr, w, h, bits, pitch)   # rows may be padded
+
+	def run(self):
+		"""The acquisition thread, waits for the images and puts them in the queue."""
+		hCam = self.camera.handle()
+		while self.running:
+			buffer = ImageBuffer()
+			ret = ueye.is_WaitForNextImage(hCam, self.timeout, buffer.mem_ptr, buffer.mem_id)
+			if (ret != ueye.IS_SUCCESS):
+				self.timeoutCount += 1
+				continue
+			frame = Frame(self, self.frameCount, time.perf_counter(), buffer, self.wrap(buffer))
+			self.frameCount += 1
+			while (len(self.frames) >= self.queue_size):   # the user does not keep up
+				try:
+					old = self.frames.popleft()
+				except IndexError:   # the user took it
+					break
+				old.release()
+				self.dropCount += 1
+			self.frames.append(frame)
+			self.newFrame.set()
+		return
+
+	def unlock(self, buffer):
+		check(ueye.is_UnlockSeqBuf(self.camera.handle(), buffer.mem_id, buffer.mem_ptr))
+		return
+
+	def get(self, timeout=None):
+		"""Return the next (oldest) frame in the queue, wait at most 'timeout' seconds, None if no frame."""
+		end = None if (timeout is None) else time.perf_counter() + timeout
+		while True:
+			self.newFrame.clear()   # before popleft(), so a frame appended after it sets the event
+			try:
+				return self.frames.popleft()
+			except IndexError:
+				pass
+			wait = None if (end is None) else end - time.perf_counter()
+			if ((wait is not None) and (wait <= 0)) or not self.running:
+				return None
+			self.newFrame.wait(wait)
+
+	def latest(self, timeout=None):
+		"""Return the newest frame, the older frames in the queue are released (skipped)."""
+		frame = self.get(timeout)
+		while (frame is not None) and self.frames:
+			newer = self.get(0)
+			if newer is None:
+				break
+			frame.release()
+			self.skipCount += 1
+			frame = newer
+		return frame
+
+	def __str__(self):
+		return (f"Acquisition: {self.buffer_count} memories, {self.frameCount} frames, " +
+				f"{self.dropCount} dropped, {self.skipCount} skipped, {len(self.frames)} in queue, {self.timeoutCount} time outs")
+# end class Acquisition
+
+def testAll():
+	"""Simple function for testing the classes in this file, with the simulated camera."""
+	if not hasattr(ueye, 'frameNumber'):
+		print("clsAcquisition.py: testAll() needs the simulated camera, run it as: python clsAcquisition.py")
+		return
+	from clsCamera import Camera
+	print("clsAcquisition.py: testAll()  # test the classes in this file")
+	ueye.configure(fps=200, sensor=(1280, 1024), pitchAlign=64)
+	cam = Camera(0)
+	cam.init(x=8, y=2, width=1000, height=800)
+	cam.capture()   # one image first, the simulated camera makes its background (slow) then
+	acq = Acquisition(cam, buffer_count=4)
+	acq.start()
+	(numbers, latency, shape, locked) = ([], [], None, 0)
+	t0 = time.perf_counter()
+	for k in range(100):
+		frame = acq.get(timeout=1.0)
+		with frame:
+			numbers.append(ueye.frameNumber(frame.image))
+			shape = frame.image.shape
+			latency.append(time.perf_counter() - frame.timestamp)
+			if (k == 50):
+				time.sleep(0.06)   # slow consumer, about 12 frames, the acquisition thread drops frames
+				locked = ueye.statistics(cam.handle())['locked']
+	t = time.perf_counter() - t0
+	print( f"  100 frames in {t:.2f} s, shape {shape}" )
+	print( f"  frame numbers (mod 256) {numbers[45:60]}, in order: {all(0 < (b - a) % 256 < 128 for (a, b) in zip(numbers, numbers[1:]))}" )
+	print( f"  max latency {1000*max(latency):.2f} ms, {acq}" )
+	frame = acq.latest(timeout=1.0)
+	print( f"  latest: {frame}" )
+	frame.release()
+	acq.stop()
+	stat = ueye.statistics(cam.handle())
+	print( f"  stopped: {acq}, camera: {stat}" )
+	print( f"  slow consumer: {locked} of {acq.buffer_count} memories locked (queue size {acq.queue_size}), one free: {locked < acq.buffer_count}" )
+	cam.exit()
+	return
+
+if __name__ == '__main__':
+	testAll()
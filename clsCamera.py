@@ -8,11 +8,10 @@
 
 import cv2
 import matplotlib.pyplot as plt
-import numpy as np
 from pyueye import ueye
 import datetime
 from pyueye_example_utils import (uEyeException, Rect, get_bits_per_pixel,
-								  ImageBuffer, check)
+								  ImageBuffer, check, wrap_image)
 
 class Camera:
     
@@ -74,12 +73,12 @@ class Camera:
 
 	# capture captures an image in BGR format
 	# if trigger is set, waits for trigger
-	# returns the image as a numpy multidimensional array
+	# returns the image as a numpy multidimensional array,
+	# a view of the image memory (rows may be padded to pitch), not a copy
 	def capture(self):
 		ueye.is_FreezeVideo(self.hCam, ueye.IS_WAIT)
-		img = ueye.get_data(self.pcMem, self.width, self.height,
-		                    self.bpp, self.pitch, False)
-		img = np.reshape(img, (self.height.value, self.width.value, 3))
+		img = wrap_image(self.pcMem, self.width, self.height,
+		                 self.bpp, self.pitch)
 		return img
 
 
@@ -105,6 +104,7 @@ class Camera:
 
 		for buff in self.img_buffers:
 			check(ueye.is_FreeImageMem(self.hCam, buff.mem_ptr, buff.mem_id))
+		self.img_buffers = []
 
 		for i in range(buffer_count):
 			buff = ImageBuffer()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsColorLUT.py
+#
+#  The class ColorLUT, classify colors by a 3D look up table
+#
+#  The table has one class id (uint8) for each BGR color, quantized to 'bits' bits
+#  for each channel, i.e. 2**(3*bits) entries: 32x32x32 (32 kB) for bits=5 and all
+#  256x256x256 colors (16 MB) for bits=8. Classification of an image is then a
+#  single gather (lut[index]), the index is made by cv2.LUT() in tiles.
+#  The table is made once, from rules (a function of the colors, evaluated for
+#  all table entries at once) or from sample pixels for each class, and it may be
+#  saved as a .npy file (and .json with class names) and memory-mapped when loaded.
+#  Rules as in appImageViewer3.py and appImageViewer4.py are here (appImageViewer4.py
+#  uses cv2.inRange() itself, it is faster than a table for this single class mask):
+#  diceColorRule()  the dice colors as in findYellow(), saturation increased first (findYellow()
+#                   uses the rule directly, it classifies only a few circle colors)
+#  redSectorRule()  red as in findRedSector(), hue 0-10 or 170-180 and S, V >= 50
+#  getLUT()  load a table from folder 'luts', or make it (by a rule) and save it there
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsColorLUT.py   # test
+# Example on how to use file:
+#   from clsColorLUT import ColorLUT, getLUT, diceColorRule
+#   lut = getLUT('dice', diceColorRule, bits=8)   # made only the first time
+#   C = lut.classify(self.npImage)            # uint8 class id for each pixel
+#   names = lut.classNames(colors)            # for some (N,3) BGR colors
+
+import sys
+import os
+import json
+import numpy as np
+import cv2
+
+class ColorLUT:
+	"""Look up table from BGR color to class id, class 0 is 'none' (not classified).
+	The class ids are uint8, or uint16 when there are more than 256 classes.
+	example of use:
+		lut = ColorLUT.fromRule(redSectorRule, bits=8)
+		C = lut.classify(A)          # class ids, same size as A (2D)
+		mask = lut.mask(A, 'red')    # 255 where class is 'red'
+		lut.save('luts/red.npy')     # and later
+		lut = ColorLUT.load('luts/red.npy')   # memory-mapped
+	"""
+	def __init__(self, table, classes, bits):
+		self.bits = bits
+		self.classes = list(classes)
+		self.table = table.reshape(-1)   # flat, index is (b << 2*bits) | (g << bits) | r
+		s = 8 - bits
+		q = (np.arange(256) >> s).astype(np.int32)
+		self.indexLut = np.stack([q << (2*bits), q << bits, q], axis=1).reshape(1, 256, 3)
+		return
+
+	@staticmethod
+	def grid(bits=5):
+		"""Return all table entries as a BGR image (n, n*n, 3) of bin center colors, n = 2**bits."""
+		n = 2**bits
+		v = (np.arange(n) << (8 - bits)) + ((1 << (8 - bits)) >> 1)   # bin centers
+		(b, g, r) = np.meshgrid(v, v, v, indexing='ij')
+		return np.dstack((b.reshape(n, n*n), g.reshape(n, n*n), r.reshape(n, n*n))).astype(np.uint8)
+
+	@classmethod
+	def fromRule(cls, rule, bits=5):
+		"""Make table by rule(A) which returns (class ids, class names) for BGR image A,
+		it is evaluated once for all table entries (the bin centers).
+		"""
+		(C, classes) = rule(cls.grid(bits))
+		return cls(np.ascontiguousarray(C, dtype=cls.idType(len(classes))), classes, bits)
+
+	@staticmethod
+	def idType(nofClasses):
+		return np.uint8 if (nofClasses <= 256) else np.uint16
+
+	@classmethod
+	def fromSamples(cls, samples, bits=5, maxDist=60):
+		"""Make table from samples, a dict 'class name': array (N,3) of BGR colors.
+		Each table entry gets the class most samples in it have, entries with no
+		samples get the class with the closest mean color (L2 distance), or 'none'
+		if that is more than 'maxDist' away.
+		"""
+		import myColors
+		classes = ['none'] + list(samples)
+		n3 = 2**(3*bits)
+		votes = np.zeros((len(classes), n3), dtype=np.int64)
+		means = []
+		for (k, name) in enumerate(classes[1:], start=1):
+			S = np.asarray(samples[name], dtype=np.uint8).reshape(-1, 1, 3)
+			means.append(S.reshape(-1, 3).mean(axis=0))
+			votes[k] = np.bincount(cls._index(S, bits).ravel(), minlength=n3)
+		(D, I) = myColors.colorDistance(cls.grid(bits), np.uint8(np.around(means)), metric='l2')
+		C = np.where(D.ravel() <= maxDist, I.ravel() + 1, 0).astype(np.uint8)
+		voted = votes.sum(axis=0) > 0
+		C[voted] = votes[:,voted].argmax(axis=0)
+		return cls(C, classes, bits)
+
+	@staticmethod
+	def _index(A, bits):
+		s = 8 - bits
+		I = (A[:,:,0] >> s).astype(np.int32) << (2*bits)
+		I |= (A[:,:,1] >> s).astype(np.int32) << bits
+		I |= A[:,:,2] >> s
+		return I
+
+	def classify(self, A, tileBytes=2**18):
+		"""Return class id (uint8, or uint16) for each pixel in BGR (or BGRA) image A."""
+		C = np.empty(A.shape[:2], dtype=self.table.dtype)
+		rows = max(1, tileBytes // max(1, A[:1].nbytes))
+		for r0 in range(0, A.shape[0], rows):
+			X = cv2.LUT(np.ascontiguousarray(A[r0:r0+rows,:,:3]), self.indexLut)   # int32 (h,w,3)
+			index = X[:,:,0]
+			index |= X[:,:,1]
+			index |= X[:,:,2]
+			np.take(self.table, index, out=C[r0:r0+rows])
+		return C
+
+	def mask(self, A, name):
+		"""Return binary image, 255 where class of pixel in A is 'name' (or one of the names in a list)."""
+		names = [name] if isinstance(name, str) else name
+		ids = [self.classes.index(n) for n in names]
+		keep = np.zeros(max(256, len(self.classes)), dtype=np.uint8)
+		keep[ids] = 255
+		C = self.classify(A)
+		return cv2.LUT(C, keep) if (C.dtype == np.uint8) else keep[C]
+
+	def classNames(self, colors):
+		"""Return list of class names for colors, array (N,3) of BGR (or (N,4) BGRA)."""
+		if (len(colors) == 0):
+			return []
+		X = np.asarray(colors, dtype=np.uint8).reshape(len(colors), -1)
+		C = self.classify(np.ascontiguousarray(X[:,None,:3]))
+		return [self.classes[c] for c in C.ravel()]
+
+	def save(self, fName):
+		"""Save table as .npy file, and class names and bits in a .json file with the same name."""
+		folder = os.path.dirname(fName)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		np.save(fName, self.table)
+		with open(os.path.splitext(fName)[0] + '.json', 'w') as f:
+			json.dump({'bits': self.bits, 'classes': self.classes}, f)
+		return
+
+	@classmethod
+	def load(cls, fName, mmap=True):
+		"""Load table saved by save(), memory-mapped (read-only) if 'mmap' is True."""
+		with open(os.path.splitext(fName)[0] + '.json') as f:
+			d = json.load(f)
+		table = np.load(fName, mmap_mode='r' if mmap else None)
+		if (table.size != 2**(3*d['bits'])):
+			raise ValueError(f"ColorLUT.load(): {fName} has {table.size} entries, not 2**(3*{d['bits']})")
+		return cls(table, d['classes'], d['bits'])
+
+	def __str__(self):
+		n = np.bincount(np.asarray(self.table), minlength=len(self.classes))
+		return (f"ColorLUT: {2**self.bits}^3 entries, " +
+				', '.join(f"{name} {100*k/self.table.size:.1f}%" for (name, k) in zip(self.classes, n)))
+# end of class ColorLUT
+
+diceClasses = ('none', 'red', 'orange', 'yellow', 'green', 'blue', 'purple', 'pink', 'gray')
+
+def diceColorRule(A, saturation=50):
+	"""Dice color for BGR image A, as the rules in findYellow() in appImageViewer3.py,
+	the saturation is increased by 'saturation' (in HLS) first. Returns (C, diceClasses).
+	Note that the saturation is saturated at 255, the old per-pixel code in findYellow()
+	wrapped around (uint8 s + 50), which made very saturated colors (S > 205) gray or red.
+	"""
+	X = cv2.cvtColor(A, cv2.COLOR_BGR2HLS)
+	X[:,:,2] = cv2.add(X[:,:,2], saturation)   # saturated at 255
+	X = cv2.cvtColor(X, cv2.COLOR_HLS2BGR).astype(np.int16)
+	(B, G, R) = (X[:,:,0], X[:,:,1], X[:,:,2])
+	C = np.full(A.shape[:2], diceClasses.index('gray'), dtype=np.uint8)
+	rules = [   # first rule that is true gives the class
+		('orange', (R > 50 + G) & (G > 50 + B)),
+		('red',    (np.abs(G - B) < 50) & (np.maximum(G, B) < 50 + R)),
+		('yellow', (np.abs(R - G) < 50) & (np.minimum(R, G) > 50 + B)),
+		('green',  G > 50 + np.maximum(R, B)),
+		('blue',   (B > 50 + np.maximum(R, G)) & (np.abs(R - G) < 50)),
+		('purple', (B > 50 + R) & (R > 50 + G)),
+		('pink',   (B - R < 50) & (B > 50 + G)) ]
+	for (name, test) in reversed(rules):
+		C[test] = diceClasses.index(name)
+	return (C, diceClasses)
+
+def redSectorRule(A):
+	"""Red as in findRedSector() in appImageViewer4.py, HSV in range (0-10, 50-255, 50-255)
+	or (170-180, 50-255, 50-255). Returns (C, ('none', 'red')).
+	"""
+	hsv = cv2.cvtColor(A, cv2.COLOR_BGR2HSV)
+	red = cv2.inRange(hsv, (0, 50, 50), (10, 255, 255)) | cv2.inRange(hsv, (170, 50, 50), (180, 255, 255))
+	return ((red > 0).astype(np.uint8), ('none', 'red'))
+
+def getLUT(name, rule, bits=5, folder='luts'):
+	"""Return table 'name' loaded (memory-mapped) from folder, or made by 'rule' and saved there."""
+	fName = os.path.join(folder, f"{name}{bits}.npy")
+	if os.path.isfile(fName):
+		try:
+			return ColorLUT.load(fName)
+		except (OSError, ValueError, KeyError) as e:
+			print( f"getLUT(): could not load {fName} ({e}), it is made again" )
+	lut = ColorLUT.fromRule(rule, bits)
+	try:
+		lut.save(fName)
+	except OSError as e:
+		print( f"getLUT(): could not save {fName}: {e}" )
+	return lut
+
+def _oldDiceColor(color, increment_value=50):
+	"""Reference copy of the old per-pixel code in findYellow(), color is BGR, returns class name."""
+	hls_pixel = cv2.cvtColor(np.uint8([[color[::-1]]]), cv2.COLOR_RGB2HLS)
+	(h, l, s) = hls_pixel[0, 0]
+	s = np.clip((int(s) + increment_value) % 256, 0, 255)   # uint8 s + 50 wrapped around before clip
+	hls_pixel[0, 0] = [h, l, s]
+	(R, G, B) = cv2.cvtColor(hls_pixel, cv2.COLOR_HLS2RGB)[0, 0].astype(np.int16)
+	if R > 50 + G and G > 50 + B:
+		return 'orange'
+	elif abs(G - B) < 50 and max(G, B) < 50 + R:
+		return 'red'
+	elif abs(R - G) < 50 and min(R, G) > 50 + B:
+		return 'yellow'
+	elif G > 50 + max(R, B):
+		return 'green'
+	elif B > 50 + max(R, G) and abs(R - G) < 50:
+		return 'blue'
+	elif B > 50 + R and R > 50 + G:
+		return 'purple'
+	elif B - R < 50 and B > 50 + G:
+		return 'pink'
+	return 'gray'
+
+def testAll():
+	"""Simple function for testing the class in this file."""
+	import time
+	import tempfile
+	print("clsColorLUT.py: testAll()  # test the class in this file")
+	A = np.random.default_rng(1).integers(0, 256, size=(1500, 2000, 3), dtype=np.uint8)
+	t0 = time.perf_counter()
+	red = ColorLUT.fromRule(redSectorRule, bits=8)
+	print( f"  made red LUT in {time.perf_counter()-t0:.2f} s, {red}" )
+	t0 = time.perf_counter()
+	M = red.mask(A, 'red')
+	t1 = time.perf_counter()
+	(R, _) = redSectorRule(A)
+	t2 = time.perf_counter()
+	print( (f"  red mask by LUT {1000*(t1-t0):.0f} ms, by HSV inRange {1000*(t2-t1):.0f} ms," +
+			f" same: {np.array_equal(M > 0, R > 0)}") )
+	t0 = time.perf_counter()
+	dice = ColorLUT.fromRule(diceColorRule, bits=6)
+	print( f"  made dice LUT in {time.perf_counter()-t0:.2f} s, {dice}" )
+	colors = np.uint8([(0, 0, 200), (0, 200, 220), (200, 60, 40), (40, 180, 40), (128, 128, 128)])
+	print( f"  dice colors {dice.classNames(colors)}" )
+	with tempfile.TemporaryDirectory() as folder:
+		fName = os.path.join(folder, 'dice6.npy')
+		dice.save(fName)
+		d2 = ColorLUT.load(fName)
+		print( f"  loaded memory-mapped {type(d2.table).__name__}, same: {np.array_equal(d2.classify(A), dice.classify(A))}" )
+		del d2   # close the memory map before the file is removed
+	X = np.random.default_rng(2).integers(0, 256, size=(20000, 3), dtype=np.uint8)
+	(C, _) = diceColorRule(X[:,None])
+	old = np.uint8([diceClasses.index(_oldDiceColor(x)) for x in X])
+	S = cv2.cvtColor(X[:,None], cv2.COLOR_BGR2HLS)[:,0,2]
+	differ = C.ravel() != old
+	print( (f"  old per-pixel rule: {differ.sum()} of {len(X)} colors differ, " +
+			f"all with S > 205 (old code wrapped around): {bool(np.all(S[differ] > 205))}, " +
+			f"same for S <= 205: {bool(np.all(~differ[S <= 205]))}") )
+	samples = {'red': colors[:1] + np.uint8([[0, 0, 10]]), 'yellow': colors[1:2], 'blue': colors[2:3]}
+	s = ColorLUT.fromSamples(samples, bits=5, maxDist=80)
+	print( f"  from samples {s},  {s.classNames(colors)}" )
+	return
+
+if __name__ == '__main__':
+	testAll()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsColorNames.py
+#
+#  The class ColorNames, the name of the nearest named color
+#
+#  The named colors are read once, from a CSV file as colors.csv used in
+#  https://www.kaggle.com/code/mohammedlahsaini/color-detection-using-opencv
+#  (lines: color,color_name,hex,R,G,B), or the basic colors below are used.
+#  The distance is L1 in RGB, |r-R| + |g-G| + |b-B|, as in get_Color_Name() in
+#  appImageViewer3.py, and for equal distances the last color in the file is used.
+#  Single colors (and lists of colors) are compared to all named colors at once (numpy),
+#  images are done by a 3D look up table (clsColorLUT.py) made the first time it is
+#  needed, and saved in folder 'luts', so it is only a gather for each pixel.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsColorNames.py   # test
+#   (py38) C:\..\py3> python clsColorNames.py ../colors.csv   # test with the colors in file
+# Example on how to use file in appImageViewer3.py:
+#   from clsColorNames import ColorNames
+#   self.colorNames = ColorNames.load('../colors.csv')   # once, at startup
+#   name = self.colorNames.name(r, g, b)
+#   names = self.colorNames.regionNames(self.npImage[y0:y1,x0:x1])   # [(name, fraction), ..]
+
+import sys
+import csv
+import zlib
+import numpy as np
+from clsColorLUT import getLUT
+
+# used when no file is found, (name, R, G, B)
+basicColors = [('Black', 0, 0, 0), ('White', 255, 255, 255), ('Red', 255, 0, 0), ('Lime', 0, 255, 0),
+		('Blue', 0, 0, 255), ('Yellow', 255, 255, 0), ('Cyan', 0, 255, 255), ('Magenta', 255, 0, 255),
+		('Silver', 192, 192, 192), ('Gray', 128, 128, 128), ('Maroon', 128, 0, 0), ('Olive', 128, 128, 0),
+		('Green', 0, 128, 0), ('Purple', 128, 0, 128), ('Teal', 0, 128, 128), ('Navy', 0, 0, 128),
+		('Orange', 255, 165, 0), ('Brown', 165, 42, 42), ('Pink', 255, 192, 203)]
+
+class ColorNames:
+	"""Named colors, and the name of the nearest one for any color.
+	example of use:
+		cn = ColorNames.load('../colors.csv')
+		cn.name(250, 10, 20)              # 'Red' or similar
+		cn.names([(250,10,20), (0,0,0)])  # for (N,3) RGB colors
+		N = cn.nameImage(A)               # index of name for each pixel in BGR image A
+	"""
+	def __init__(self, names, rgb):
+		self.colorNames = list(names)
+		self.rgb = np.asarray(rgb, dtype=np.int16).reshape(-1, 3)
+		self._lut = None
+		return
+
+	@classmethod
+	def fromCSV(cls, fName):
+		"""Read file with lines color,color_name,hex,R,G,B (no header line)."""
+		(names, rgb) = ([], [])
+		with open(fName, newline='') as f:
+			for row in csv.reader(f):
+				if (len(row) >= 6):
+					names.append(row[1])
+					rgb.append([int(v) for v in row[3:6]])
+		return cls(names, rgb)
+
+	@classmethod
+	def load(cls, fName='../colors.csv'):
+		"""Read named colors from file, or use 'basicColors' if the file can not be read."""
+		try:
+			cn = cls.fromCSV(fName)
+			if len(cn.colorNames):
+				return cn
+		except (OSError, ValueError) as e:
+			print( f"ColorNames.load(): could not read {fName} ({e}), basic colors are used" )
+		return cls([c[0] for c in basicColors], [c[1:] for c in basicColors])
+
+	def nearest(self, colors, block=4096):
+		"""Return index (int array (N,)) of the nearest named color for each of the (N,3) RGB colors."""
+		X = np.asarray(colors, dtype=np.int16).reshape(-1, 3)
+		K = len(self.rgb)
+		index = np.empty(len(X), dtype=np.int32)
+		for i in range(0, len(X), block):
+			D = np.abs(X[i:i+block,None,:] - self.rgb[None,::-1,:]).sum(axis=2, dtype=np.int32)
+			index[i:i+block] = K - 1 - D.argmin(axis=1)   # reversed: last of equal distances
+		return index
+
+	def name(self, r, g, b):
+		"""Return name of the nearest named color, as get_Color_Name() in appImageViewer3.py."""
+		return self.colorNames[self.nearest((r, g, b))[0]]
+
+	def names(self, colors):
+		return [self.colorNames[k] for k in self.nearest(colors)]
+
+	def lut(self, bits=6, folder='luts'):
+		"""Return the look up table (BGR to name index), made (or loaded from folder) the first time."""
+		if (self._lut is None) or (self._lut.bits != bits):
+			key = zlib.crc32(self.rgb.tobytes() + '\n'.join(self.colorNames).encode())
+			def rule(A):   # A is BGR
+				return (self.nearest(A.reshape(-1, 3)[:,::-1]).reshape(A.shape[:2]), self.colorNames)
+			self._lut = getLUT(f"names{len(self.rgb)}_{key:08x}_", rule, bits=bits, folder=folder)
+		return self._lut
+
+	def nameImage(self, A, bits=6):
+		"""Return index of the (approximately, colors are quantized to 'bits') nearest named
+		color for each pixel in BGR image A.
+		"""
+		return self.lut(bits).classify(A)
+
+	def regionNames(self, A, top=3):
+		"""Return list of the 'top' most common (name, fraction) for the pixels in BGR image A.
+		Exact, each distinct color in A is compared to the named colors (no look up table),
+		so it is fast for a region (rectangle) but not for a large image with many colors.
+		"""
+		X = np.asarray(A, dtype=np.uint8).reshape(-1, A.shape[2] if (A.ndim == 3) else 1)
+		if (X.shape[1] < 3):
+			X = np.repeat(X[:,:1], 3, axis=1)   # gray
+		key = (X[:,0].astype(np.int32) << 16) | (X[:,1].astype(np.int32) << 8) | X[:,2]
+		(colors, counts) = np.unique(key, return_counts=True)
+		rgb = np.stack([colors & 255, (colors >> 8) & 255, colors >> 16], axis=1)
+		n = np.bincount(self.nearest(rgb), weights=counts, minlength=len(self.colorNames))
+		best = np.argsort(n)[::-1][:top]
+		return [(self.colorNames[k], round(float(n[k]/n.sum()), 4)) for k in best if (n[k] > 0)]
+
+	def __len__(self):
+		return len(self.colorNames)
+# end of class ColorNames
+
+def testAll(fName=''):
+	"""Simple function for testing the class in this file."""
+	import time
+	import tempfile
+	print("clsColorNames.py: testAll()  # test the class in this file")
+	t0 = time.perf_counter()
+	cn = ColorNames.load(fName) if fName else ColorNames.load('')
+	print( f"  {len(cn)} named colors loaded in {1000*(time.perf_counter()-t0):.1f} ms" )
+	t0 = time.perf_counter()
+	for i in range(100):
+		name = cn.name(250, 10, 20)
+	print( f"  name(250, 10, 20) = {name}, {1000*(time.perf_counter()-t0)/100:.3f} ms per query" )
+	rng = np.random.default_rng(1)
+	colors = rng.integers(0, 256, size=(1000, 3))
+	loop = []
+	for (R, G, B) in colors:   # as get_Color_Name(), but without pandas
+		d = np.abs(cn.rgb - (R, G, B)).sum(axis=1)
+		loop.append(np.flatnonzero(d == d.min())[-1])
+	print( f"  1000 colors, same as loop: {np.array_equal(cn.nearest(colors), loop)}" )
+	A = rng.integers(0, 256, size=(1500, 2000, 3), dtype=np.uint8)
+	t0 = time.perf_counter()
+	with tempfile.TemporaryDirectory() as folder:   # the saved table is removed at the end
+		cn.lut(6, folder=folder)
+	t1 = time.perf_counter()
+	N = cn.nameImage(A)
+	t2 = time.perf_counter()
+	print( f"  look up table in {t1-t0:.2f} s, 3 MP image named in {1000*(t2-t1):.0f} ms, {N.dtype.name}" )
+	print( f"  region names: {cn.regionNames(A[:50,:50])}" )
+	return
+
+if __name__ == '__main__':
+	testAll(sys.argv[1] if (len(sys.argv) > 1) else '')
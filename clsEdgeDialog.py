@@ -16,6 +16,7 @@
 import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QDialog, QLabel, 
 			QRadioButton, QPushButton, QButtonGroup, QFormLayout, QBoxLayout)
+from clsPresets import presetLine
 
 class EdgeDialog(QDialog):
 	""" A dialog widget for giving parameters to use in a function like
@@ -28,8 +29,10 @@ class EdgeDialog(QDialog):
 	The parent (p) should be a descendant of a QMainWindow (and QWidget), 
 	and parent (p) must have defined the following function
 		p.tryEdges(..)   as used in tryClicked() below (used even if no button for it!)
+	With presets (a Presets object) the values from last time are shown, and named
+	sets of values can be selected and saved, kind 'edges' with parameters k and s.
 	"""
-	def __init__(self, parent):
+	def __init__(self, parent, presets=None):
 		super().__init__(parent)
 		self.title = 'Edge dialog for making edge image'
 		self.setWindowTitle(self.title)
@@ -94,6 +97,9 @@ class EdgeDialog(QDialog):
 		btnLine.addStretch()
 		#btnLine.addWidget(tryButton)
 		layout.addRow(btnLine)
+		self.presets = presets
+		if presets is not None:
+			layout.addRow(presetLine(self, presets, 'edges'))
 		self.setLayout(layout)
 		return
 		
@@ -102,7 +108,20 @@ class EdgeDialog(QDialog):
 		valS = self.qbgS.checkedId()
 		return (valK,valS)
 		
+	def getParameters(self):
+		(valK,valS) = self.getKandS()
+		return {'k': valK, 's': valS}
+		
+	def setParameters(self, values):
+		for (group, name) in ((self.qbgK, 'k'), (self.qbgS, 's')):
+			button = group.button(int(values.get(name, 0)))
+			if button is not None:
+				button.setChecked(True)
+		return
+		
 	def okClicked(self):
+		if self.presets is not None:
+			self.presets.put('edges', 'last', self.getParameters())
 		self.accept()
 		return 
 		
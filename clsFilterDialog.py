@@ -19,6 +19,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction,
 			QDialog, QLabel, QSpinBox, QComboBox, 
 			QRadioButton, QPushButton, QButtonGroup, QFormLayout, QBoxLayout)
 import numpy as np
+from clsPresets import presetLine
 
 class FilterDialog(QDialog):
 	""" A dialog widget for giving parameters to use in a function like
@@ -31,8 +32,10 @@ class FilterDialog(QDialog):
 	The parent (p) should be a descendant of a QMainWindow (and QWidget), 
 	and parent (p) must have defined the following function
 		p.tryFilter(..)   as used in tryClicked() below
+	With presets (a Presets object) the values from last time are shown, and named
+	sets of values can be selected and saved, kind 'filter' with parameters n, ul, ur, ll, lr and s.
 	"""
-	def __init__(self, parent):
+	def __init__(self, parent, presets=None):
 		super().__init__(parent)
 		self.title = 'Filter dialog'
 		self.setWindowTitle(self.title)
@@ -142,6 +145,9 @@ class FilterDialog(QDialog):
 		btnLine.addStretch()
 		btnLine.addWidget(tryButton)
 		layout.addRow(btnLine)
+		self.presets = presets
+		if presets is not None:
+			layout.addRow(presetLine(self, presets, 'filter'))
 		self.setLayout(layout)
 		return
 		
@@ -158,7 +164,30 @@ class FilterDialog(QDialog):
 		valS = self.qbgS.checkedId()
 		return (H,valS)
 		
+	def getParameters(self):
+		boxes = (self.qcbUpperLeftValue, self.qcbUpperRightValue, self.qcbLowerLeftValue, self.qcbLowerRightValue)
+		values = {'n': self.qsbFiltSize.value()}
+		for (name, box) in zip(('ul', 'ur', 'll', 'lr'), boxes):
+			values[name] = self.vTab[box.currentIndex()]
+		values['s'] = self.qbgS.checkedId()
+		return values
+		
+	def setParameters(self, values):
+		boxes = (self.qcbUpperLeftValue, self.qcbUpperRightValue, self.qcbLowerLeftValue, self.qcbLowerRightValue)
+		self.qsbFiltSize.blockSignals(True)   # tryClicked() only when asked for
+		self.qsbFiltSize.setValue(int(values.get('n', self.qsbFiltSize.value())))
+		self.qsbFiltSize.blockSignals(False)
+		for (name, box) in zip(('ul', 'ur', 'll', 'lr'), boxes):
+			if name in values:   # the nearest value in the table
+				box.setCurrentIndex( int(np.argmin(np.abs(np.array(self.vTab) - values[name]))) )
+		button = self.qbgS.button(int(values.get('s', 0)))
+		if button is not None:
+			button.setChecked(True)
+		return
+		
 	def okClicked(self):
+		if self.presets is not None:
+			self.presets.put('filter', 'last', self.getParameters())
 		self.accept()
 		return 
 		
@@ -17,7 +17,8 @@ import sys
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, QFrame, QPushButton, 
-			QDialog, QLabel, QSlider, QSpinBox, QDoubleSpinBox, QBoxLayout)
+			QDialog, QLabel, QSlider, QSpinBox, QDoubleSpinBox, QBoxLayout, QFileDialog)
+from clsPresets import presetLine
 		# QRadioButton, QButtonGroup, , QGridLayout, QFormLayout
 
 class HoughCirclesDialog(QDialog):
@@ -34,8 +35,13 @@ class HoughCirclesDialog(QDialog):
 	The parent (p) should be a descendant of a QMainWindow (and QWidget), 
 	and parent (p) must have defined the following function
 		p.tryHoughCircles(..)   as used in tryClicked() below
+	The [Load..] button sets the best values from a table made by myHoughSweep.py
+	With presets (a Presets object) the values from last time are shown, rather than
+	default, and named sets of values can be selected and saved, kind 'circles'.
 	"""
-	def __init__(self, parent, title="", default=(2.0,40.0,100.0,60.0,20,60,20)):
+	parameterNames = ('dp', 'minDist', 'param1', 'param2', 'minRadius', 'maxRadius', 'maxCircles')
+	
+	def __init__(self, parent, title="", default=(2.0,40.0,100.0,60.0,20,60,20), presets=None):
 		"""Initialize the HoughCirclesDialog 
 		A title, type str, and 
 		a tuple or list with 6-7 initial (default) values may be given, 
@@ -120,7 +126,7 @@ class HoughCirclesDialog(QDialog):
 			if (i<4):
 				self.spinBoxes[i].setDecimals(1)
 		#
-		sliders = [ QSlider(Qt.Horizontal), QSlider(Qt.Horizontal), 
+		self.sliders = sliders = [ QSlider(Qt.Horizontal), QSlider(Qt.Horizontal), 
 		            QSlider(Qt.Horizontal), QSlider(Qt.Horizontal), 
 		            QSlider(Qt.Horizontal), QSlider(Qt.Horizontal), 
 		            QSlider(Qt.Horizontal) ]   
@@ -163,10 +169,14 @@ class HoughCirclesDialog(QDialog):
 		okButton.clicked.connect(self.okClicked)
 		cancelButton = QPushButton('Cancel')
 		cancelButton.clicked.connect(self.cancelClicked)
+		loadButton = QPushButton('Load..')
+		loadButton.setToolTip('Load best parameters from a table made by myHoughSweep.py')
+		loadButton.clicked.connect(self.loadClicked)
 		btnLine = QBoxLayout(1)
 		btnLine.addWidget(okButton)
 		btnLine.addWidget(cancelButton)
 		btnLine.addStretch()
+		btnLine.addWidget(loadButton)
 		btnLine.addWidget(tryButton)
 		#
 		layout = QBoxLayout(QBoxLayout.TopToBottom)
@@ -179,6 +189,9 @@ class HoughCirclesDialog(QDialog):
 		#
 		layout.addWidget(horizontalLine2)
 		layout.addLayout(btnLine)
+		self.presets = presets
+		if presets is not None:
+			layout.addLayout(presetLine(self, presets, 'circles'))
 		#
 		self.setLayout(layout)
 		return
@@ -249,6 +262,8 @@ class HoughCirclesDialog(QDialog):
 		return
 		
 	def okClicked(self):
+		if self.presets is not None:
+			self.presets.put('circles', 'last', self.getParameters())
 		self.accept()
 		return 
 		
@@ -256,6 +271,42 @@ class HoughCirclesDialog(QDialog):
 		self.reject()
 		return 
 	
+	def getParameters(self):
+		return dict(zip(self.parameterNames, (s.value() for s in self.spinBoxes)))
+		
+	def setParameters(self, values):
+		self.setValues( tuple(values.get(name, s.value()) for (name, s) in zip(self.parameterNames, self.spinBoxes)) )
+		return
+		
+	def setValues(self, t):
+		"""Set the 7 (or 6) values in tuple 't' in the spin boxes, and move the sliders."""
+		for i in range(min(len(t), len(self.spinBoxes))):
+			self.spinBoxes[i].setValue(t[i] if (i < 4) else int(t[i]))
+			relVal = ((self.spinBoxes[i].value()   - self.spinBoxes[i].minimum()) / 
+					  (self.spinBoxes[i].maximum() - self.spinBoxes[i].minimum()))
+			self.sliders[i].blockSignals(True)   # do not change the value set
+			self.sliders[i].setSliderPosition( int(200*relVal) )
+			self.sliders[i].blockSignals(False)
+		return
+		
+	def loadClicked(self):
+		"""A slot for the [Load..] button, set the values from line 1 (best) in a CSV table
+		written by myHoughSweep.py, and try them.
+		"""
+		from myHoughSweep import loadHoughParameters
+		(fName, _) = QFileDialog.getOpenFileName(self, "Open ranked HoughCircles parameter table", "",
+				"CSV files (*.csv);;All files (*.*)")
+		if fName:
+			try:
+				t = loadHoughParameters(fName)
+			except (OSError, ValueError, KeyError, IndexError) as e:
+				print( f"HoughCirclesDialog.loadClicked(): could not load {fName}: {e}" )
+				return
+			print( f"HoughCirclesDialog.loadClicked(): {t} from {fName}" )
+			self.setValues(t)
+			self.tryClicked()
+		return 
+	
 	def tryClicked(self):
 		"""A slot for the [Try it] button in the dialog window, starts parent().tryHoughCircles(t)"""
 		dp = self.spinBoxes[0].value()
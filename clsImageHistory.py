@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsImageHistory.py
+#
+#  The class ImageHistory, multi-level undo and redo of numpy images
+#
+#  Each step back (undo) or forward (redo) is a snapshot of the numpy image.
+#  The snapshots are kept as they are, so a push is only a copy. When the total
+#  size is larger than the byte budget, the least recently used snapshots are
+#  compressed to PNG in memory (lossless), and if that is not enough they are
+#  removed.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsImageHistory.py   # test
+# Example on how to use file in appImageViewer1.py:
+#   from clsImageHistory import ImageHistory
+#   self.history = ImageHistory(maxBytes=512*2**20)
+#   self.history.push(self.npImage, 'to Gray')   # before an edit
+#   B = self.history.undo(self.npImage)          # the image to show, or None
+
+import sys
+import numpy as np
+import cv2
+
+class _Snapshot:
+	"""One image in the history, as numpy array or as PNG bytes."""
+	def __init__(self, A, label, tick):
+		self.data = A
+		self.shape = A.shape
+		self.dtype = A.dtype
+		self.label = label
+		self.tick = tick      # when it was last used, for LRU removal
+		self.compressed = False
+		self.tried = False    # compress() is done only once
+
+	@property
+	def nbytes(self):
+		return len(self.data) if self.compressed else self.data.nbytes
+
+	def compress(self, level=1):
+		"""Store image as PNG bytes, if PNG can hold it (uint8 or uint16, 1, 3 or 4 channels)."""
+		if self.tried or (self.dtype not in (np.uint8, np.uint16)):
+			return
+		self.tried = True
+		if (len(self.shape) == 3) and (self.shape[2] not in (1, 3, 4)):
+			return
+		(ok, buf) = cv2.imencode('.png', self.data, [cv2.IMWRITE_PNG_COMPRESSION, level])
+		if ok and (buf.nbytes < self.data.nbytes):
+			self.data = buf.tobytes()
+			self.compressed = True
+		return
+
+	def array(self):
+		"""Return the image as a (new) numpy array."""
+		if not self.compressed:
+			return self.data
+		A = cv2.imdecode(np.frombuffer(self.data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+		return A.reshape(self.shape)   # (h,w,1) is decoded as (h,w)
+# end of class _Snapshot
+
+class ImageHistory:
+	"""Undo and redo stacks of numpy images with a byte budget.
+	example of use:
+		h = ImageHistory(maxBytes=256*2**20, rawCount=2)
+		h.push(A, 'to Edges')    # A is the image before the edit, it is copied
+		B = h.undo(current)      # returns the previous image, current is put on redo stack
+		C = h.redo(B)            # and back again
+		h.discard()              # remove last push, i.e. the edit was cancelled
+	All snapshots are kept uncompressed while the total size is within 'maxBytes'.
+	Above it, the older snapshots are compressed, least recently used first, then
+	the 'rawCount' newest ones (on each stack), which are kept uncompressed as long
+	as possible so that one or two undo steps are instant. If it is still above,
+	snapshots are removed, least recently used first, but the newest undo snapshot
+	is always kept.
+	"""
+	def __init__(self, maxBytes=512*2**20, rawCount=2, compressLevel=1):
+		self.maxBytes = maxBytes
+		self.rawCount = max(1, rawCount)
+		self.compressLevel = compressLevel
+		self.undoStack = []   # of _Snapshot, newest last
+		self.redoStack = []   # of _Snapshot, newest last
+		self.tick = 0
+		self.nofRemoved = 0   # removed because of the budget
+
+	def _newSnapshot(self, A, label, copy):
+		self.tick += 1
+		return _Snapshot(np.array(A, copy=True) if copy else A, label, self.tick)
+
+	def _applyBudget(self):
+		"""Compress, and then remove, least recently used snapshots until total size is within the budget."""
+		if (self.nbytes > self.maxBytes):
+			newest = self.undoStack[-self.rawCount:] + self.redoStack[-self.rawCount:]
+			older = [s for s in self.undoStack + self.redoStack if s not in newest]
+			for s in sorted(older, key=lambda s: s.tick) + sorted(newest, key=lambda s: s.tick):
+				s.compress(self.compressLevel)
+				if (self.nbytes <= self.maxBytes):
+					break
+		while (self.nbytes > self.maxBytes):
+			candidates = []
+			if (len(self.undoStack) > 1):
+				candidates.append(self.undoStack)
+			if (len(self.redoStack) > 0):
+				candidates.append(self.redoStack)
+			if (len(candidates) == 0):
+				break
+			# the oldest element on each stack is the one used longest ago
+			stack = min(candidates, key=lambda st: st[0].tick)
+			del stack[0]
+			self.nofRemoved += 1
+		return
+
+	@property
+	def nbytes(self):
+		"""Total number of bytes used by the snapshots."""
+		return sum(s.nbytes for s in self.undoStack) + sum(s.nbytes for s in self.redoStack)
+
+	def canUndo(self):
+		return (len(self.undoStack) > 0)
+
+	def canRedo(self):
+		return (len(self.redoStack) > 0)
+
+	def undoLabel(self):
+		return self.undoStack[-1].label if self.undoStack else ''
+
+	def redoLabel(self):
+		return self.redoStack[-1].label if self.redoStack else ''
+
+	def push(self, A, label='', copy=True):
+		"""Store image A, the image before an edit, the redo stack is cleared.
+		A is copied unless 'copy' is False, then A must not be changed later.
+		"""
+		if (not isinstance(A, np.ndarray)) or (A.size == 0):
+			return
+		self.undoStack.append(self._newSnapshot(A, label, copy))
+		self.redoStack = []
+		self._applyBudget()
+		return
+
+	def discard(self):
+		"""Remove the last pushed image, used when an edit is cancelled."""
+		if self.undoStack:
+			del self.undoStack[-1]
+		return
+
+	def undo(self, current, label=''):
+		"""Return the previous image (or None), 'current' image is put on the redo stack.
+		'current' is not copied, the caller should not change it in place later.
+		"""
+		if not self.undoStack:
+			return None
+		s = self.undoStack.pop()
+		if isinstance(current, np.ndarray) and (current.size > 0):
+			self.redoStack.append(self._newSnapshot(current, label or s.label, False))
+		A = s.array()
+		self._applyBudget()
+		return A
+
+	def redo(self, current, label=''):
+		"""Return the next image (or None), 'current' image is put on the undo stack."""
+		if not self.redoStack:
+			return None
+		s = self.redoStack.pop()
+		if isinstance(current, np.ndarray) and (current.size > 0):
+			self.undoStack.append(self._newSnapshot(current, label or s.label, False))
+		A = s.array()
+		self._applyBudget()
+		return A
+
+	def clear(self):
+		self.undoStack = []
+		self.redoStack = []
+		return
+
+	def __str__(self):
+		nc = sum(s.compressed for s in self.undoStack + self.redoStack)
+		return (f"ImageHistory: {len(self.undoStack)} undo and {len(self.redoStack)} redo images," +
+				f" {nc} compressed, {self.nbytes/2**20:.1f} of {self.maxBytes/2**20:.0f} MB used")
+# end of class ImageHistory
+
+def testAll():
+	"""Simple function for testing the class in this file."""
+	import time
+	print("clsImageHistory.py: testAll()  # test the class in this file")
+	(x, y) = np.meshgrid(np.arange(2000), np.arange(1500))
+	A = np.dstack(((x//8) % 256, (y//6) % 256, ((x+y)//16) % 256)).astype(np.uint8)
+	A += np.random.default_rng(1).integers(0, 16, size=A.shape, dtype=np.uint8)   # camera noise
+	h = ImageHistory(maxBytes=30*2**20, rawCount=2)
+	images = [A]
+	t0 = time.perf_counter()
+	for i in range(8):   # 8 edits of a 9 MB image
+		h.push(images[-1], f"edit {i}")
+		images.append(255 - images[-1] if (i % 2) else images[-1] // 2)
+	print( f"  8 pushes took {1000*(time.perf_counter()-t0):.0f} ms, {h}, {h.nofRemoved} removed" )
+	cur = images[-1]
+	n = 0
+	while h.canUndo():
+		k = len(images) - 2 - n   # the oldest are removed
+		cur = h.undo(cur)
+		n += 1
+		print( f"  undo {n} gives image {k}: {np.array_equal(cur, images[k])}" )
+	while h.canRedo():
+		cur = h.redo(cur)
+	print( f"  after redo all, same as last edit: {np.array_equal(cur, images[-1])}, {h}" )
+	# a 12 MP camera image, pushes within the (default) budget should only copy
+	B = np.random.default_rng(2).integers(0, 256, size=(3000, 4000, 3), dtype=np.uint8)
+	h = ImageHistory()
+	times = []
+	for i in range(6):
+		t0 = time.perf_counter()
+		h.push(B, f"edit {i}")
+		times.append(1000*(time.perf_counter() - t0))
+	print( f"  12 MP image, 6 pushes: {', '.join(f'{t:.0f}' for t in times)} ms, {h}" )
+	return
+
+if __name__ == '__main__':
+	testAll()
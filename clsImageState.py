@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsImageState.py
+#
+#  The class ImageState, derived representations of one numpy image
+#
+#  Gray scale, BGR, HSV, float32 and histogram versions of the active image
+#  are made when first asked for, and then kept until the image changes.
+#  Each new image (a call to set()) gives a new version number and an empty cache.
+#  Downscaled versions, a preview pyramid, are cached the same way, see scaled().
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsImageState.py   # test
+# Example on how to use file in appImageViewer1.py:
+#   from clsImageState import ImageState
+#   self.imState = ImageState()
+#   self.imState.set(self.npImage)   # when npImage is changed
+#   G = self.imState.gray()          # computed only once for each image version
+
+import sys
+import numpy as np
+import cv2
+
+def _toGray(A):
+	if (len(A.shape) == 2):
+		return A
+	if (A.shape[2] == 1):
+		return A[:,:,0]
+	if (A.shape[2] == 4):
+		return cv2.cvtColor(A, cv2.COLOR_BGRA2GRAY)
+	return cv2.cvtColor(A, cv2.COLOR_BGR2GRAY)
+
+def _toBGR(A):
+	if (len(A.shape) == 2) or (A.shape[2] == 1):
+		return cv2.cvtColor(A, cv2.COLOR_GRAY2BGR)
+	if (A.shape[2] == 4):
+		return cv2.cvtColor(A, cv2.COLOR_BGRA2BGR)
+	return A
+
+def _histogram(G):
+	if (G.dtype == np.uint8):
+		return cv2.calcHist([G], [0], None, [256], [0, 256]).ravel()
+	return np.histogram(G, bins=256)[0].astype(np.float32)
+
+class ImageState:
+	"""Cache of derived representations of an image A (numpy array as in OpenCV,
+	2D gray or 3D BGR or BGRA). The cached arrays are read-only, as they are shared
+	by all users, copy them if they are to be changed.
+	example of use:
+		s = ImageState(A)
+		G = s.gray()         # cv2.cvtColor(..) is done here
+		G = s.gray()         # and not here
+		h = s.histogram()    # of gray, uses the cached gray image
+		s.set(B)             # new image, new version, cache is emptied
+	"""
+	# name: function making it from the state, gray and histogram can be used by others
+	makers = {
+		'image':       lambda s: s.A,
+		'gray':        lambda s: _toGray(s.A),
+		'bgr':         lambda s: _toBGR(s.A),
+		'hsv':         lambda s: cv2.cvtColor(s.get('bgr'), cv2.COLOR_BGR2HSV),
+		'float32':     lambda s: s.A.astype(np.float32),
+		'grayFloat32': lambda s: s.get('gray').astype(np.float32),
+		'histogram':   lambda s: _histogram(s.get('gray')),
+		}
+
+	def __init__(self, A=None):
+		self.version = 0
+		self.nofMade = 0   # number of representations made, i.e. not found in cache
+		self.set(A)
+
+	def set(self, A):
+		"""Set a new image A (may be the same array, changed in place), the cache is emptied."""
+		self.A = A if isinstance(A, np.ndarray) else np.array([])
+		self.version += 1
+		self.cache = {}
+		return
+
+	def isFor(self, A):
+		"""True if this state is for the array A (the same object)."""
+		return (self.A is A)
+
+	def get(self, name):
+		"""Return the representation 'name' (a key in ImageState.makers), made only once."""
+		if name not in self.cache:
+			if (self.A.size == 0):
+				return self.A
+			X = self.makers[name](self)
+			if np.may_share_memory(X, self.A):   # not a copy, do not make self.A read-only
+				X = X.view()
+			X.flags.writeable = False
+			self.cache[name] = X
+			self.nofMade += 1
+		return self.cache[name]
+
+	def scaled(self, name='image', scale=0.5):
+		"""Return representation 'name' downscaled by 'scale' (< 1), cv2.INTER_AREA is used.
+		Each level is made once, ex. the pyramid for a preview: [s.scaled('gray', f) for f in (0.25, 0.5)]
+		"""
+		X = self.get(name)
+		if (scale >= 1.0) or (X.size == 0):
+			return X
+		key = f"{name}@{scale:g}"
+		if key not in self.cache:
+			size = (max(1, int(X.shape[1]*scale + 0.5)), max(1, int(X.shape[0]*scale + 0.5)))
+			Y = cv2.resize(X, size, interpolation=cv2.INTER_AREA)
+			Y.flags.writeable = False
+			self.cache[key] = Y
+			self.nofMade += 1
+		return self.cache[key]
+
+	def gray(self):
+		return self.get('gray')
+
+	def bgr(self):
+		return self.get('bgr')
+
+	def hsv(self):
+		return self.get('hsv')
+
+	def float32(self):
+		return self.get('float32')
+
+	def grayFloat32(self):
+		return self.get('grayFloat32')
+
+	def histogram(self):
+		"""Return the 256 bin histogram of the gray scale image, float32 counts."""
+		return self.get('histogram')
+
+	def __str__(self):
+		return (f"ImageState: version {self.version}, image shape {str(self.A.shape)}," +
+				f" cached {list(self.cache)}")
+# end of class ImageState
+
+def testAll():
+	"""Simple function for testing the class in this file."""
+	import time
+	print("clsImageState.py: testAll()  # test the class in this file")
+	A = np.random.default_rng(1).integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8)
+	s = ImageState(A)
+	for i in range(3):
+		t0 = time.perf_counter()
+		(G, H, h) = (s.gray(), s.hsv(), s.histogram())
+		print( f"  round {i}: gray, hsv and histogram in {1000*(time.perf_counter()-t0):6.2f} ms, made {s.nofMade}" )
+	print( f"  gray is read-only: {not G.flags.writeable},  A is still writeable: {A.flags.writeable}" )
+	print( f"  pyramid for preview: {[s.scaled('gray', f).shape for f in (0.25, 0.5, 1.0)]}, {s}" )
+	s.set(A[:,:,0])
+	print( f"  {s},  gray is the image itself: {np.shares_memory(s.gray(), A)}" )
+	return
+
+if __name__ == '__main__':
+	testAll()
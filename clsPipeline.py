@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsPipeline.py
+#
+#  The class Pipeline, capture, process and save camera images in threads
+#
+#  The images are captured by Acquisition (clsAcquisition.py), its thread waits for each
+#  image in live video, with trigger this is one image for each hardware trigger.
+#  The pipeline thread copies each frame and releases it at once, so the camera always
+#  has a free image memory, and gives the copy to a pool of worker threads that run the
+#  analysis, process(image, info), and to a writer thread that saves it (cv2.imwrite()).
+#  If the workers (or the writer) already have 'maxPending' images waiting, the new image
+#  is not processed (or not saved) but counted as skipped, nothing in the capture path
+#  waits for encoding, analysis or painting.
+#  The GUI gets only the newest result: the Qt signal 'resultReady' is sent when a result
+#  is ready and the previous signal has been taken by latest(), which gives the newest
+#  result. So there is at most one signal waiting in the GUI event queue, and results
+#  that are older than the newest one (workers may finish out of order) are not given.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsPipeline.py   # test with simulated camera (myFakeUeye.py)
+# Example on how to use file in appImageViewer4.py:
+#   from clsPipeline import Pipeline
+#   self.pipeline = Pipeline(self.cam, process=self.analyseImage, workers=2,
+#                            saveName='triggered_image_{stamp}.jpg', parent=self)
+#   self.pipeline.resultReady.connect(self.showResult)   # showResult() uses self.pipeline.latest()
+#   self.pipeline.start()
+#   self.pipeline.stop()
+
+import sys
+import time
+import datetime
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+if __name__ == '__main__':
+	import myFakeUeye
+	myFakeUeye.install()   # the test uses the simulated camera
+from PyQt5.QtCore import QObject, pyqtSignal
+from clsAcquisition import Acquisition
+
+class Pipeline(QObject):
+	"""Capture (Acquisition), process (worker threads) and save (writer thread) camera images.
+	example of use:
+		p = Pipeline(cam, process=analyse, workers=2, saveName='image_{number:05d}.jpg')
+		p.resultReady.connect(self.showResult)   # in showResult(): result = p.latest()
+		p.start()
+		p.stop()
+	process(image, info) is run in a worker thread, it should not use the GUI, image is a copy
+	(in the camera color mode, RGB for clsCamera.Camera), info is dict with 'number' (frame),
+	'time' (perf_counter when captured), 'interval' (seconds since previous frame, None for
+	the first) and 'stamp' (datetime). It returns a dict (or None) that is added to the result,
+	the result is info and 'image' and 'seconds' (time used by process()).
+	saveName is a format string with fields number, stamp (as 20241018_101530_123456) and
+	time, '' for no saving, saveColor is the cv2.cvtColor() code used before saving (or None).
+	"""
+	resultReady = pyqtSignal()
+
+	def __init__(self, camera, process=None, workers=2, buffer_count=4, maxPending=0,
+			saveName='', saveColor=cv2.COLOR_RGB2BGR, parent=None):
+		super().__init__(parent)
+		self.acquisition = Acquisition(camera, buffer_count=buffer_count)
+		self.process = process
+		self.workers = workers
+		self.maxPending = maxPending if maxPending else 2*workers
+		self.saveName = saveName
+		self.saveColor = saveColor
+		self.saveQueue = queue.Queue(maxsize=self.maxPending)
+		self.pending = threading.Semaphore(self.maxPending)   # images given to the workers, not done
+		self.lock = threading.Lock()   # for the result
+		self._latest = None
+		self._newest = -1          # frame number of the newest result
+		self._signalled = False    # a signal is sent, and latest() is not called yet
+		self.pool = None
+		self.threads = []
+		self.running = False
+		(self.frameCount, self.doneCount, self.skipCount) = (0, 0, 0)
+		(self.savedCount, self.saveSkipCount, self.errorCount) = (0, 0, 0)
+
+	def start(self):
+		"""Start the worker threads, the writer thread, capture (live video) and the pipeline thread."""
+		self.running = True
+		self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='PipelineWorker')
+		self.threads = [threading.Thread(target=self.run, name='Pipeline', daemon=True)]
+		if self.saveName:
+			self.threads.append(threading.Thread(target=self.write, name='PipelineWriter', daemon=True))
+		self.acquisition.start()
+		for thread in self.threads:
+			thread.start()
+		return
+
+	def stop(self):
+		"""Stop capture, the images already given to the workers and the writer are finished."""
+		self.running = False
+		for thread in self.threads:   # the writer saves the rest of its queue first
+			thread.join()
+		self.threads = []
+		self.acquisition.stop()
+		if self.pool is not None:
+			self.pool.shutdown(wait=True)
+			self.pool = None
+		return
+
+	def run(self):
+		"""The pipeline thread, copy and release each frame, give the copy to a worker and the writer."""
+		previous = None
+		while self.running:
+			frame = self.acquisition.get(timeout=0.1)
+			if frame is None:
+				continue
+			with frame:
+				image = frame.copy()
+			info = {'number': frame.number, 'time': frame.timestamp, 'stamp': datetime.datetime.now(),
+					'interval': None if (previous is None) else frame.timestamp - previous}
+			previous = frame.timestamp
+			self.frameCount += 1
+			if self.saveName:
+				try:
+					self.saveQueue.put_nowait((image, info))
+				except queue.Full:
+					self.saveSkipCount += 1
+			if self.pending.acquire(blocking=False):
+				self.pool.submit(self.work, image, info)
+			else:   # the workers do not keep up
+				self.skipCount += 1
+		return
+
+	def work(self, image, info):
+		"""Run in a worker thread, process the image and keep the result if it is the newest."""
+		try:
+			t0 = time.perf_counter()
+			result = dict(info, image=image)
+			if self.process is not None:
+				result.update(self.process(image, info) or {})
+			result['seconds'] = time.perf_counter() - t0
+		except Exception as e:
+			self.errorCount += 1
+			print( f"Pipeline: frame {info['number']} failed, {type(e).__name__}: {e}" )
+			return
+		finally:
+			self.pending.release()
+		with self.lock:
+			self.doneCount += 1
+			if (result['number'] < self._newest):   # a newer frame is done already
+				return
+			(self._latest, self._newest) = (result, result['number'])
+			signal = not self._signalled
+			self._signalled = True
+		if signal:
+			self.resultReady.emit()
+		return
+
+	def latest(self):
+		"""Return the newest result (dict), or None if there is no new result since the last call."""
+		with self.lock:
+			(result, self._latest, self._signalled) = (self._latest, None, False)
+		return result
+
+	def write(self):
+		"""The writer thread, save the images in the queue, until stopped and the queue is empty."""
+		while self.running or not self.saveQueue.empty():
+			try:
+				(image, info) = self.saveQueue.get(timeout=0.1)
+			except queue.Empty:
+				continue
+			fName = self.saveName.format(number=info['number'], time=info['time'],
+					stamp=info['stamp'].strftime('%Y%m%d_%H%M%S_%f'))
+			try:
+				B = image if (self.saveColor is None) else cv2.cvtColor(image, self.saveColor)
+				ok = cv2.imwrite(fName, B)
+			except cv2.error as e:
+				(ok, fName) = (False, f"{fName} ({e})")
+			if ok:
+				self.savedCount += 1
+			else:
+				print( f"Pipeline: could not save {fName}" )
+		return
+
+	def __str__(self):
+		return (f"Pipeline: {self.frameCount} frames, {self.doneCount} processed, {self.skipCount} not processed, " +
+				f"{self.savedCount} saved, {self.saveSkipCount} not saved, {self.errorCount} errors; {self.acquisition}")
+# end class Pipeline
+
+def testAll():
+	"""Simple function for testing the class in this file, with the simulated camera triggered
+	at 100 Hz, processing that takes 15 ms and a GUI that uses 50 ms to show each result.
+	"""
+	import os
+	import tempfile
+	from PyQt5.QtCore import QCoreApplication, QTimer
+	from pyueye import ueye
+	if not hasattr(ueye, 'frameInfo'):
+		print("clsPipeline.py: testAll() needs the simulated camera, run it as: python clsPipeline.py")
+		return
+	from clsCamera import Camera
+	print("clsPipeline.py: testAll()  # test the class in this file")
+	app = QCoreApplication(sys.argv)
+	ueye.configure(fps=200, sensor=(1280, 720), triggers=0.01)
+	cam = Camera(0)
+	cam.init(width=1280, height=720, trigger=True)
+	def process(image, info):
+		time.sleep(0.015)
+		return {'mean': float(image[::8, ::8].mean())}
+	with tempfile.TemporaryDirectory() as folder:   # removed with the files at the end
+		p = Pipeline(cam, process=process, workers=2, saveName=os.path.join(folder, 'image_{number:05d}.jpg'))
+		shown = []
+		def showResult():
+			result = p.latest()
+			if result is not None:
+				shown.append(result['number'])
+				time.sleep(0.05)   # slow painting
+		p.resultReady.connect(showResult)
+		p.start()
+		QTimer.singleShot(1000, app.quit)
+		app.exec_()
+		p.stop()
+		stat = ueye.statistics(cam.handle())
+		print( f"  {p}" )
+		print( f"  shown {len(shown)} results: {shown[:8]} .., in order: {shown == sorted(shown)}" )
+		print( f"  camera: {stat['frames']} frames, {stat['lost']} lost, {len(os.listdir(folder))} files saved" )
+	cam.exit()
+	ueye.configure(triggers=0.0)
+	return
+
+if __name__ == '__main__':
+	testAll()
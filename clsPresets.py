@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsPresets.py
+#
+#  The class Presets, named parameter sets for the processing dialogs
+#
+#  The parameters are stored in a JSON file, one file for each image source
+#  (camera, light setup, image folder ..), ex. presets/dice.json is
+#    {"source": "dice",
+#     "presets": {"edges":   {"last": {"k": 3, "s": 5}, "sharp": {"k": 3, "s": 1}},
+#                 "circles": {"last": {"dp": 2.0, "minDist": 40.0, ...}}}}
+#  The kinds are the operation names in myImageOps.operations, and the parameters
+#  are the arguments of the operation, so that the batch pipeline can use them:
+#    edges   EdgeDialog            k, s
+#    filter  FilterDialog          n, ul, ur, ll, lr, s
+#    binary  ThresholdDialog       t
+#    resize  ResizeDialog          w, h, p
+#    circles HoughCirclesDialog    dp, minDist, param1, param2, minRadius, maxRadius, maxCircles
+#  The preset 'last' is the values used the last time the dialog was accepted (OK),
+#  and they are the values shown when the dialog is opened again.
+#  presetLine() makes a line (combo box and button) for a dialog to select and save presets.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsPresets.py   # test
+# Example on how to use file in appImageViewer1.py:
+#   from clsPresets import Presets
+#   self.presets = Presets(source='dice')   # file presets/dice.json
+#   d = EdgeDialog(parent=self, presets=self.presets)
+# Example on how to use file in appBatchImages.py:
+#   steps = Presets(source='dice').fillSteps(ops.parsePipeline("gray -> edges -> otsu"), name='sharp')
+
+import sys
+import os
+import json
+import copy
+
+class Presets:
+	"""Named parameter sets, for each kind (operation), stored in a JSON file.
+	example of use:
+		p = Presets(source='dice')           # or Presets(fName='my.json')
+		p.put('edges', 'sharp', {'k': 3, 's': 1})   # and saved in the file
+		v = p.get('edges', 'sharp')          # a copy, {'k': 3, 's': 1}
+		v = p.get('binary', 'last', {'t': 0})   # default if not found
+		names = p.names('edges')             # ['sharp']
+	"""
+	def __init__(self, source='default', fName='', folder='presets'):
+		self.source = source
+		self.fName = fName if fName else os.path.join(folder, f"{source}.json")
+		self.data = {}   # kind: {name: {parameter: value}}
+		self.load()
+
+	def load(self):
+		"""Read the presets from the file, an empty set if the file does not exist."""
+		self.data = {}
+		if not os.path.isfile(self.fName):
+			return
+		try:
+			with open(self.fName) as f:
+				d = json.load(f)
+			self.data = d.get('presets', {})
+		except (OSError, ValueError) as e:
+			print( f"Presets.load(): could not read {self.fName}: {e}" )
+		return
+
+	def save(self):
+		"""Write the presets to the file, a temporary file is written first so it is never half written."""
+		folder = os.path.dirname(self.fName)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		tmpName = self.fName + '.tmp'
+		try:
+			with open(tmpName, 'w') as f:
+				json.dump({'source': self.source, 'presets': self.data}, f, indent=1)
+			os.replace(tmpName, self.fName)
+		except OSError as e:
+			print( f"Presets.save(): could not write {self.fName}: {e}" )
+		return
+
+	def kinds(self):
+		return list(self.data)
+
+	def names(self, kind):
+		"""Names of the presets for 'kind', 'last' first (if it is there)."""
+		names = list(self.data.get(kind, {}))
+		return sorted(names, key=lambda name: (name != 'last', name))
+
+	def get(self, kind, name='last', default=None):
+		"""Return (a copy of) preset 'name' for 'kind', or 'default' if there is none."""
+		values = self.data.get(kind, {}).get(name)
+		return copy.deepcopy(values) if (values is not None) else default
+
+	def put(self, kind, name, values, save=True):
+		"""Store 'values', a dict of parameters (numbers, or lists of numbers), as preset 'name' for 'kind'."""
+		self.data.setdefault(kind, {})[name] = copy.deepcopy(values)
+		if save:
+			self.save()
+		return
+
+	def remove(self, kind, name, save=True):
+		if name in self.data.get(kind, {}):
+			del self.data[kind][name]
+			if save:
+				self.save()
+		return
+
+	def fillSteps(self, steps, name='last'):
+		"""Return the pipeline steps, as from myImageOps.parsePipeline(), where the arguments not
+		given in a step are taken from preset 'name' for the operation (if it is there).
+		"""
+		filled = []
+		for (op, kwargs) in steps:
+			values = self.get(op, name, {})
+			values.update(kwargs)   # arguments given in the pipeline are used
+			filled.append((op, values))
+		return filled
+
+	def __str__(self):
+		return (f"Presets: source '{self.source}' in {self.fName}, " +
+				', '.join(f"{kind} {self.names(kind)}" for kind in self.data))
+# end of class Presets
+
+def presetLine(dialog, presets, kind):
+	"""Return a line (layout) with a combo box to select a preset, and a button to save
+	the values in 'dialog' as a named preset. 'dialog' must have the methods
+	getParameters(), giving a dict, and setParameters(values), and tryClicked() is used if
+	it is there. The values in preset 'last' are set in the dialog.
+	"""
+	from PyQt5.QtWidgets import QBoxLayout, QComboBox, QLabel, QPushButton, QInputDialog
+	combo = QComboBox()
+	combo.addItems(presets.names(kind))
+	combo.setMinimumWidth(120)
+	def selected(name):
+		values = presets.get(kind, name)
+		if values is not None:
+			dialog.setParameters(values)
+			if hasattr(dialog, 'tryClicked'):
+				dialog.tryClicked()
+		return
+	def saveClicked():
+		(name, ok) = QInputDialog.getText(dialog, "Save preset", f"Name for these {kind} parameters ({presets.source}):")
+		name = name.strip()
+		if ok and name:
+			presets.put(kind, name, dialog.getParameters())
+			combo.clear()
+			combo.addItems(presets.names(kind))
+			combo.setCurrentText(name)
+		return
+	combo.activated[str].connect(selected)
+	saveButton = QPushButton('Save as..')
+	saveButton.clicked.connect(saveClicked)
+	line = QBoxLayout(QBoxLayout.LeftToRight)
+	line.addWidget(QLabel(f"Preset ({presets.source}): "))
+	line.addWidget(combo)
+	line.addWidget(saveButton)
+	line.addStretch()
+	values = presets.get(kind, 'last')
+	if values is not None:
+		dialog.setParameters(values)
+	return line
+
+def testAll():
+	"""Simple function for testing the class in this file."""
+	import tempfile
+	import myImageOps as ops
+	print("clsPresets.py: testAll()  # test the class in this file")
+	with tempfile.TemporaryDirectory() as folder:
+		fName = os.path.join(folder, 'dice.json')
+		p = Presets(source='dice', fName=fName)
+		p.put('edges', 'last', {'k': 3, 's': 5})
+		p.put('edges', 'sharp', {'k': 3, 's': 1})
+		p.put('circles', 'eyes', {'dp': 2.0, 'minDist': 40.0, 'param1': 100.0, 'param2': 60.0,
+				'minRadius': 20, 'maxRadius': 60, 'maxCircles': 20})
+		q = Presets(source='dice', fName=fName)   # read from file
+	print( f"  {q}" )
+	steps = ops.parsePipeline("gray -> edges -> otsu")
+	print( f"  sharp: {ops.pipelineText(q.fillSteps(steps, 'sharp'))}" )
+	print( f"  last:  {ops.pipelineText(q.fillSteps(steps))}" )
+	steps = ops.parsePipeline("gray -> edges(s=9) -> otsu")   # s given in pipeline is used
+	print( f"  sharp: {ops.pipelineText(q.fillSteps(steps, 'sharp'))}" )
+	print( f"  eyes:  {ops.pipelineText(q.fillSteps(ops.parsePipeline('circles'), 'eyes'))}" )
+	return
+
+if __name__ == '__main__':
+	testAll()
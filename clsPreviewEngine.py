@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/clsPreviewEngine.py
+#
+#  The class PreviewEngine, computes previews in a worker thread
+#
+#  The dialogs (EdgeDialog, FilterDialog, ThresholdDialog, HoughCirclesDialog)
+#  call parent().try..() for every change of a slider or a button. Here the
+#  try..() method only submits a job, a function and its arguments, and
+#  returns at once, so the GUI is not blocked. The worker thread always takes
+#  the newest job, older jobs that are not started are dropped, and results
+#  of jobs that are outdated when they finish are not sent. The result is
+#  sent by the Qt signal 'resultReady', which Qt delivers in the GUI thread.
+#  submitProgressive() first runs the job on a small (coarse) version of the
+#  image, and when no new job has been submitted for a moment (idle) the same
+#  job is run on larger versions, ending with full resolution.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python clsPreviewEngine.py   # test
+# Example on how to use file in appImageViewer1.py:
+#   from clsPreviewEngine import PreviewEngine
+#   self.preview = PreviewEngine(parent=self)
+#   self.preview.resultReady.connect(self.showPreview)
+#   self.preview.submit(ops.toEdges, self.npImage, k=3, s=5)   # in tryEdges()
+#   self.preview.submitProgressive(makeJob, scales=(0.25, 0.5, 1.0))   # makeJob(scale) gives (fun, args, kwargs)
+#   self.preview.cancel()   # when dialog is closed, results not yet shown are dropped
+
+import sys
+import time
+import threading
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+class PreviewEngine(QObject):
+	"""Run the newest submitted job in a worker thread, send its result by a signal.
+	example of use:
+		p = PreviewEngine(parent=self)
+		p.resultReady.connect(self.showPreview)   # showPreview(self, jobNo, result, seconds)
+		p.submit(fun, A, t=100)   # returns at once, fun(A, t=100) is run in the worker
+		...
+		def showPreview(self, jobNo, B, seconds):
+			if self.preview.isCurrent(jobNo):
+				pass   # display B
+	"""
+	resultReady = pyqtSignal(int, object, float)   # job number, result, seconds used
+
+	def __init__(self, parent=None, name='preview'):
+		super().__init__(parent)
+		self.jobNo = 0         # number of the newest job (or cancel)
+		self.nofDone = 0       # results sent
+		self.nofSkipped = 0    # jobs replaced by a newer job before they were started
+		self.nofStale = 0      # jobs done, but a newer job was submitted while working
+		self._job = None       # (jobNo, list of (fun, args, kwargs)) waiting to be started
+		self._refine = []      # the (fun, args, kwargs) to submit when idle
+		self.idleTimer = QTimer(self)
+		self.idleTimer.setSingleShot(True)
+		self.idleTimer.timeout.connect(self._submitRefine)
+		self._running = True
+		self._cond = threading.Condition()
+		self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+		self._thread.start()
+
+	def submit(self, fun, *args, **kwargs):
+		"""Submit job fun(*args, **kwargs), a job waiting to be started is dropped.
+		The function should not change its arguments, it is run in another thread.
+		Returns the job number.
+		"""
+		self.idleTimer.stop()
+		return self._submitChain([(fun, args, kwargs)])
+
+	def submitProgressive(self, makeJob, scales=(0.25, 0.5, 1.0), idleMs=250):
+		"""Submit the job for the first (coarsest) scale now, and the jobs for the other
+		scales, one after the other, when no new job has been submitted for 'idleMs' ms.
+		makeJob(scale) should return the tuple (fun, args, kwargs) for that scale.
+		All results are sent by 'resultReady' with the same job number.
+		"""
+		self._refine = [makeJob(s) for s in scales[1:]]
+		jobNo = self._submitChain([makeJob(scales[0])])
+		if self._refine:
+			self.idleTimer.start(idleMs)
+		return jobNo
+
+	def _submitRefine(self):
+		"""Idle, submit the rest of the progressive job, as the same job (number),
+		so that the coarse result, if it is not ready yet, is still shown.
+		"""
+		(chain, self._refine) = (self._refine, [])
+		if chain:
+			self._submitChain(chain, newJob=False)
+		return
+
+	def _submitChain(self, chain, newJob=True):
+		with self._cond:
+			if newJob:
+				self.jobNo += 1
+			if self._job is not None:
+				self.nofSkipped += 1
+			self._job = (self.jobNo, chain)
+			self._cond.notify()
+			return self.jobNo
+
+	def cancel(self):
+		"""Drop the waiting job, and make the running job (if any) outdated."""
+		self.idleTimer.stop()
+		self._refine = []
+		with self._cond:
+			self.jobNo += 1
+			self._job = None
+		return
+
+	def isCurrent(self, jobNo):
+		"""True if no other job has been submitted (or cancel) after job 'jobNo'."""
+		return (jobNo == self.jobNo)
+
+	def stop(self):
+		"""Stop the worker thread (after the running job)."""
+		with self._cond:
+			self._running = False
+			self._job = None
+			self._cond.notify()
+		return
+
+	def _run(self):
+		while True:
+			with self._cond:
+				while self._running and (self._job is None):
+					self._cond.wait()
+				if not self._running:
+					return
+				(jobNo, chain) = self._job
+				self._job = None
+			for (fun, args, kwargs) in chain:
+				if not self.isCurrent(jobNo):   # rest of chain is outdated
+					break
+				t0 = time.perf_counter()
+				try:
+					result = fun(*args, **kwargs)
+				except Exception as e:
+					print( f"PreviewEngine: job {jobNo} failed, {type(e).__name__}: {e}" )
+					break
+				if self.isCurrent(jobNo):
+					self.nofDone += 1
+					self.resultReady.emit(jobNo, result, time.perf_counter() - t0)
+				else:
+					self.nofStale += 1
+			#end for
+		return
+# end of class PreviewEngine
+
+def testAll():
+	"""Simple function for testing the class in this file, 20 'slider ticks' 5 ms apart
+	for a job that takes 100 ms, only the last one should be shown.
+	"""
+	from PyQt5.QtCore import QCoreApplication, QTimer
+	print("clsPreviewEngine.py: testAll()  # test the class in this file")
+	app = QCoreApplication(sys.argv)
+	p = PreviewEngine()
+	shown = []
+	def slowJob(value):
+		time.sleep(0.1)
+		return value
+	def showPreview(jobNo, result, seconds):
+		if p.isCurrent(jobNo):
+			shown.append(result)
+			print( f"  show result {result} (job {jobNo}) after {1000*seconds:.0f} ms" )
+	p.resultReady.connect(showPreview)
+	t0 = time.perf_counter()
+	for value in range(20):
+		p.submit(slowJob, value)
+		app.processEvents()
+		time.sleep(0.005)
+	print( f"  20 submits took {1000*(time.perf_counter()-t0):.0f} ms in GUI thread" )
+	QTimer.singleShot(500, app.quit)
+	app.exec_()
+	print( f"  shown {shown}, done {p.nofDone}, skipped {p.nofSkipped}, stale {p.nofStale}" )
+	#
+	shown.clear()
+	for value in range(10):   # progressive: coarse at once, then 0.5 and 1.0 when idle
+		p.submitProgressive(lambda scale: (slowJob, (f"{value}@{scale}",), {}), idleMs=100)
+		app.processEvents()
+		time.sleep(0.02)
+	QTimer.singleShot(600, app.quit)
+	app.exec_()
+	print( f"  progressive, shown {shown}, done {p.nofDone}, skipped {p.nofSkipped}, stale {p.nofStale}" )
+	p.stop()
+	return
+
+if __name__ == '__main__':
+	testAll()
@@ -19,6 +19,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, 
 			QDialog, QLabel, QSpinBox, QSlider, 
 			QRadioButton, QPushButton, QButtonGroup, QFormLayout, QBoxLayout)
+from clsPresets import presetLine
 
 class ResizeDialog(QDialog):
 	""" A dialog widget for giving parameters to use in a function like
@@ -30,8 +31,11 @@ class ResizeDialog(QDialog):
 			pass   # or something appropriate
 	The parent (p) should be a descendant of a QMainWindow (and QWidget)
 	and have an element p.npImage
+	With presets (a Presets object) the values from last time are shown, and named
+	sets of values can be selected and saved, kind 'resize' with parameters w, h and p,
+	w and h are 0 when they are given by the percent p.
 	"""
-	def __init__(self, parent):
+	def __init__(self, parent, presets=None):
 		super().__init__(parent)
 		self.title = 'Resize dialog for resizing current image'
 		self.setWindowTitle(self.title)
@@ -79,6 +83,9 @@ class ResizeDialog(QDialog):
 		layout.addRow('New width: ', self.qsbWidth)
 		layout.addRow('New hight: ', self.qsbHight)
 		layout.addRow(btnLine)
+		self.presets = presets
+		if presets is not None:
+			layout.addRow(presetLine(self, presets, 'resize'))
 		self.setLayout(layout)
 		return
 		
@@ -90,7 +97,24 @@ class ResizeDialog(QDialog):
 			(wIm,hIm) = (0,0)
 		return (wIm,hIm)
 		
+	def getParameters(self):
+		p = self.qsbPercent.value()
+		(w, h) = (self.qsbWidth.value(), self.qsbHight.value())
+		if (w, h) == ((self.wIm*p)//100, (self.hIm*p)//100):
+			(w, h) = (0, 0)   # given by percent, also for other image sizes
+		return {'w': w, 'h': h, 'p': p}
+		
+	def setParameters(self, values):
+		self.qsbPercent.setValue(int(values.get('p', 100)))   # and width and hight by percentChanged()
+		if (values.get('w', 0) > 0):
+			self.qsbWidth.setValue(int(values['w']))
+		if (values.get('h', 0) > 0):
+			self.qsbHight.setValue(int(values['h']))
+		return
+		
 	def okClicked(self):
+		if self.presets is not None:
+			self.presets.put('resize', 'last', self.getParameters())
 		self.accept()
 		return 
 		
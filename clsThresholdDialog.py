@@ -18,6 +18,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QAction, 
 			QDialog, QLabel, QSpinBox, QSlider, 
 			QRadioButton, QPushButton, QButtonGroup, QFormLayout, QBoxLayout)
+from clsPresets import presetLine
 
 class ThresholdDialog(QDialog):
 	""" A dialog widget for giving parameters to use in a function like
@@ -30,8 +31,10 @@ class ThresholdDialog(QDialog):
 	The parent (p) should be a descendant of a QMainWindow (and QWidget), 
 	and parent (p) must have defined the following function
 		p.tryBinary(..)   as used in tryClicked() below
+	With presets (a Presets object) the value from last time is shown, and named
+	values can be selected and saved, kind 'binary' with parameter t (0 for Otsu).
 	"""
-	def __init__(self, parent):
+	def __init__(self, parent, presets=None):
 		super().__init__(parent)
 		self.title = 'Thresholding dialog for making binary image'
 		self.setWindowTitle(self.title)
@@ -41,7 +44,7 @@ class ThresholdDialog(QDialog):
 		self.qsbThreshold = QSpinBox()
 		self.qsbThreshold.setRange(0, 255)
 		self.qsbThreshold.setValue(127)
-		slider = QSlider(Qt.Horizontal)
+		slider = self.slider = QSlider(Qt.Horizontal)
 		slider.setMinimum(0)
 		slider.setMaximum(255)
 		slider.setTracking(False)
@@ -67,10 +70,29 @@ class ThresholdDialog(QDialog):
 		btnLine.addStretch()
 		btnLine.addWidget(tryButton)
 		layout.addRow(btnLine)
+		self.presets = presets
+		if presets is not None:
+			layout.addRow(presetLine(self, presets, 'binary'))
 		self.setLayout(layout)
 		return
 		
+	def getParameters(self):
+		val = self.qsbThreshold.value() if self.rbVal.isChecked() else 0
+		return {'t': val}
+		
+	def setParameters(self, values):
+		t = int(values.get('t', 0))
+		if (t > 0):
+			self.qsbThreshold.setValue(t)
+			self.slider.setSliderPosition(t)
+			self.rbVal.setChecked(True)
+		else:
+			self.rbOtsu.setChecked(True)
+		return
+		
 	def okClicked(self):
+		if self.presets is not None:
+			self.presets.put('binary', 'last', self.getParameters())
 		self.accept()
 		return 
 		
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myColors.py
+#
+#  Color tools for numpy images (as in OpenCV, uint8 BGR or gray), used by appImageViewer3.py
+#  colorDistance()  distance from each pixel to the closest color in a palette (K,3),
+#    and the index of that color, for all K colors in one pass through the image.
+#    The image is done in tiles (a few rows) that fit in the cpu cache, for each tile
+#    the distance to each color is found by uint8 cv2 functions, and the distance and
+#    color index are packed in one integer (distance << 8 | index), so that one
+#    np.minimum() gives both the smallest distance and its index. No full image
+#    temporaries are made, only the results D and I.
+#    The distance may be 'chebyshev' (max of abs difference), 'l1', 'l2' or 'hsv'.
+#  attractColors()  each pixel gets the closest palette color, or background color
+#  ringColors()  median color on rings around circles (as found by cv2.HoughCircles), for
+#    all circles and all rings at once, the N points on each ring are interpolated
+#    (bilinear) by one cv2.remap(), points outside the image are not used.
+
+# Example on how to use file:
+#   >>> import myColors
+#   >>> (D, I) = myColors.colorDistance(A, [(0,255,255), (0,0,255)], metric='chebyshev')
+#   >>> B = myColors.attractColors(A, [(0,255,255), (0,0,255)], distLimit=25)
+#   >>> M = myColors.ringColors(A, circles, radii=(0.8, 1.2), n=36)   # M[i,j] is color at radii[j]*r
+#   (py38) C:\..\py3> python myColors.py   # test
+#   (py38) C:\..\py3> python myColors.py bench   # compare to the loop used in appImageViewer3.py before
+
+import sys
+import numpy as np
+import cv2
+
+metrics = ('chebyshev', 'l1', 'l2', 'hsv')
+
+def _hueLut():
+	"""Table for hue difference (OpenCV hue is 0 to 179) to distance 0 to 255, hue is circular."""
+	v = np.arange(256)
+	return np.uint8(np.clip(np.minimum(v, 180 - v), 0, 90) * 255 // 90)
+
+_hueTable = _hueLut()
+
+def _palette(palette, gray):
+	"""Return palette as list of int tuples, (b,g,r) for color images and (level,) for gray images."""
+	P = np.asarray(palette, dtype=np.int32)
+	if (P.ndim == 1) and not gray:
+		P = np.repeat(P[:,None], 3, axis=1)   # gray levels used for a color image
+	if gray and (P.ndim == 2):
+		P = (P[:,:3].sum(axis=1)*2 + 1) // 6   # int((b+g+r+0.5)/3) as in appImageViewer3
+	if (len(P) == 0) or (len(P) > 256):
+		raise ValueError(f"colorDistance: the palette should have 1 to 256 colors, not {len(P)}")
+	return [tuple(int(v) for v in np.atleast_1d(c)) for c in P]
+
+def _tileDistance(T, c, metric):
+	"""Distance from each pixel in tile T (uint8, 2D gray or 3D with 3 channels) to color c."""
+	e = cv2.absdiff(T, c + (0,)*(4 - len(c)))   # uint8
+	if (e.ndim == 2):
+		return e
+	if (metric == 'hsv'):
+		e[:,:,0] = cv2.LUT(e[:,:,0], _hueTable)
+	if metric in ('chebyshev', 'hsv'):
+		return cv2.max(cv2.max(e[:,:,0], e[:,:,1]), e[:,:,2])
+	e = e.astype(np.uint32)
+	if (metric == 'l2'):
+		e *= e
+	return e[:,:,0] + e[:,:,1] + e[:,:,2]
+
+def colorDistance(A, palette, metric='chebyshev', tileBytes=2**18):
+	"""Return (D, I) where D is the distance from each pixel in image A to the closest color
+	in 'palette', and I (uint8) is the index of that color (the first if several are equally close).
+	A is 2D gray or 3D BGR (or BGRA), palette is list or array (K,3) of colors in the same
+	channel order as A (b,g,r), or (K,) of gray levels. For a gray image A the distance is
+	abs(A - level), where the level for a color is its mean value.
+	metric 'chebyshev': max(|b-Bi|, |g-Gi|, |r-Ri|), D is uint8
+	metric 'l1': |b-Bi| + |g-Gi| + |r-Ri|, D is uint16
+	metric 'l2': sqrt((b-Bi)^2 + (g-Gi)^2 + (r-Ri)^2) rounded, D is uint16
+	metric 'hsv': as 'chebyshev' in HSV (OpenCV), the hue difference is circular and scaled to 0..255
+	"""
+	if metric not in metrics:
+		raise ValueError(f"colorDistance: metric should be one of {metrics}, not '{metric}'")
+	gray = (A.ndim == 2) or (A.shape[2] == 1)
+	X = A.reshape(A.shape[:2]) if gray else A[:,:,:3]
+	P = _palette(palette, gray)
+	if (metric == 'hsv') and not gray:
+		P = [tuple(int(v) for v in cv2.cvtColor(np.uint8([[c]]), cv2.COLOR_BGR2HSV)[0,0]) for c in P]
+	(H, W) = X.shape[:2]
+	wide = (metric in ('l1', 'l2')) and not gray
+	D = np.empty((H, W), dtype=np.uint16 if wide else np.uint8)
+	I = np.empty((H, W), dtype=np.uint8)
+	rows = max(1, tileBytes // max(1, X[:1].nbytes))
+	for r0 in range(0, H, rows):
+		T = np.ascontiguousarray(X[r0:r0+rows])
+		if (metric == 'hsv') and not gray:
+			T = cv2.cvtColor(T, cv2.COLOR_BGR2HSV)
+		best = np.full(T.shape[:2], np.iinfo(np.uint32).max, dtype=np.uint32)
+		packed = np.empty(T.shape[:2], dtype=np.uint32)
+		for (k, c) in enumerate(P):
+			np.left_shift(_tileDistance(T, c, metric), 8, out=packed, dtype=np.uint32)
+			packed |= k
+			np.minimum(best, packed, out=best)
+		I[r0:r0+rows] = best & 0xFF
+		best >>= 8
+		if wide and (metric == 'l2'):
+			D[r0:r0+rows] = np.sqrt(best, dtype=np.float32) + 0.5
+		else:
+			D[r0:r0+rows] = best
+	return (D, I)
+
+def attractColors(A, palette, distLimit=25, metric='chebyshev', background=(255, 255, 255)):
+	"""Return BGR image where each pixel in A gets the closest color in 'palette' (b,g,r),
+	if the distance to it is at most 'distLimit', and else the 'background' color.
+	"""
+	(D, I) = colorDistance(A, palette, metric)
+	P = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+	lut = np.vstack((P, np.uint8(background)[None,:]))   # index len(P) is background
+	I[D > distLimit] = len(P)
+	return lut[I]
+
+def ringPoints(circles, radii=(1.2,), n=36):
+	"""Return (X, Y) float32 arrays (M*len(radii), n), the n points on each ring, ring j around
+	circle i (x, y, r) is row i*len(radii)+j and has radius radii[j]*r.
+	"""
+	C = np.asarray(circles, dtype=np.float32).reshape(-1, 3)
+	angle = np.arange(n, dtype=np.float32) * np.float32(2*np.pi/n)
+	R = (C[:,2:3] * np.float32(radii)).reshape(-1, 1)   # (M*len(radii), 1)
+	X = np.repeat(C[:,0], len(radii))[:,None] + R * np.cos(angle)
+	Y = np.repeat(C[:,1], len(radii))[:,None] + R * np.sin(angle)
+	return (X, Y)
+
+def ringColors(A, circles, radii=(1.2,), n=36):
+	"""Return median color (float32 array (M, len(radii), channels)) of the n points on each ring
+	around each of the M circles (x, y, r), ring j has radius radii[j]*r. A is BGR (or BGRA, or gray,
+	then channels is 1). The points are bilinear interpolated, points outside the image are not used,
+	and a ring with no points inside the image gets NaN.
+	"""
+	C = np.asarray(circles, dtype=np.float32).reshape(-1, 3)
+	nc = 1 if (A.ndim == 2) else A.shape[2]
+	if (len(C) == 0):
+		return np.zeros((0, len(radii), nc), dtype=np.float32)
+	(X, Y) = ringPoints(C, radii, n)
+	S = np.empty(X.shape + (nc,), dtype=np.float32)
+	for r0 in range(0, len(X), 2**14):   # cv2.remap() needs less than 2**15 rows
+		T = cv2.remap(A, X[r0:r0+2**14], Y[r0:r0+2**14], cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+		S[r0:r0+2**14] = T.reshape(T.shape[:2] + (nc,))
+	S[(X < 0) | (Y < 0) | (X > A.shape[1] - 1) | (Y > A.shape[0] - 1)] = np.nan
+	S.sort(axis=1)   # NaN last
+	k = np.count_nonzero(~np.isnan(S[:,:,0]), axis=1)   # points inside image, for each ring
+	i = np.arange(len(S))
+	(lo, hi) = (np.maximum(k - 1, 0) // 2, k // 2)
+	M = (S[i,lo] + S[i,hi]) / 2   # median, NaN if k is 0
+	return M.reshape(len(C), len(radii), nc)
+
+def _loopDistance(A, palette):
+	"""The loop used in appImageViewer3.py bestDistColorRGB() before, kept for benchColorDistance()."""
+	A = A.astype(np.float32)
+	D = 255*np.ones((A.shape[0], A.shape[1]), dtype=np.uint8)
+	for bgr in palette:
+		B = np.ones(shape=A.shape, dtype=np.float32)  # the one color image
+		B[:,:,:] = bgr
+		Di = np.max(np.abs(A-B),axis=2).astype(np.uint8)  # the distance image
+		del B
+		D = np.minimum(D,Di)
+	return D
+
+def benchColorDistance(repeat=3):
+	"""Time colorDistance() and the loop used before, 12 MP image and 16 colors."""
+	import time
+	rng = np.random.default_rng(1)
+	A = rng.integers(0, 256, size=(3000, 4000, 3), dtype=np.uint8)
+	palette = rng.integers(0, 256, size=(16, 3))
+	t0 = time.perf_counter()
+	D0 = _loopDistance(A, palette)
+	print( f"  loop, 16 full size float32 temporaries:  {time.perf_counter()-t0:6.2f} s" )
+	for metric in metrics:
+		t0 = time.perf_counter()
+		for i in range(repeat):
+			(D, I) = colorDistance(A, palette, metric)
+		t = (time.perf_counter()-t0)/repeat
+		same = f", same as loop: {np.array_equal(D, D0)}" if (metric == 'chebyshev') else ''
+		print( f"  colorDistance(.., '{metric}'): {t:13.2f} s{same}" )
+	return
+
+def testAll():
+	"""Simple function for testing the functions in this file."""
+	print("myColors.py: testAll()  # test the functions in this file")
+	rng = np.random.default_rng(1)
+	A = rng.integers(0, 256, size=(120, 170, 3), dtype=np.uint8)
+	palette = np.array([(0, 255, 255), (0, 0, 255), (255, 0, 0), (20, 200, 30)])
+	E = np.abs(A[:,:,None,:].astype(np.int32) - palette[None,None,:,:])   # reference, broadcast
+	reference = {'chebyshev': E.max(axis=3), 'l1': E.sum(axis=3), 'l2': (E**2).sum(axis=3)}
+	for metric in ('chebyshev', 'l1', 'l2'):
+		(D, I) = colorDistance(A, palette, metric, tileBytes=3*170*7)   # odd tiles
+		R = reference[metric]
+		Rmin = np.int32(np.sqrt(R.min(axis=2)) + 0.5) if (metric == 'l2') else R.min(axis=2)
+		print( (f"  {metric:9s}: D {D.dtype.name} equal {np.array_equal(D, Rmin)}," +
+				f" I equal {np.array_equal(I, R.argmin(axis=2))}") )
+	(D, I) = colorDistance(A, palette, 'hsv')
+	print( f"  hsv      : D max {D.max()}, colors used {np.bincount(I.ravel(), minlength=len(palette))}" )
+	G = cv2.cvtColor(A, cv2.COLOR_BGR2GRAY)
+	(D, I) = colorDistance(G, palette)
+	print( f"  gray     : D equal {np.array_equal(D, np.abs(G[:,:,None] - np.int32([170, 85, 85, 83])).min(axis=2))}" )
+	s = np.arange(766)
+	S = np.stack([s//3, (s + 1)//3, (s + 2)//3], axis=1)   # b + g + r = 0, 1, .., 765
+	levels = [c[0] for k in range(0, len(S), 256) for c in _palette(S[k:k+256], gray=True)]   # at most 256 colors
+	print( f"  gray levels: same as int((b+g+r+0.5)/3): {levels == [int((s + 0.5)/3) for s in S.sum(axis=1)]}" )
+	B = attractColors(A, palette, distLimit=60)
+	print( f"  attractColors: {B.shape}, {np.count_nonzero((B == 255).all(axis=2))} background pixels" )
+	B = np.full((200, 300, 3), 200, dtype=np.uint8)
+	circles = [(60, 60, 20), (200, 100, 30), (295, 195, 20), (400, 50, 10)]   # last two outside, partly or all
+	for (i, (x, y, r)) in enumerate(circles[:3]):
+		cv2.circle(B, (x, y), int(1.5*r), (40*i, 0, 255 - 40*i), -1)   # colored disc around the eye
+		cv2.circle(B, (x, y), r, (0, 0, 0), -1)                       # the black eye
+	M = ringColors(B, circles, radii=(0.5, 1.25, 2.0), n=36)
+	print( f"  ringColors: {M.shape}, ring 1.25*r: {M[:,1].round().tolist()}" )
+	S = [np.median(B[(y + 1.25*r*np.sin(t)).round().astype(int), (x + 1.25*r*np.cos(t)).round().astype(int)], axis=0)
+			for (x, y, r) in circles[:2] for t in [np.arange(36)*2*np.pi/36]]   # one circle at a time
+	print( f"  ringColors: same as loop: {np.allclose(M[:2,1], S)}" )
+	return
+
+if __name__ == '__main__':
+	if (len(sys.argv) > 1) and (sys.argv[1] == 'bench'):
+		benchColorDistance()
+	else:
+		testAll()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myDice.py
+#
+#  Find dice, their color and number of eyes (pips), in a BGR image (numpy, as in OpenCV)
+#  This is the pipeline sketched in findDices() and findEyes() in appImageViewer3.py:
+#  1. each pixel gets a dice color by a look up table (clsColorLUT.py) made by diceHueRule(),
+#     pixels with low saturation or value are 'none', i.e. background and the black eyes.
+#     (diceColorRule() in clsColorLUT.py is for the color of a die, not for segmentation,
+#     gray pixels are 'red' by its rules.) A table made from samples may be used instead.
+#  2. the dice colored pixels are opened (morphology) and labelled as connected components,
+#     the color of a component is the color most of its pixels have
+#  3. components of a reasonable size are tested by cv2.minAreaRect() on their outer contour,
+#     the rectangle should be (almost) square and (almost) filled by the component
+#  4. the holes inside the accepted dice are labelled (once, for all dice), the holes of
+#     reasonable size and round shape are eyes, and they are counted for each die
+#  findDice() returns a list, one dict for each die:
+#    {'color': 'red', 'eyes': 5, 'center': (x, y), 'side': s, 'angle': a,
+#     'box': 4x2 int array (corners), 'eyeCenters': Nx2 float array}
+#  drawDice() draws the results on an image.
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python myDice.py   # test on a synthetic image
+#   (py38) C:\..\py3> python myDice.py dice.png   # find dice in image file
+# Example on how to use file in appImageViewer3.py:
+#   import myDice
+#   dice = myDice.findDice(self.npImage)
+#   for d in dice:
+#       print( f"{d['color']} die shows {d['eyes']} eyes" )
+
+import sys
+import numpy as np
+import cv2
+from clsColorLUT import getLUT
+
+diceClasses = ('none', 'red', 'orange', 'yellow', 'green', 'blue', 'purple', 'pink')
+hueLimits = (8, 20, 35, 85, 130, 150, 170)   # OpenCV hue (0-179) where orange, yellow, .., red starts
+
+_lut = None   # the dice color table, loaded when first used
+
+def diceHueRule(A, minSaturation=80, minValue=60):
+	"""Dice color for BGR image A by hue, 'none' if saturation or value is low. Returns (C, diceClasses)."""
+	hsv = cv2.cvtColor(A, cv2.COLOR_BGR2HSV)
+	classes = np.uint8([2, 3, 4, 5, 6, 7, 1])   # the class for hue from hueLimits[i] to the next limit
+	C = np.where(hsv[:,:,0] < hueLimits[0], 1, classes[np.searchsorted(hueLimits, hsv[:,:,0], side='right') - 1])
+	C[(hsv[:,:,1] < minSaturation) | (hsv[:,:,2] < minValue)] = 0
+	return (np.uint8(C), diceClasses)
+
+def diceLUT(bits=6):
+	"""Return the dice color look up table (clsColorLUT.ColorLUT), loaded (or made) only once."""
+	global _lut
+	if (_lut is None) or (_lut.bits != bits):
+		_lut = getLUT('diceHue', diceHueRule, bits=bits)
+	return _lut
+
+def diceMask(C, lut, background=('none', 'gray')):
+	"""Return binary image (uint8, 255 for dice colored pixels) for class image C."""
+	keep = np.full(max(256, len(lut.classes)), 255, dtype=np.uint8)
+	keep[[lut.classes.index(name) for name in background if name in lut.classes]] = 0
+	return cv2.LUT(C, keep) if (C.dtype == np.uint8) else keep[C]
+
+def findDice(A, lut=None, minSide=20, maxSide=0, squareness=1.3, fill=0.75, openSize=3,
+		eyeArea=(0.006, 0.06)):
+	"""Find dice in BGR image A, return list of dict (see top of file), sorted by position (y, x).
+	lut         dice color table, default diceLUT()
+	minSide     smallest die side (pixels), maxSide largest die side (0 is no limit)
+	squareness  largest side/shortest side of the minimum area rectangle of a die
+	fill        smallest part of the rectangle that the die (with eyes) should fill
+	openSize    size of morphological opening of the dice colored pixels (0 for none)
+	eyeArea     (min, max) area of an eye as part of the die area
+	"""
+	if lut is None:
+		lut = diceLUT()
+	C = lut.classify(A)
+	body = diceMask(C, lut)
+	if (openSize > 1):
+		body = cv2.morphologyEx(body, cv2.MORPH_OPEN, np.ones((openSize, openSize), np.uint8))
+	(_, L, S, _) = cv2.connectedComponentsWithStats(body, connectivity=8, ltype=cv2.CV_32S)
+	(x0, y0, w, h, area) = (S[:,cv2.CC_STAT_LEFT], S[:,cv2.CC_STAT_TOP], S[:,cv2.CC_STAT_WIDTH],
+			S[:,cv2.CC_STAT_HEIGHT], S[:,cv2.CC_STAT_AREA])
+	ok = (area >= fill * minSide**2 / 2) & (np.minimum(w, h) >= minSide)   # eyes may take half the area
+	if maxSide:
+		ok &= (np.maximum(w, h) <= 1.5*maxSide)   # bounding box of a rotated square is up to 1.41 side
+	ok[0] = False   # background
+	candidates = np.flatnonzero(ok)
+	if (len(candidates) == 0):
+		return []
+	D = np.zeros(A.shape[:2], dtype=np.uint16)   # die number (1, 2, ..) for the filled (eyes included) dice
+	dice = []
+	for i in candidates:
+		(rows, cols) = (slice(y0[i], y0[i]+h[i]), slice(x0[i], x0[i]+w[i]))
+		roi = np.uint8(L[rows,cols] == i)
+		(contours, _) = cv2.findContours(roi, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(int(x0[i]), int(y0[i])))
+		contour = max(contours, key=cv2.contourArea)
+		((cx, cy), (rw, rh), angle) = cv2.minAreaRect(contour)
+		if (min(rw, rh) < minSide) or (max(rw, rh) > squareness*min(rw, rh)):
+			continue
+		if maxSide and (max(rw, rh) > maxSide):
+			continue
+		if (cv2.contourArea(contour) < fill*rw*rh):
+			continue
+		color = np.bincount(C[rows,cols][roi > 0], minlength=len(lut.classes)).argmax()   # most common class
+		dice.append( {'color': lut.classes[color], 'eyes': 0, 'center': (cx, cy), 'side': (rw + rh)/2,
+				'angle': angle % 90, 'box': np.int32(np.around(cv2.boxPoints(((cx, cy), (rw, rh), angle)))),
+				'eyeCenters': np.zeros((0, 2))} )
+		cv2.drawContours(D, [contour], 0, len(dice), -1)
+	if (len(dice) == 0):
+		return []
+	# eyes: the holes in all dice, labelled at once, and counted for each die
+	holes = np.uint8((D > 0) & (body == 0))
+	(_, _, H, P) = cv2.connectedComponentsWithStats(holes, connectivity=8, ltype=cv2.CV_32S)
+	(hw, hh, ha) = (H[1:,cv2.CC_STAT_WIDTH], H[1:,cv2.CC_STAT_HEIGHT], H[1:,cv2.CC_STAT_AREA])
+	P = P[1:]
+	die = np.int32(D[np.int32(np.around(P[:,1])), np.int32(np.around(P[:,0]))]) - 1   # -1 if centroid is not in a die
+	dieArea = np.float64([d['side']**2 for d in dice])
+	part = ha / dieArea[die]
+	eye = ((die >= 0) & (part >= eyeArea[0]) & (part <= eyeArea[1]) &
+			(np.maximum(hw, hh) <= 1.5*np.minimum(hw, hh)) &   # round, not a long line
+			(ha >= 0.6*hw*hh))                                   # pi/4 = 0.785 for a disc
+	counts = np.bincount(die[eye], minlength=len(dice))
+	for (k, d) in enumerate(dice):
+		d['eyes'] = int(counts[k])
+		d['eyeCenters'] = P[eye & (die == k)]
+	return sorted(dice, key=lambda d: (d['center'][1], d['center'][0]))
+
+def drawDice(B, dice, color=(255, 0, 255), thickness=2):
+	"""Draw the dice found by findDice() on image B (BGR), box, eyes and text."""
+	for d in dice:
+		cv2.polylines(B, [d['box']], True, color, thickness)
+		for (x, y) in d['eyeCenters']:
+			cv2.circle(B, (int(x), int(y)), 3, color, -1)
+		(x, y) = np.int32(d['box'].min(axis=0))
+		cv2.putText(B, f"{d['color']} {d['eyes']}", (int(x), int(y) - 5), cv2.FONT_HERSHEY_SIMPLEX,
+				0.6, color, 2, cv2.LINE_AA)
+	return B
+
+def syntheticDice(shape=(720, 1280), seed=1):
+	"""Return (A, truth), an image with dice and list of (color name, eyes) in it."""
+	rng = np.random.default_rng(seed)
+	A = np.full(shape + (3,), 128, dtype=np.uint8)
+	A += np.uint8(rng.integers(0, 30, size=A.shape))   # gray background, some noise
+	bgr = {'red': (30, 30, 220), 'yellow': (20, 220, 230), 'green': (40, 200, 40), 'blue': (220, 60, 40),
+			'orange': (10, 130, 240)}
+	layout = [(-1, -1), (1, 1), (1, -1), (-1, 1), (0, 0), (-1, 0), (1, 0)]   # eyes, ex. 5 is the first 5
+	face = {1: [4], 2: [0, 1], 3: [0, 4, 1], 4: [0, 1, 2, 3], 5: [0, 1, 2, 3, 4], 6: [0, 1, 2, 3, 5, 6]}
+	truth = []
+	for (k, (name, c)) in enumerate(bgr.items()):
+		(x, y, s, a) = (150 + 240*k, 200 + 300*(k % 2), 90 + 10*k, 17*k)
+		eyes = 1 + (k + 2) % 6
+		box = cv2.boxPoints(((x, y), (s, s), a))
+		cv2.fillConvexPoly(A, np.int32(box), c, cv2.LINE_AA)
+		(ca, sa) = (np.cos(np.radians(a)), np.sin(np.radians(a)))
+		for j in face[eyes]:
+			(u, v) = (0.28*s*layout[j][0], 0.28*s*layout[j][1])
+			cv2.circle(A, (int(x + ca*u - sa*v), int(y + sa*u + ca*v)), int(0.09*s), (20, 20, 20), -1, cv2.LINE_AA)
+		truth.append((name, eyes))
+	return (A, truth)
+
+def testAll(fName=''):
+	"""Simple function for testing the functions in this file."""
+	import time
+	from clsColorLUT import ColorLUT
+	print("myDice.py: testAll()  # test the functions in this file")
+	if fName:
+		A = cv2.imread(fName)
+		truth = None
+	else:
+		(A, truth) = syntheticDice()
+	lut = ColorLUT.fromRule(diceHueRule, bits=6)   # made in memory, diceLUT() saves it in folder 'luts'
+	findDice(A, lut)
+	t0 = time.perf_counter()
+	for i in range(10):
+		dice = findDice(A, lut, minSide=40)
+	t = (time.perf_counter() - t0)/10
+	print( f"  {A.shape[1]}x{A.shape[0]} image: {len(dice)} dice in {1000*t:.1f} ms ({1/t:.0f} frames per second)" )
+	for d in dice:
+		(x, y) = d['center']
+		print( f"  {d['color']:7s} {d['eyes']} eyes, center ({x:6.1f},{y:6.1f}), side {d['side']:5.1f}, angle {d['angle']:4.1f}" )
+	if truth is not None:
+		print( f"  same as drawn: {sorted((d['color'], d['eyes']) for d in dice) == sorted(truth)}" )
+	return
+
+if __name__ == '__main__':
+	testAll(sys.argv[1] if (len(sys.argv) > 1) else '')
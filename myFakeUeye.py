@@ -0,0 +1,897 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myFakeUeye.py
+#
+#  A simulated IDS uEye camera, used instead of pyueye.ueye when there is no camera
+#  (or no pyueye), to test the camera code (clsCamera.py, clsAcquisition.py) on any PC.
+#  install() puts this module in sys.modules as 'pyueye.ueye' (and a module 'pyueye'),
+#  so 'from pyueye import ueye' gives this module, it must be done before that import.
+#  The functions (is_InitCamera(), is_AllocImageMem(), is_WaitForNextImage(), ..) take
+#  the same arguments as in pyueye and return IS_SUCCESS or an error code as the camera
+#  driver does, the output arguments (ctypes objects) are set.
+#  The image memories are numpy arrays, each row is 'pitch' bytes, where pitch is
+#  width*bytes per pixel rounded up to a multiple of 'pitchAlign' (configure()).
+#  Live video (is_CaptureVideo()) gives frames at 'fps' frames per second, the frames are
+#  made when is_WaitForNextImage() (or is_FreezeVideo()) is called. A frame is put in the
+#  next image memory in the sequence that is not locked (or in the image queue), and locked
+#  until is_UnlockSeqBuf(). If all memories are in use, the frame is lost, as in the driver.
+#  The frames are a synthetic pattern: gray gradient, a bar that moves one pixel each frame,
+#  and the frame number (modulo 256) in the 8x8 pixels in the upper left corner, or image
+#  files that are replayed (configure(source=..)).
+#  frameNumber(A) gives the number in a pattern frame (BGR, RGB or gray numpy array),
+#  frameInfo(pcMem) gives frame number and time (perf_counter) for the frame in a memory.
+#  With trigger (is_SetExternalTrigger()) the frames are made at the trigger times given by
+#  configure(triggers=..) (and the trigger delay), is_FreezeVideo(.., IS_WAIT) waits for the
+#  next trigger, and IS_SET_TRIGGER_SOFTWARE or is_ForceTrigger() triggers at once.
+#  Camera and sensor information (is_GetCameraInfo(), is_GetSensorInfo()) is made up, and
+#  there are no image formats (is_ImageFormat()) and no focus (is_Focus()).
+#  benchmark() measures frame rate and latency for Camera.capture() (clsCamera.py),
+#  Acquisition (clsAcquisition.py) and FrameThread (pyueye_example_utils.py).
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python myFakeUeye.py   # test
+#   (py38) C:\..\py3> python myFakeUeye.py bench   # frame rate and latency of the camera code
+# Example on how to use file, ex. to test clsCamera.py without a camera:
+#   import myFakeUeye
+#   myFakeUeye.install()                    # before 'from pyueye import ueye'
+#   myFakeUeye.configure(fps=50, sensor=(1280, 1024))
+#   myFakeUeye.configure(source='../images/dice*.png', triggers=0.5)   # replay files, trigger each 0.5 s
+#   from clsCamera import Camera
+
+import sys
+import builtins
+import types
+import time
+import ctypes
+import threading
+import numpy as np
+
+# types, as in pyueye (note that 'int' is ctypes.c_int in this module, as ueye.int)
+int = INT = c_int = ctypes.c_int
+uint = UINT = c_uint = ctypes.c_uint
+double = DOUBLE = c_double = ctypes.c_double
+HIDS = ctypes.c_uint
+c_mem_p = ctypes.c_void_p
+
+class IS_RECT:
+	"""As ueye.IS_RECT, the fields are ctypes objects (as in pyueye)."""
+	_size = 16
+	def __init__(self):
+		(self.s32X, self.s32Y, self.s32Width, self.s32Height) = (c_int(), c_int(), c_int(), c_int())
+
+def sizeof(obj):
+	return getattr(obj, '_size', None) or ctypes.sizeof(obj)
+
+class CAMINFO:
+	"""As ueye.CAMINFO, the strings are bytes and the bytes ctypes objects."""
+	def __init__(self):
+		(self.SerNo, self.ID, self.Version, self.Date) = (b'', b'', b'', b'')
+		(self.Select, self.Type) = (ctypes.c_ubyte(), ctypes.c_ubyte())
+
+class SENSORINFO:
+	"""As ueye.SENSORINFO, nColorMode is a c_char (its value is bytes)."""
+	def __init__(self):
+		self.SensorID = ctypes.c_ushort()
+		self.strSensorName = b''
+		self.nColorMode = ctypes.c_char()
+		(self.nMaxWidth, self.nMaxHeight) = (c_uint(), c_uint())
+		(self.bMasterGain, self.bRGain, self.bGGain, self.bBGain, self.bGlobShutter) = (c_int(), c_int(), c_int(), c_int(), c_int())
+
+class IMAGE_FORMAT_INFO(ctypes.Structure):
+	_fields_ = [('nFormatID', ctypes.c_int), ('nWidth', ctypes.c_uint), ('nHeight', ctypes.c_uint),
+			('nX0', ctypes.c_int), ('nY0', ctypes.c_int), ('nSupportedCaptureModes', ctypes.c_uint),
+			('strFormatName', ctypes.c_char*64)]
+
+class IMAGE_FORMAT_LIST:
+	"""As ueye.IMAGE_FORMAT_LIST, made by IMAGE_FORMAT_LIST(IMAGE_FORMAT_INFO * count)."""
+	def __init__(self, infoArray):
+		(self.nSizeOfListEntry, self.nNumListElements) = (0, 0)
+		self.FormatInfo = infoArray()
+		self._size = 16 + ctypes.sizeof(self.FormatInfo)
+
+# return values (error codes)
+IS_SUCCESS = 0
+IS_NO_SUCCESS = -1
+IS_INVALID_CAMERA_HANDLE = 1
+IS_IO_REQUEST_FAILED = 2
+IS_CANT_OPEN_DEVICE = 3
+IS_INVALID_PARAMETER = 125
+IS_TIMED_OUT = 122
+IS_CAPTURE_RUNNING = 140
+IS_SEQUENCE_BUF_ALREADY_LOCKED = 130
+IS_DEVICE_ALREADY_PAIRED = 197
+# arguments
+IS_DONT_WAIT = 0
+IS_WAIT = 1
+IS_FORCE_VIDEO_STOP = 0x4000
+IS_GET_COLOR_MODE = 0x8000
+IS_AOI_IMAGE_SET_AOI = 0x0001
+IS_AOI_IMAGE_GET_AOI = 0x0002
+IS_EXPOSURE_CMD_GET_EXPOSURE_DEFAULT = 5
+IS_EXPOSURE_CMD_GET_EXPOSURE = 7
+IS_EXPOSURE_CMD_GET_EXPOSURE_RANGE_MIN = 8
+IS_EXPOSURE_CMD_GET_EXPOSURE_RANGE_MAX = 9
+IS_EXPOSURE_CMD_SET_EXPOSURE = 12
+IS_SET_TRIGGER_OFF = 0x0000
+IS_SET_TRIGGER_HI_LO = 0x0001
+IS_SET_TRIGGER_LO_HI = 0x0002
+IS_SET_TRIGGER_SOFTWARE = 0x0008
+IS_GET_EXTERNALTRIGGER = 0x8000
+IS_GET_FRAMERATE = 0x8000
+# color modes
+IS_CM_BGRA8_PACKED = 0
+IS_CM_BGR8_PACKED = 1
+IS_CM_BGR565_PACKED = 2
+IS_CM_BGR5_PACKED = 3
+IS_CM_MONO8 = 6
+IS_CM_SENSOR_RAW8 = 11
+IS_CM_UYVY_PACKED = 12
+IS_CM_UYVY_MONO_PACKED = 13
+IS_CM_UYVY_BAYER_PACKED = 14
+IS_CM_CBYCRY_PACKED = 23
+IS_CM_BGRY8_PACKED = 24
+IS_CM_BGR10_PACKED = 25
+IS_CM_SENSOR_RAW12 = 27
+IS_CM_SENSOR_RAW16 = 29
+IS_CM_BGR12_UNPACKED = 30
+IS_CM_BGRA12_UNPACKED = 31
+IS_CM_SENSOR_RAW10 = 33
+IS_CM_RGBA8_PACKED = 128
+IS_CM_RGB8_PACKED = 129
+IS_CM_RGB10_PACKED = 153
+
+IS_NOT_SUPPORTED = 155
+IS_SET_DM_DIB = 1
+IS_COLORMODE_MONOCHROME = 1
+IS_COLORMODE_BAYER = 2
+IS_COLORMODE_CBYCRY = 4
+IS_CCOR_DISABLE = 0x0000
+IS_CCOR_ENABLE_NORMAL = 0x0001
+IS_MIN_SATURATION_U = IS_MIN_SATURATION_V = 0
+IS_MAX_SATURATION_U = IS_MAX_SATURATION_V = 200
+FDT_CMD_GET_CAPABILITIES = 0
+FOC_CAP_AUTOFOCUS_SUPPORTED = 0x0001
+FOC_CMD_SET_ENABLE_AUTOFOCUS = 3
+FOC_CMD_GET_AUTOFOCUS_STATUS = 6
+IMGFRMT_CMD_GET_NUM_ENTRIES = 1
+IMGFRMT_CMD_GET_LIST = 2
+
+settings = {'sensor': (1280, 1024), 'fps': 25.0, 'pitchAlign': 4, 'colorMode': IS_CM_BGR8_PACKED,
+		'source': 'pattern', 'triggers': 0.0, 'triggerTimeout': 1.0}
+
+def configure(**kwargs):
+	"""Set simulation settings for cameras initialized after this:
+	sensor      (width, height) of the sensor, largest AOI
+	fps         frames per second in live video
+	pitchAlign  each row in an image memory is a multiple of this many bytes
+	colorMode   color mode when the camera is initialized
+	source      'pattern', or image files to replay (in turn): a list of file names, a folder or
+	            a file pattern (glob), the images are resized to the sensor size
+	triggers    hardware trigger times, a period (seconds, 0 for no triggers) or a list of times
+	            (seconds), from is_InitCamera() or from is_CaptureVideo(), for cameras initialized later
+	triggerTimeout  seconds is_FreezeVideo() waits for a trigger
+	"""
+	for (key, value) in kwargs.items():
+		if key not in settings:
+			raise ValueError(f"myFakeUeye.configure(): unknown setting '{key}', use one of {list(settings)}")
+		settings[key] = value
+	return
+
+class _Camera:
+	"""State of one simulated camera, the module functions below use it."""
+	def __init__(self):
+		(self.sensorWidth, self.sensorHeight) = settings['sensor']
+		self.aoi = (0, 0, self.sensorWidth, self.sensorHeight)
+		self.colorMode = settings['colorMode']
+		self.fps = float(settings['fps'])
+		self.exposure = 10.0   # ms
+		self.trigger = IS_SET_TRIGGER_OFF
+		self.triggerDelay = 0
+		self.sequence = []     # mem ids, in order
+		self.activeMem = 0     # set by is_SetImageMem(), used by is_FreezeVideo() if no sequence
+		self.locked = set()    # mem ids locked (by is_WaitForNextImage() or is_LockSeqBuf())
+		self.queue = []        # mem ids with new frames, not yet given by is_WaitForNextImage()
+		self.useQueue = False
+		self.live = False
+		self.t0 = 0.0          # time (perf_counter) of frame 0 in live video
+		self.nextFrame = 0     # number of next frame in live video
+		self.nextSeq = 0       # index in sequence for next frame
+		self.frameCount = 0    # frames made
+		self.lostCount = 0     # frames lost, all memories in use
+		self.images = _loadImages(settings['source'], self.sensorWidth, self.sensorHeight)
+		self.triggers = settings['triggers']
+		self.softTriggers = []   # times for is_ForceTrigger() in live video
+		self.lock = threading.Lock()
+		self.t0 = time.perf_counter()
+
+	def triggered(self):
+		return (self.trigger != IS_SET_TRIGGER_OFF)
+
+	def triggerTime(self, k):
+		"""Time of trigger number k (0, 1, ..), inf if there is none."""
+		if (self.trigger == IS_SET_TRIGGER_SOFTWARE):
+			return self.softTriggers[k] if (k < len(self.softTriggers)) else float('inf')
+		if isinstance(self.triggers, (list, tuple)):
+			return self.t0 + self.triggers[k] if (k < len(self.triggers)) else float('inf')
+		return self.t0 + (k + 1)*self.triggers if (self.triggers > 0) else float('inf')
+
+	def nextTrigger(self, now):
+		"""Number of the first trigger at or after 'now'."""
+		k = 0
+		if (self.trigger != IS_SET_TRIGGER_SOFTWARE) and not isinstance(self.triggers, (list, tuple)) and (self.triggers > 0):
+			k = max(0, builtins.int((now - self.t0)/self.triggers) - 1)
+		while (self.triggerTime(k) < now):
+			k += 1
+		return k
+
+	def frameTime(self, k):
+		"""Time of frame number k in live video, at trigger k (and delay) if the camera is triggered."""
+		if self.triggered():
+			return self.triggerTime(k) + self.triggerDelay/1e6
+		return self.t0 + k / self.fps
+
+	def freeMem(self):
+		"""Return next mem id in the sequence that is not locked and not in the queue, or 0.
+		If there is no sequence, the active memory (is_SetImageMem()) is used.
+		"""
+		if not self.sequence:
+			return self.activeMem
+		for i in range(len(self.sequence)):
+			memId = self.sequence[(self.nextSeq + i) % len(self.sequence)]
+			if (memId not in self.locked) and (memId not in self.queue):
+				self.nextSeq = (self.nextSeq + i + 1) % len(self.sequence)
+				return memId
+		return 0
+
+	def makeFrame(self, memId, t=0.0):
+		"""Write frame number 'self.frameCount', made at time t, to image memory 'memId'."""
+		mem = _memory[memId]
+		(x, y, w, h) = self.aoi
+		nc = (mem['bits'] + 7) // 8
+		(w, h) = (min(w, mem['width']), min(h, mem['height']))
+		view = mem['array'][:h*mem['pitch']].reshape(h, mem['pitch'])[:, :w*nc].reshape(h, w, nc)
+		if self.images:
+			_imageFrame(self.images[self.frameCount % len(self.images)], self.colorMode, x, y, out=view)
+		else:
+			_pattern(self.frameCount, w, h, self.colorMode, x, y, out=view)
+		(mem['frame'], mem['time']) = (self.frameCount, t if t else time.perf_counter())
+		self.frameCount += 1
+		return
+
+	def catchUp(self, now):
+		"""Make the frames in live video that should be made before 'now'."""
+		while self.live and (self.frameTime(self.nextFrame) <= now):
+			memId = self.freeMem()
+			if memId:
+				self.makeFrame(memId, self.frameTime(self.nextFrame))
+				if self.useQueue and self.sequence:
+					self.queue.append(memId)
+			else:
+				self.lostCount += 1
+				self.frameCount += 1
+			self.nextFrame += 1
+		return
+# end class _Camera
+
+_cameras = {}   # hCam value: _Camera
+_memory = {}    # mem id: {'array', 'width', 'height', 'bits', 'pitch', 'frame', 'time'}
+_address = {}   # memory address: mem id
+_nextMemId = [1]
+
+_baseCache = {}   # (w, h, colorMode, x0, y0): background image
+
+def _base(w, h, colorMode, x0, y0):
+	"""The background, gray gradient, as numpy array (h, w, bytes per pixel) for colorMode."""
+	key = (w, h, colorMode, x0, y0)
+	if key not in _baseCache:
+		x = np.arange(x0, x0 + w, dtype=np.int32)
+		y = np.arange(y0, y0 + h, dtype=np.int32)
+		G = np.uint8((x[None,:]//4 + y[:,None]//4) % 256)
+		B = np.dstack((G, np.uint8(255 - G), G))   # BGR
+		if colorMode in (IS_CM_RGB8_PACKED, IS_CM_RGBA8_PACKED):
+			B = B[:,:,::-1]
+		if colorMode in (IS_CM_BGRA8_PACKED, IS_CM_RGBA8_PACKED):
+			B = np.dstack((B, np.full((h, w), 255, dtype=np.uint8)))
+		if (colorMode == IS_CM_MONO8) or (B.shape[2] != (_bits(colorMode) + 7)//8):   # gray bytes
+			B = np.repeat(B[:,:,1:2], (_bits(colorMode) + 7)//8, axis=2)
+		if (len(_baseCache) > 8):
+			_baseCache.clear()
+		_baseCache[key] = np.ascontiguousarray(B)
+	return _baseCache[key]
+
+def _pattern(k, w, h, colorMode=IS_CM_BGR8_PACKED, x0=0, y0=0, out=None):
+	"""Frame number k, as numpy array (h, w, bytes per pixel) in the byte order of colorMode,
+	written in 'out' if given.
+	"""
+	B = _base(w, h, colorMode, x0, y0)
+	if out is None:
+		out = np.empty_like(B)
+	out[:] = B
+	red = {IS_CM_BGR8_PACKED: (0, 0, 255), IS_CM_RGB8_PACKED: (255, 0, 0),
+			IS_CM_BGRA8_PACKED: (0, 0, 255, 255), IS_CM_RGBA8_PACKED: (255, 0, 0, 255)}.get(colorMode, 0)
+	first = (k - x0) % 64   # the bar is in 8 columns from here, and each 64th column, it moves right
+	out[:, :max(0, first - 56)] = red   # the part of a bar that starts left of the AOI
+	for c in range(first, w, 64):
+		out[:, c:c+8] = red
+	out[:8, :8] = k % 256
+	return out
+
+def _loadImages(source, width, height):
+	"""Return list of BGR images (resized to width x height) for 'source' (see configure()), [] for 'pattern'."""
+	if isinstance(source, str) and (source == 'pattern'):
+		return []
+	import os
+	import glob
+	import cv2
+	if isinstance(source, str):
+		names = sorted(glob.glob(os.path.join(source, '*'))) if os.path.isdir(source) else sorted(glob.glob(source))
+	else:
+		names = list(source)
+	images = []
+	for name in names:
+		A = cv2.imread(name, cv2.IMREAD_COLOR)
+		if A is None:
+			continue   # not an image file
+		if (A.shape[1], A.shape[0]) != (width, height):
+			A = cv2.resize(A, (width, height), interpolation=cv2.INTER_AREA)
+		images.append(A)
+	if not images:
+		print( f"myFakeUeye: no images in '{source}', the pattern is used" )
+	return images
+
+def _imageFrame(A, colorMode, x0, y0, out):
+	"""Write the AOI of BGR image A, in the byte order of colorMode, to 'out' (h, w, bytes per pixel)."""
+	import cv2
+	(h, w, nc) = out.shape
+	B = A[y0:y0+h, x0:x0+w]
+	code = {IS_CM_RGB8_PACKED: cv2.COLOR_BGR2RGB, IS_CM_BGRA8_PACKED: cv2.COLOR_BGR2BGRA,
+			IS_CM_RGBA8_PACKED: cv2.COLOR_BGR2RGBA}.get(colorMode)
+	if (colorMode == IS_CM_BGR8_PACKED):
+		out[:] = B
+	elif (code is not None):
+		out[:] = cv2.cvtColor(B, code)
+	else:   # mono and other modes, gray bytes
+		out[:] = cv2.cvtColor(B, cv2.COLOR_BGR2GRAY)[:,:,None]
+	return out
+
+def frameNumber(A):
+	"""Frame number (modulo 256) in an image from the simulated camera."""
+	return builtins.int(A[0,0]) if (A.ndim == 2) else builtins.int(A[0,0,0])
+
+def _bits(colorMode):
+	return {IS_CM_MONO8: 8, IS_CM_SENSOR_RAW8: 8, IS_CM_BGR8_PACKED: 24, IS_CM_RGB8_PACKED: 24,
+			IS_CM_BGRA8_PACKED: 32, IS_CM_RGBA8_PACKED: 32, IS_CM_BGRY8_PACKED: 32}.get(colorMode, 16)
+
+def _camera(hCam):
+	return _cameras.get(hCam.value if hasattr(hCam, 'value') else hCam)
+
+def _set(out, value):
+	"""Set the output argument, a ctypes object."""
+	if out is not None:
+		out.value = value
+	return
+
+def is_InitCamera(hCam, hWnd):
+	if (hCam.value == 0):   # first free camera
+		hCam.value = max(_cameras, default=0) + 1
+	_cameras[hCam.value] = _Camera()
+	return IS_SUCCESS
+
+def is_ExitCamera(hCam):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	cam.live = False
+	for memId in cam.sequence:
+		_freeMemory(memId)
+	del _cameras[hCam.value]
+	return IS_SUCCESS
+
+def is_AOI(hCam, command, rect, size):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if (command == IS_AOI_IMAGE_GET_AOI):
+		(rect.s32X.value, rect.s32Y.value, rect.s32Width.value, rect.s32Height.value) = cam.aoi
+		return IS_SUCCESS
+	if (command == IS_AOI_IMAGE_SET_AOI):
+		(x, y, w, h) = (rect.s32X.value, rect.s32Y.value, rect.s32Width.value, rect.s32Height.value)
+		if (x < 0) or (y < 0) or (w < 8) or (h < 2) or (x + w > cam.sensorWidth) or (y + h > cam.sensorHeight):
+			return IS_INVALID_PARAMETER
+		cam.aoi = (x, y, w, h)
+		return IS_SUCCESS
+	return IS_INVALID_PARAMETER
+
+def is_SetColorMode(hCam, mode):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if (_value(mode) == IS_GET_COLOR_MODE):
+		return cam.colorMode
+	cam.colorMode = _value(mode)
+	return IS_SUCCESS
+
+def is_AllocImageMem(hCam, width, height, bits, pcMem, memId):
+	(w, h, bits) = (_value(width), _value(height), _value(bits))
+	if _camera(hCam) is None:
+		return IS_INVALID_CAMERA_HANDLE
+	a = settings['pitchAlign']
+	pitch = ((w*((bits + 7)//8) + a - 1) // a) * a
+	array = np.zeros(h*pitch, dtype=np.uint8)
+	i = _nextMemId[0]
+	_nextMemId[0] += 1
+	_memory[i] = {'array': array, 'width': w, 'height': h, 'bits': bits, 'pitch': pitch, 'frame': -1}
+	_address[array.ctypes.data] = i
+	_set(pcMem, array.ctypes.data)
+	_set(memId, i)
+	return IS_SUCCESS
+
+def _value(v):
+	return v.value if hasattr(v, 'value') else v
+
+def _freeMemory(memId):
+	mem = _memory.pop(memId, None)
+	if mem is not None:
+		_address.pop(mem['array'].ctypes.data, None)
+	return
+
+def is_FreeImageMem(hCam, pcMem, memId):
+	cam = _camera(hCam)
+	if (cam is None) or (_value(memId) not in _memory):
+		return IS_INVALID_PARAMETER
+	with cam.lock:
+		i = _value(memId)
+		if i in cam.sequence:
+			cam.sequence.remove(i)
+		cam.locked.discard(i)
+		if i in cam.queue:
+			cam.queue.remove(i)
+		_freeMemory(i)
+	return IS_SUCCESS
+
+def is_SetImageMem(hCam, pcMem, memId):
+	cam = _camera(hCam)
+	if (cam is None) or (_value(memId) not in _memory):
+		return IS_INVALID_PARAMETER
+	cam.activeMem = _value(memId)
+	return IS_SUCCESS
+
+def is_AddToSequence(hCam, pcMem, memId):
+	cam = _camera(hCam)
+	if (cam is None) or (_value(memId) not in _memory):
+		return IS_INVALID_PARAMETER
+	with cam.lock:
+		cam.sequence.append(_value(memId))
+	return IS_SUCCESS
+
+def is_ClearSequence(hCam):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	with cam.lock:
+		(cam.sequence, cam.queue, cam.nextSeq) = ([], [], 0)
+	return IS_SUCCESS
+
+def is_InquireImageMem(hCam, pcMem, memId, x, y, bits, pitch):
+	mem = _memory.get(_value(memId))
+	if mem is None:
+		return IS_INVALID_PARAMETER
+	for (out, key) in ((x, 'width'), (y, 'height'), (bits, 'bits'), (pitch, 'pitch')):
+		_set(out, mem[key])
+	return IS_SUCCESS
+
+def is_InitImageQueue(hCam, mode):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	cam.useQueue = True
+	return IS_SUCCESS
+
+def is_ExitImageQueue(hCam):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	with cam.lock:
+		(cam.useQueue, cam.queue) = (False, [])
+	return IS_SUCCESS
+
+def is_Exposure(hCam, command, param, size):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if (command == IS_EXPOSURE_CMD_SET_EXPOSURE):
+		cam.exposure = param.value
+		param.value = min(cam.exposure, 1000.0/cam.fps)   # the exposure actually used
+	elif (command == IS_EXPOSURE_CMD_GET_EXPOSURE):
+		param.value = cam.exposure
+	elif (command == IS_EXPOSURE_CMD_GET_EXPOSURE_DEFAULT):
+		param.value = 10.0
+	elif (command == IS_EXPOSURE_CMD_GET_EXPOSURE_RANGE_MIN):
+		param.value = 0.01
+	elif (command == IS_EXPOSURE_CMD_GET_EXPOSURE_RANGE_MAX):
+		param.value = 1000.0/cam.fps
+	else:
+		return IS_INVALID_PARAMETER
+	return IS_SUCCESS
+
+def is_SetFrameRate(hCam, fps, newFps):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	f = _value(fps)
+	if (f != IS_GET_FRAMERATE) and (f > 0):
+		with cam.lock:
+			if cam.live and not cam.triggered():   # new frame rate from the next frame
+				cam.t0 = cam.frameTime(cam.nextFrame) - cam.nextFrame / f
+			cam.fps = float(f)
+	_set(newFps, cam.fps)
+	return IS_SUCCESS
+
+def is_SetExternalTrigger(hCam, mode):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if (_value(mode) == IS_GET_EXTERNALTRIGGER):
+		return cam.trigger
+	cam.trigger = _value(mode)
+	return IS_SUCCESS
+
+def is_SetTriggerDelay(hCam, delay):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	cam.triggerDelay = _value(delay)
+	return IS_SUCCESS
+
+def is_CaptureVideo(hCam, wait):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	with cam.lock:
+		if not cam.live:
+			(cam.live, cam.nextFrame, cam.softTriggers) = (True, 0, [])
+			if cam.triggered():   # the trigger times are from now
+				cam.t0 = time.perf_counter()
+			else:   # first frame after one frame time
+				cam.t0 = time.perf_counter() + 1.0/cam.fps
+		first = cam.frameTime(0)
+	if (wait != IS_DONT_WAIT):   # wait for the first frame
+		now = time.perf_counter()
+		if (first - now > settings['triggerTimeout']):
+			time.sleep(settings['triggerTimeout'])
+			return IS_TIMED_OUT
+		time.sleep(max(0.0, first - now))
+		with cam.lock:
+			cam.catchUp(time.perf_counter())
+	return IS_SUCCESS
+
+def is_ForceTrigger(hCam):
+	"""Software trigger now, used in live video with IS_SET_TRIGGER_SOFTWARE."""
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	with cam.lock:
+		if cam.live and (cam.trigger == IS_SET_TRIGGER_SOFTWARE):
+			cam.softTriggers.append(time.perf_counter())
+	return IS_SUCCESS
+
+def is_StopLiveVideo(hCam, wait):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	cam.live = False
+	return IS_SUCCESS
+
+def is_FreezeVideo(hCam, wait):
+	"""Capture one frame, in the active image memory or next free memory in the sequence."""
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if cam.live:
+		return is_StopLiveVideo(hCam, wait) or _freeze(cam, wait)
+	return _freeze(cam, wait)
+
+def _freeze(cam, wait):
+	"""One frame, after one frame time, at the next trigger (hardware), or at once (software trigger)."""
+	now = time.perf_counter()
+	if (cam.trigger == IS_SET_TRIGGER_SOFTWARE):
+		t = now + cam.exposure/1000.0
+	elif cam.triggered():
+		t = cam.triggerTime(cam.nextTrigger(now)) + cam.triggerDelay/1e6
+		if (t - now > settings['triggerTimeout']):   # no trigger
+			if (wait == IS_WAIT):
+				time.sleep(settings['triggerTimeout'])
+			return IS_TIMED_OUT
+	else:
+		t = now + 1.0/cam.fps
+	if (wait == IS_WAIT):
+		time.sleep(max(0.0, t - now))
+	with cam.lock:
+		memId = cam.freeMem()
+		if not memId:
+			return IS_SEQUENCE_BUF_ALREADY_LOCKED
+		cam.makeFrame(memId, t)
+		if cam.useQueue and cam.sequence:
+			cam.queue.append(memId)
+	return IS_SUCCESS
+
+def is_WaitForNextImage(hCam, timeout, pcMem, memId):
+	"""Wait (at most 'timeout' ms) for the next frame in the image queue, the memory is locked."""
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	end = time.perf_counter() + _value(timeout)/1000.0
+	while True:
+		now = time.perf_counter()
+		with cam.lock:
+			cam.catchUp(now)
+			if cam.queue:
+				i = cam.queue.pop(0)
+				cam.locked.add(i)
+				_set(pcMem, _memory[i]['array'].ctypes.data)
+				_set(memId, i)
+				return IS_SUCCESS
+			nextTime = cam.frameTime(cam.nextFrame) if cam.live else end
+		if (now >= end):
+			return IS_TIMED_OUT
+		time.sleep(max(0.0, min(nextTime, end) - now))
+
+def is_LockSeqBuf(hCam, nNum, pcMem):
+	cam = _camera(hCam)
+	i = _address.get(_value(pcMem))
+	if (cam is None) or (i is None):
+		return IS_INVALID_PARAMETER
+	with cam.lock:
+		cam.locked.add(i)
+	return IS_SUCCESS
+
+def is_UnlockSeqBuf(hCam, nNum, pcMem):
+	"""Unlock the memory, it may be used for a new frame again."""
+	cam = _camera(hCam)
+	i = _address.get(_value(pcMem))
+	if (cam is None) or (i is None):
+		return IS_INVALID_PARAMETER
+	with cam.lock:
+		cam.locked.discard(i)
+	return IS_SUCCESS
+
+def get_data(pcMem, width, height, bits, pitch, copy):
+	"""As ueye.get_data(), 1D uint8 array of height*pitch bytes of the image memory, a view if not copy."""
+	i = _address.get(_value(pcMem))
+	if i is None:
+		raise ValueError("myFakeUeye.get_data(): unknown image memory")
+	A = _memory[i]['array'][:_value(height)*_value(pitch)]
+	return A.copy() if copy else A
+
+def frameInfo(pcMem):
+	"""Return (frame number, time) of the frame in the image memory, the time is when the
+	frame was made (time.perf_counter()), i.e. when the exposure (or the trigger) ended.
+	"""
+	mem = _memory.get(_address.get(_value(pcMem)))
+	return (-1, 0.0) if (mem is None) else (mem['frame'], mem.get('time', 0.0))
+
+def is_ResetToDefault(hCam):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	with cam.lock:
+		cam.aoi = (0, 0, cam.sensorWidth, cam.sensorHeight)
+		(cam.colorMode, cam.fps, cam.exposure) = (settings['colorMode'], float(settings['fps']), 10.0)
+		(cam.trigger, cam.triggerDelay) = (IS_SET_TRIGGER_OFF, 0)
+	return IS_SUCCESS
+
+def is_SetDisplayMode(hCam, mode):
+	return IS_SUCCESS if _camera(hCam) else IS_INVALID_CAMERA_HANDLE
+
+def is_GetCameraInfo(hCam, cInfo):
+	if _camera(hCam) is None:
+		return IS_INVALID_CAMERA_HANDLE
+	(cInfo.SerNo, cInfo.ID, cInfo.Version, cInfo.Date) = (b'4002000000', b'IDS GmbH (simulated)', b'V1.0', b'01.01.2024')
+	(cInfo.Select.value, cInfo.Type.value) = (1, 0x40)
+	return IS_SUCCESS
+
+def is_GetSensorInfo(hCam, sInfo):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	mono = (settings['colorMode'] in (IS_CM_MONO8, IS_CM_SENSOR_RAW8))
+	(sInfo.SensorID.value, sInfo.strSensorName) = (0x0, b'UI000xSE-M' if mono else b'UI000xSE-C')
+	sInfo.nColorMode.value = bytes([IS_COLORMODE_MONOCHROME if mono else IS_COLORMODE_CBYCRY])
+	(sInfo.nMaxWidth.value, sInfo.nMaxHeight.value) = (cam.sensorWidth, cam.sensorHeight)
+	(sInfo.bMasterGain.value, sInfo.bRGain.value, sInfo.bGGain.value, sInfo.bBGain.value) = (1, 0 if mono else 1, 0 if mono else 1, 0 if mono else 1)
+	sInfo.bGlobShutter.value = 1
+	return IS_SUCCESS
+
+def is_GetColorDepth(hCam, pnCol, pnColMode):
+	cam = _camera(hCam)
+	if cam is None:
+		return IS_INVALID_CAMERA_HANDLE
+	_set(pnCol, _bits(cam.colorMode))
+	_set(pnColMode, cam.colorMode)
+	return IS_SUCCESS
+
+def is_SetSaturation(hCam, u, v):
+	"""The saturation is accepted, but the frames are not changed."""
+	if _camera(hCam) is None:
+		return IS_INVALID_CAMERA_HANDLE
+	return IS_SUCCESS if (IS_MIN_SATURATION_U <= _value(u) <= IS_MAX_SATURATION_U) else IS_INVALID_PARAMETER
+
+def is_SetColorCorrection(hCam, mode, factor):
+	return IS_SUCCESS if _camera(hCam) else IS_INVALID_CAMERA_HANDLE
+
+def is_Focus(hCam, command, param, size):
+	return IS_NOT_SUPPORTED   # no focus, as most uEye cameras
+
+def is_ImageFormat(hCam, command, param, size):
+	"""There are no image formats, the list is empty."""
+	if _camera(hCam) is None:
+		return IS_INVALID_CAMERA_HANDLE
+	if (command == IMGFRMT_CMD_GET_NUM_ENTRIES):
+		_set(param, 0)
+		return IS_SUCCESS
+	if (command == IMGFRMT_CMD_GET_LIST):
+		return IS_SUCCESS
+	return IS_NOT_SUPPORTED
+
+def statistics(hCam):
+	"""Return dict with number of frames made and lost by the simulated camera."""
+	cam = _camera(hCam)
+	return {'frames': cam.frameCount, 'lost': cam.lostCount, 'locked': len(cam.locked), 'queued': len(cam.queue)}
+
+def install():
+	"""Make 'from pyueye import ueye' give this module."""
+	this = sys.modules[__name__]
+	package = sys.modules.get('pyueye')
+	if (package is None) or not getattr(package, '_fake', False):
+		package = types.ModuleType('pyueye')
+		package._fake = True
+		sys.modules['pyueye'] = package
+	package.ueye = this
+	sys.modules['pyueye.ueye'] = this
+	return this
+
+def testAll():
+	"""Simple function for testing the functions in this file."""
+	print("myFakeUeye.py: testAll()  # test the functions in this file")
+	configure(fps=100, sensor=(640, 480), pitchAlign=64)
+	hCam = HIDS(0)
+	is_InitCamera(hCam, None)
+	rect = IS_RECT()
+	(rect.s32X, rect.s32Y, rect.s32Width, rect.s32Height) = (int(8), int(2), int(600), int(400))
+	is_AOI(hCam, IS_AOI_IMAGE_SET_AOI, rect, sizeof(rect))
+	mems = []
+	for k in range(3):
+		(pcMem, memId) = (c_mem_p(), int())
+		is_AllocImageMem(hCam, 600, 400, 24, pcMem, memId)
+		is_AddToSequence(hCam, pcMem, memId)
+		mems.append((pcMem, memId))
+	(w, h, bits, pitch) = (int(), int(), int(), int())
+	is_InquireImageMem(hCam, mems[0][0], mems[0][1], w, h, bits, pitch)
+	print( f"  image memory {w.value}x{h.value}, {bits.value} bits, pitch {pitch.value}" )
+	is_InitImageQueue(hCam, 0)
+	is_CaptureVideo(hCam, IS_DONT_WAIT)
+	numbers = []
+	t0 = time.perf_counter()
+	for k in range(20):
+		(pcMem, memId) = (c_mem_p(), int())
+		ret = is_WaitForNextImage(hCam, 1000, pcMem, memId)
+		A = get_data(pcMem, 600, 400, 24, pitch.value, False).reshape(400, pitch.value)[:, :1800].reshape(400, 600, 3)
+		numbers.append(frameNumber(A))
+		if (k == 10):
+			time.sleep(0.1)   # slow consumer, 10 frames while 3 memories
+		is_UnlockSeqBuf(hCam, memId, pcMem)
+	t = time.perf_counter() - t0
+	print( f"  20 frames in {t:.2f} s, frame numbers {numbers}, {statistics(hCam)}" )
+	is_StopLiveVideo(hCam, IS_FORCE_VIDEO_STOP)
+	ret = is_WaitForNextImage(hCam, 50, c_mem_p(), int())
+	print( f"  after stop: is_WaitForNextImage() returns {ret} (IS_TIMED_OUT is {IS_TIMED_OUT})" )
+	# trigger, each 20 ms (from is_CaptureVideo()) and 5 ms delay
+	configure(triggers=0.02, triggerTimeout=0.2)
+	hCam2 = HIDS(0)
+	is_InitCamera(hCam2, None)
+	is_SetExternalTrigger(hCam2, IS_SET_TRIGGER_LO_HI)
+	is_SetTriggerDelay(hCam2, 5000)
+	(pcMem, memId) = (c_mem_p(), int())
+	is_AllocImageMem(hCam2, 640, 480, 24, pcMem, memId)
+	is_SetImageMem(hCam2, pcMem, memId)
+	t0 = time.perf_counter()
+	times = []
+	for k in range(5):
+		is_FreezeVideo(hCam2, IS_WAIT)
+		times.append(frameInfo(pcMem)[1] - t0)
+	print( f"  triggered frames at {[round(1000*t, 1) for t in times]} ms" )
+	_camera(hCam2).triggers = []   # as configure(triggers=[]) before is_InitCamera()
+	print( f"  no trigger: is_FreezeVideo() returns {is_FreezeVideo(hCam2, IS_WAIT)}" )
+	is_SetExternalTrigger(hCam2, IS_SET_TRIGGER_SOFTWARE)
+	t0 = time.perf_counter()
+	ret = is_FreezeVideo(hCam2, IS_WAIT)
+	print( f"  software trigger: returns {ret} after {1000*(time.perf_counter() - t0):.1f} ms" )
+	(cInfo, sInfo) = (CAMINFO(), SENSORINFO())
+	is_GetCameraInfo(hCam2, cInfo)
+	is_GetSensorInfo(hCam2, sInfo)
+	print( f"  camera {cInfo.ID.decode()}, sensor {sInfo.strSensorName.decode()} {sInfo.nMaxWidth.value}x{sInfo.nMaxHeight.value}" )
+	is_ExitCamera(hCam2)
+	is_ExitCamera(hCam)
+	configure(triggers=0.0, triggerTimeout=1.0)
+	return
+
+def benchmark(fps=200.0, sensor=(1280, 1024), seconds=2.0, work=0.002):
+	"""Frame rate and latency of the camera code, with the simulated camera at 'fps' frames
+	per second, for Camera.capture() (is_FreezeVideo() for each frame), Acquisition (N image
+	memories and a thread) and FrameThread with ImageData (a copy of each frame). The user
+	(consumer) uses 'work' seconds on each frame. Latency is from the frame is made until the
+	user gets it, and frames lost (all memories in use) or dropped (queue full) are counted.
+	"""
+	install()
+	from clsCamera import Camera
+	from clsAcquisition import Acquisition
+	from pyueye_example_utils import FrameThread
+	configure(fps=fps, sensor=sensor)
+	(w, h) = sensor
+	print( f"myFakeUeye.py: benchmark()  # {w}x{h} at {fps:.0f} fps, {1000*work:.1f} ms work for each frame" )
+	def report(name, n, t, latency, lost):
+		latency = np.sort(latency)*1000 if len(latency) else np.zeros(1)
+		print( (f"  {name:26s} {n/t:6.1f} fps, latency mean {latency.mean():5.2f} ms," +
+				f" 95% {latency[builtins.int(0.95*(len(latency) - 1))]:5.2f} ms, max {latency[-1]:6.2f} ms, {lost}") )
+		return
+	# 1. Camera.capture(), one image memory
+	cam = Camera(0)
+	cam.init(width=w, height=h)
+	(n, latency, t0) = (0, [], time.perf_counter())
+	while (time.perf_counter() - t0 < seconds/2):
+		cam.capture()
+		latency.append(time.perf_counter() - frameInfo(cam.pcMem)[1])
+		time.sleep(work)
+		n += 1
+	report('Camera.capture()', n, time.perf_counter() - t0, latency, 'no frames lost (one at a time)')
+	cam.stop()
+	# 2. Acquisition, 4 image memories and a queue
+	cam = Camera(0)
+	cam.init(width=w, height=h)
+	acq = Acquisition(cam, buffer_count=4)
+	acq.start()
+	(n, latency, t0) = (0, [], time.perf_counter())
+	while (time.perf_counter() - t0 < seconds):
+		frame = acq.get(timeout=1.0)
+		if frame is None:
+			continue
+		with frame:
+			latency.append(time.perf_counter() - frameInfo(frame.buffer.mem_ptr)[1])
+			time.sleep(work)
+			n += 1
+	t = time.perf_counter() - t0
+	acq.stop()
+	stat = statistics(cam.handle())
+	report('Acquisition.get()', n, t, latency, f"{acq.dropCount} dropped, {stat['lost']} lost")
+	cam.exit()
+	# 3. FrameThread, the view gets an ImageData (copy) for each frame
+	class View:
+		def __init__(self):
+			(self.n, self.latency) = (0, [])
+		def handle(self, image_data):
+			self.latency.append(time.perf_counter() - frameInfo(image_data.img_buff.mem_ptr)[1])
+			image_data.unlock()
+			time.sleep(work)
+			self.n += 1
+	cam = Camera(0)
+	cam.init(width=w, height=h)
+	cam.alloc(4)
+	cam.capture_video(wait=False)
+	view = View()
+	thread = FrameThread(cam, view)
+	t0 = time.perf_counter()
+	thread.start()
+	time.sleep(seconds)
+	thread.stop()
+	thread.join()
+	stat = statistics(cam.handle())
+	report('FrameThread + ImageData', view.n, time.perf_counter() - t0, view.latency, f"{stat['lost']} lost")
+	cam.exit()
+	return
+
+if __name__ == '__main__':
+	if (len(sys.argv) > 1) and (sys.argv[1] == 'bench'):
+		benchmark()
+	else:
+		testAll()
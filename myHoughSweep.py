@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myHoughSweep.py
+#
+#  Find good parameters for cv2.HoughCircles() by trying many of them (a sweep).
+#  The images are labelled, for each image the number of circles that should be
+#  found and the range of their radius is given in a JSON file, ex.
+#    [ {"file": "dice1.bmp", "count": 5, "radius": [20, 40]},
+#      {"file": "disk.bmp",  "count": 1, "radius": [200, 260]} ]
+#  (a file name is relative to the folder of the JSON file).
+#  All combinations of the parameters in a grid, i.e. the 7-tuple used by
+#  HoughCirclesDialog (dp, minDist, param1, param2, minRadius, maxRadius, maxCircles),
+#  are tried on all images in a pool of worker processes. The gray scale (and blurred)
+#  image and its gradient magnitude are made once for each image in each worker, and
+#  shared by all parameter sets tried on it. The result is a table, ranked best first,
+#  written as a CSV file that HoughCirclesDialog can load (button 'Load..').
+#  The functions are:
+#  readLabels(), parseGrid(), defaultGrid(), parameterGrid()  input to the sweep
+#  scoreCircles()  how good the circles found in one image are
+#  runSweep()  try all parameter sets on all images, returns ranked rows
+#  writeTable(), readTable(), loadHoughParameters()  the ranked table as CSV file
+
+# Example on how to use file:
+#   (py38) C:\..\py3> python myHoughSweep.py labels.json -o hough.csv
+#   (py38) C:\..\py3> python myHoughSweep.py labels.json -o hough.csv -g "dp=1.5,2; param1=80:200:40" --blur 5
+#   (py38) C:\..\py3> python myHoughSweep.py   # test on synthetic images
+# Example on how to use file in appImageViewer4.py:
+#   from myHoughSweep import loadHoughParameters
+#   (dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = loadHoughParameters('hough.csv')
+
+_appFileName = "myHoughSweep"
+
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+from multiprocessing import Pool, cpu_count
+import numpy as np
+import cv2
+import myImageOps as ops
+
+names = ('dp', 'minDist', 'param1', 'param2', 'minRadius', 'maxRadius', 'maxCircles')
+columns = ('rank', 'score', 'edge', 'seconds') + names
+
+def readLabels(fName):
+	"""Read the JSON label file, return list of dict with keys 'file', 'count' and 'radius' (rmin, rmax)."""
+	with open(fName) as f:
+		items = json.load(f)
+	folder = os.path.dirname(os.path.abspath(fName))
+	labels = []
+	for item in items:
+		(rmin, rmax) = item.get('radius', (0, 0))
+		labels.append( {'file': os.path.join(folder, item['file']), 'count': int(item['count']),
+						'radius': (int(rmin), int(rmax))} )
+	return labels
+
+def _values(text):
+	"""'1,1.5,2' gives [1.0, 1.5, 2.0] and 'first:last:step' gives the range including last."""
+	if ':' in text:
+		(first, last, step) = (float(v) for v in text.split(':'))
+		return [round(float(v), 6) for v in np.arange(first, last + step/2, step)]
+	return [float(v) for v in text.split(',')]
+
+def parseGrid(text, grid=None):
+	"""Parse text as "dp=1.5,2; param1=80:200:40" into dict name: list of values,
+	the names not given are as in 'grid' (if given).
+	"""
+	grid = dict(grid) if grid else {}
+	for part in text.split(';'):
+		if not part.strip():
+			continue
+		(name, eq, values) = part.partition('=')
+		name = name.strip()
+		if (name not in names) or (eq != '='):
+			raise ValueError(f"parseGrid: '{part.strip()}' is not as 'name=values', name in {names}")
+		grid[name] = _values(values)
+	return grid
+
+def defaultGrid(labels):
+	"""A grid around the HoughCirclesDialog defaults, the radius range is from the labels."""
+	rmin = min(lab['radius'][0] for lab in labels)
+	rmax = max(lab['radius'][1] for lab in labels)
+	return {'dp': [1.0, 1.5, 2.0],
+			'minDist': sorted({max(5, rmin), max(5, 2*rmin), 40}),
+			'param1': [50, 100, 150, 200, 300],
+			'param2': [20, 30, 45, 60, 80],
+			'minRadius': [max(0, int(0.8*rmin))],
+			'maxRadius': [int(np.ceil(1.2*rmax))],
+			'maxCircles': [max(lab['count'] for lab in labels)] }
+
+def parameterGrid(grid):
+	"""Return list of all 7-tuples in 'grid' (dict name: list of values)."""
+	return [tuple(t) for t in itertools.product(*(grid[name] for name in names))
+			if (t[4] < t[5]) or (t[5] <= 0)]
+
+def scoreCircles(C, count, radius):
+	"""Return (error, nIn) for circles C (N,3) found in an image with 'count' circles
+	with radius in range 'radius'. nIn is the number of circles found with radius in
+	range, error is 0 when exactly 'count' circles are found and all are in range.
+	"""
+	nIn = int(np.count_nonzero((C[:,2] >= radius[0]) & (C[:,2] <= radius[1])))
+	return (abs(len(C) - count) + (len(C) - nIn), nIn)
+
+def rimEdge(M, C, nPoints=32):
+	"""Mean gradient magnitude M on the rims of the circles C, a measure of how well they fit the edges."""
+	if (len(C) == 0):
+		return 0.0
+	a = np.linspace(0, 2*np.pi, nPoints, endpoint=False)
+	x = np.clip(np.int32(C[:,0:1] + C[:,2:3]*np.cos(a)), 0, M.shape[1]-1)
+	y = np.clip(np.int32(C[:,1:2] + C[:,2:3]*np.sin(a)), 0, M.shape[0]-1)
+	return float(M[y, x].mean())
+
+_cache = {}   # (file, blur): (G, M) in each worker process
+
+def _prepared(fName, blur=0):
+	"""Return (G, M), gray (blurred) image and its gradient magnitude, made once for each image."""
+	key = (fName, blur)
+	if key not in _cache:
+		A = cv2.imread(fName, cv2.IMREAD_ANYCOLOR)
+		if A is None:
+			raise ValueError(f"could not read file {fName}")
+		G = ops.toGray(A)
+		if (blur > 1):
+			G = cv2.medianBlur(G, blur | 1)   # odd size
+		M = cv2.magnitude(cv2.Sobel(G, cv2.CV_32F, 1, 0), cv2.Sobel(G, cv2.CV_32F, 0, 1))
+		M /= max(1.0, float(M.max()))   # relative to the strongest edge, 0 to 1
+		if (len(_cache) >= 4):
+			del _cache[next(iter(_cache))]   # oldest
+		_cache[key] = (G, M)
+	return _cache[key]
+
+def _initWorker():
+	"""Each worker process runs one HoughCircles at a time, let OpenCV use one thread only."""
+	cv2.setNumThreads(1)
+	return
+
+def _sweepTask(task):
+	"""Try the parameter sets in 'task' on one image, return (imageNo, list of (error, nIn, edge, seconds)) or message."""
+	(imageNo, label, blur, first, params) = task
+	try:
+		(G, M) = _prepared(label['file'], blur)
+	except ValueError as e:
+		return (imageNo, first, str(e))
+	results = []
+	for t in params:
+		t0 = time.perf_counter()
+		C = ops.houghCircles(G, *t[:6])
+		seconds = time.perf_counter() - t0
+		(error, nIn) = scoreCircles(C, label['count'], label['radius'])
+		results.append( (error, nIn, rimEdge(M, C[:label['count']]), seconds) )
+	return (imageNo, first, results)
+
+def runSweep(labels, grid, blur=0, workers=0, chunk=20, verbose=True):
+	"""Try all parameter sets in 'grid' on all labelled images, using 'workers' processes.
+	Returns list of rows (dict with keys as in 'columns'), ranked best first: lowest
+	score (sum of errors relative to number of circles), then highest edge, then fastest.
+	"""
+	params = parameterGrid(grid)
+	tasks = [(i, label, blur, j, params[j:j+chunk])
+			for (i, label) in enumerate(labels) for j in range(0, len(params), chunk)]
+	errors = np.zeros((len(params), len(labels)))
+	edges = np.zeros((len(params), len(labels)))
+	seconds = np.zeros((len(params), len(labels)))
+	workers = workers if (workers > 0) else cpu_count()
+	t0 = time.perf_counter()
+	with Pool(processes=workers, initializer=_initWorker) as pool:
+		for (imageNo, first, results) in pool.imap_unordered(_sweepTask, tasks):
+			if isinstance(results, str):
+				raise ValueError(f"runSweep: {results}")
+			r = np.array(results)
+			errors[first:first+len(r), imageNo] = r[:,0]
+			edges[first:first+len(r), imageNo] = r[:,2]
+			seconds[first:first+len(r), imageNo] = r[:,3]
+	if verbose:
+		print( (f"{_appFileName}: {len(params)} parameter sets on {len(labels)} images in " +
+				f"{time.perf_counter()-t0:.1f} s, {workers} workers") )
+	score = errors.sum(axis=1) / max(1, sum(lab['count'] for lab in labels))
+	edge = edges.mean(axis=1)
+	total = seconds.sum(axis=1)
+	order = np.lexsort((total, -edge, score))
+	rows = []
+	for (rank, k) in enumerate(order, start=1):
+		row = {'rank': rank, 'score': round(float(score[k]), 4), 'edge': round(float(edge[k]), 4),
+				'seconds': round(float(total[k]), 4)}
+		row.update(zip(names, params[k]))
+		rows.append(row)
+	return rows
+
+def writeTable(fName, rows):
+	"""Write the ranked rows as CSV file, one line for each parameter set."""
+	with open(fName, 'w', newline='') as f:
+		w = csv.DictWriter(f, fieldnames=columns)
+		w.writeheader()
+		w.writerows(rows)
+	return
+
+def readTable(fName):
+	"""Read the CSV file written by writeTable(), return list of rows (dict) ranked best first."""
+	with open(fName, newline='') as f:
+		rows = [ {k: float(v) for (k, v) in row.items()} for row in csv.DictReader(f) ]
+	return sorted(rows, key=lambda row: row['rank'])
+
+def loadHoughParameters(fName, rank=1):
+	"""Return the 7-tuple for HoughCirclesDialog from line 'rank' (1 is best) in the CSV file."""
+	row = readTable(fName)[rank-1]
+	return (row['dp'], row['minDist'], row['param1'], row['param2'],
+			int(row['minRadius']), int(row['maxRadius']), int(row['maxCircles']))
+
+def printTable(rows):
+	print( '  ' + ' '.join(f"{c:>9}" for c in columns) )
+	for row in rows:
+		print( '  ' + ' '.join(f"{row[c]:9g}" for c in columns) )
+	return
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog=_appFileName,
+			description="Find parameters for cv2.HoughCircles() by trying them on labelled images.")
+	parser.add_argument('labels', help='JSON file with list of {"file": .., "count": .., "radius": [rmin, rmax]}')
+	parser.add_argument('-o', '--out', default='hough.csv', help='CSV file for the ranked table, default "hough.csv"')
+	parser.add_argument('-g', '--grid', default='', help='values to try, ex. "dp=1.5,2; param1=80:200:40"')
+	parser.add_argument('--blur', type=int, default=0, help='median blur size before HoughCircles, default 0 (none)')
+	parser.add_argument('-w', '--workers', type=int, default=0, help='number of processes, default one per cpu')
+	parser.add_argument('-n', '--show', type=int, default=10, help='number of best rows to print')
+	args = parser.parse_args(argv)
+	try:
+		labels = readLabels(args.labels)
+		grid = parseGrid(args.grid, defaultGrid(labels))
+		rows = runSweep(labels, grid, blur=args.blur, workers=args.workers)
+	except (OSError, ValueError, KeyError) as e:
+		print( f"{_appFileName}: {e}" )
+		return 2
+	writeTable(args.out, rows)
+	printTable(rows[:args.show])
+	print( f"{_appFileName}: {len(rows)} rows written to {args.out}" )
+	return 0
+
+def testAll():
+	"""Simple function for testing the functions in this file, on synthetic images with circles."""
+	import tempfile
+	print("myHoughSweep.py: testAll()  # test the functions in this file")
+	rng = np.random.default_rng(1)
+	with tempfile.TemporaryDirectory() as folder:   # removed with the files at the end
+		items = []
+		for i in range(4):
+			A = np.uint8(rng.normal(100, 4, size=(480, 640)).clip(0, 255))
+			n = 2 + i
+			for j in range(n):
+				(x, y, r) = (70 + 120*j, 120 + 60*(i % 3), int(rng.integers(25, 40)))
+				cv2.circle(A, (x, y), r, 200, -1)
+			cv2.imwrite(os.path.join(folder, f"circles{i}.png"), A)
+			items.append( {'file': f"circles{i}.png", 'count': n, 'radius': [20, 45]} )
+		with open(os.path.join(folder, 'labels.json'), 'w') as f:
+			json.dump(items, f)
+		labels = readLabels(os.path.join(folder, 'labels.json'))
+		grid = parseGrid("dp=1.5,2; param1=100:200:50; param2=20,40,60", defaultGrid(labels))
+		print( f"  grid: {grid}" )
+		rows = runSweep(labels, grid, blur=5, workers=2)
+		printTable(rows[:5])
+		writeTable(os.path.join(folder, 'hough.csv'), rows)
+		t = loadHoughParameters(os.path.join(folder, 'hough.csv'))
+		print( f"  best parameters read from table: {t}" )
+	return
+
+if __name__ == '__main__':
+	if (len(sys.argv) > 1):
+		sys.exit(main())
+	testAll()
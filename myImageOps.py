@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myImageOps.py
+#
+#  The image processing operations from the Edit menu in appImageViewer1.py as plain
+#  functions on numpy arrays, i.e. without QMainWindow, QPixmap or QImage.
+#  They are used by the viewer and by the batch runner appBatchImages.py.
+#  Images are numpy arrays of uint8 as in OpenCV: 2D gray, or 3D BGR or BGRA.
+#  The functions are:
+#  toGray(), toEdges(), filterImage(), toBinary(), resizeImage(), cutBlackFrame()
+#  rotate90(), rotateImage(), flipImage(), transposeImage()  views when possible
+#  find_nonzero_bbox()  bounding box of the not black part of an image
+#  findCornersHarris(), drawCircles()  strongest Harris corners, and mark them
+#  houghCircles(), houghCirclesImage()  cv2.HoughCircles() as array (N,3), and drawn
+#  circlesImage()  the circles drawn in the image, as operation in a pipeline
+#  blobStats()  area, perimeter, circularity, centroid and bounding box of all blobs (arrays)
+#  findDots(), dotsImage()  round dark dots (dice eyes), as in blackDots() in appImageViewer2.py
+#  scaleHoughParameters(), scaledOddSize(), atScale()  for previews on downscaled images
+#  filterKernel()   makes the (first) filter as in FilterDialog
+#  parsePipeline(), pipelineText(), runPipeline()  for a list of operations given
+#    as text, ex. "gray -> edges(k=3, s=5) -> otsu"
+
+# Example on how to use file:
+#   >>> import myImageOps as ops
+#   >>> B = ops.toEdges(ops.toGray(A), k=3, s=5)
+#   >>> steps = ops.parsePipeline("gray -> edges(k=3, s=5) -> otsu")
+#   >>> B = ops.runPipeline(A, steps)
+#   (py38) C:\..\py3> python myImageOps.py   # test
+#   (py38) C:\..\py3> python myImageOps.py bench   # time find_nonzero_bbox() on 20 MP images
+
+import sys
+import ast
+import numpy as np
+import cv2
+from myKernels import smoothKernel
+
+def toGray(A):
+	"""Return gray scale version of image A, a 2D image is returned as it is."""
+	if (len(A.shape) == 3) and (A.shape[2] == 3):
+		return cv2.cvtColor(A, cv2.COLOR_BGR2GRAY)
+	if (len(A.shape) == 3) and (A.shape[2] == 4):
+		return cv2.cvtColor(A, cv2.COLOR_BGRA2GRAY)
+	if (len(A.shape) == 3) and (A.shape[2] == 1):
+		return A[:,:,0]
+	return A
+
+def _scaleTo255(B):
+	"""Scale non-negative float image B so that max is 255, and return it as uint8."""
+	m = np.max(B)
+	if (m <= 0):
+		return np.zeros(B.shape, dtype=np.uint8)
+	return np.floor(B * (255/m)).astype(np.uint8)
+
+def toEdges(A, k=3, s=5):
+	"""Return edge image, Sobel filters of size 'k' and separable low-pass filter of size 's'.
+	As toEdges() in appImageViewer1.py, a color image is made gray first.
+	"""
+	A = toGray(A)
+	Eh = cv2.Sobel(A, ddepth=cv2.CV_32F, dx=0, dy=1, ksize=k)
+	Ev = cv2.Sobel(A, ddepth=cv2.CV_32F, dx=1, dy=0, ksize=k)
+	B = np.sqrt( 1 + np.power(Eh,2) + np.power(Ev,2) )
+	if (s > 1):
+		a = smoothKernel(s)
+		B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
+	return _scaleTo255(B)
+
+def filterKernel(n=11, ul=1.0, ur=1.0, ll=-1.0, lr=-1.0):
+	"""Return n x n filter with 4 constant blocks (ul, ur, ll, lr) and zero middle row
+	and column, as made in FilterDialog.getFilters(). For n < 3 a 1 element filter is returned.
+	"""
+	if (n < 3):
+		return np.zeros(1)
+	H = np.zeros((n,n))
+	H[:(n//2),:(n//2)] = ul
+	H[:(n//2),(n//2+1):] = ur
+	H[(n//2+1):,:(n//2)] = ll
+	H[(n//2+1):,(n//2+1):] = lr
+	return H
+
+def filterImage(A, h, s=5):
+	"""Return image A filtered by 2D filter 'h' and separable low-pass filter of size 's',
+	result is scaled to range 0 to 255. As filterImage() in appImageViewer1.py.
+	"""
+	A = toGray(A)
+	if (len(h) > 1):
+		B = cv2.filter2D(A, ddepth=cv2.CV_16S, kernel=h).astype(np.float32)
+	else:
+		B = A.astype(np.float32)
+	if (s > 1):
+		a = smoothKernel(s)
+		B = cv2.sepFilter2D(B, ddepth=-1, kernelX=a, kernelY=a)
+	return _scaleTo255(B - np.min(B))
+
+def toBinary(A, t=0):
+	"""Threshold (gray scale) image A, Otsu method is used if t < 2.
+	ex.: (used_thr, B) = toBinary(A, t)
+	"""
+	A = toGray(A)
+	if (t < 2):
+		return cv2.threshold(A, thresh=1, maxval=255, type=cv2.THRESH_OTSU)
+	return cv2.threshold(A, thresh=t, maxval=255, type=cv2.THRESH_BINARY)
+
+def resizeImage(A, width=0, height=0, percent=100):
+	"""Resize image A to (width, height), if any of these are 0 'percent' is used for it."""
+	if (width <= 0):
+		width = max(1, int(A.shape[1]*percent/100 + 0.5))
+	if (height <= 0):
+		height = max(1, int(A.shape[0]*percent/100 + 0.5))
+	return cv2.resize(A, (width, height), interpolation=cv2.INTER_LINEAR)
+
+def rotate90(A, k=1):
+	"""Return image A rotated k*90 degrees clockwise, as a view of A (no copy).
+	Use np.ascontiguousarray() on the result if a contiguous array is needed.
+	"""
+	return np.rot90(A, -(int(k) % 4))
+
+def flipImage(A, axis='h'):
+	"""Return image A flipped, axis 'h' mirrors left-right, 'v' upside-down and 'hv' both,
+	as a view of A (no copy).
+	"""
+	if axis not in ('h', 'v', 'hv', 'vh'):
+		raise ValueError( f"flipImage: axis should be 'h', 'v' or 'hv', not {axis!r}" )
+	if (axis == 'h'):
+		return A[:,::-1]
+	if (axis == 'v'):
+		return A[::-1]
+	return A[::-1,::-1]
+
+def transposeImage(A):
+	"""Return image A transposed, i.e. mirrored about the main diagonal, as a view of A."""
+	return A.swapaxes(0, 1)
+
+def rotateImage(A, angle, expand=True, border=0):
+	"""Return image A rotated 'angle' degrees clockwise about its center.
+	Multiples of 90 degrees are done by rotate90() (a view), other angles by cv2.warpAffine()
+	with bilinear interpolation. If 'expand' is True the output is large enough for the
+	whole rotated image, else it has the same size as A. Pixels outside A get value 'border'.
+	dtype and channels of A are kept.
+	"""
+	if (angle % 90 == 0):
+		return rotate90(A, int(angle // 90))
+	(h, w) = A.shape[:2]
+	M = cv2.getRotationMatrix2D(((w-1)/2, (h-1)/2), -angle, 1.0)   # OpenCV: positive is counter clockwise
+	if expand:
+		(c, s) = (abs(M[0,0]), abs(M[0,1]))
+		(wn, hn) = (int(np.ceil(w*c + h*s)), int(np.ceil(w*s + h*c)))
+		M[0,2] += (wn - w)/2
+		M[1,2] += (hn - h)/2
+		(w, h) = (wn, hn)
+	channels = A.shape[2] if (len(A.shape) == 3) else 1
+	B = cv2.warpAffine(A, M, (w, h), flags=cv2.INTER_LINEAR,
+			borderMode=cv2.BORDER_CONSTANT, borderValue=(border,)*min(4, channels))
+	if (len(A.shape) == 3) and (len(B.shape) == 2):   # (h,w,1) is returned as 2D
+		B = B[:,:,None]
+	return B
+
+def find_nonzero_bbox(A):
+	"""Return the bounding box (x, y, w, h) of the non-zero (not black) pixels in image A,
+	or None if all pixels are zero. For color images only the first 3 channels are used,
+	i.e. alpha is ignored. Each axis is reduced by np.any() once, no loops in Python.
+	ex.: (x, y, w, h) = find_nonzero_bbox(A);  B = A[y:y+h, x:x+w]
+	"""
+	(H, W) = A.shape[:2]
+	C = A.shape[2] if (len(A.shape) == 3) else 1
+	# a row of pixels is one contiguous row of W*C bytes, np.any() is fast along that,
+	# while np.any(axis=2) on a color image is a slow strided reduction
+	A2 = np.ascontiguousarray(A).reshape(H, W*C)
+	cols = A2.any(axis=0).reshape(W, C)[:,:3].any(axis=1)
+	cols = np.flatnonzero(cols)
+	if (cols.size == 0):
+		return None
+	(left, right) = (cols[0], cols[-1]+1)
+	if (C <= 3):
+		rows = A2[:,left*C:right*C].any(axis=1)   # only columns inside the box
+	else:
+		rows = A[:,left:right,:3].any(axis=(1,2))
+	rows = np.flatnonzero(rows)
+	(top, bottom) = (rows[0], rows[-1]+1)
+	return (int(left), int(top), int(right-left), int(bottom-top))
+
+def cutBlackFrame(A):
+	"""Return image A where any frame of black (all zero) rows and columns is cut away.
+	If A is all black or has no black frame, A itself is returned.
+	"""
+	box = find_nonzero_bbox(A)
+	if (box is None) or (box == (0, 0, A.shape[1], A.shape[0])):
+		return A
+	(x, y, w, h) = box
+	return A[y:y+h,x:x+w].copy()
+
+def findCornersHarris(A, maxCorners=1000, relThreshold=0.01, blockSize=2, ksize=3, k=0.04, nmsSize=3):
+	"""Find corners in image A by cv2.cornerHarris(), return (xy, R) where xy is array (N,2)
+	of int (x,y) for the (at most) maxCorners strongest corners and R their Harris response,
+	sorted by response, strongest first. Only local maxima in a nmsSize x nmsSize area
+	(non-maximum suppression) with response above relThreshold*max(response) are corners.
+	A is not changed, it may be gray scale float32 (then it is used as it is).
+	ex.: (xy, R) = findCornersHarris(A, maxCorners=500)
+	"""
+	G = toGray(A)
+	G = G if (G.dtype == np.float32) else G.astype(np.float32)
+	H = cv2.cornerHarris(G, blockSize=blockSize, ksize=ksize, k=k)
+	Hmax = cv2.dilate(H, np.ones((nmsSize, nmsSize), dtype=np.uint8))
+	yx = np.argwhere((H == Hmax) & (H > relThreshold*H.max()))
+	R = H[yx[:,0], yx[:,1]]
+	if (len(R) > maxCorners):
+		idx = np.argpartition(-R, maxCorners)[:maxCorners]   # the strongest, not sorted
+		(yx, R) = (yx[idx], R[idx])
+	idx = np.argsort(-R, kind='stable')
+	return (yx[idx,::-1].astype(np.int32), R[idx])
+
+def drawCircles(B, xy, r=5, color=(0,0,255), thickness=1):
+	"""Draw circles of radius r centered in the points xy, array (N,2) of (x,y), into image B.
+	If r is one number all circles are drawn by one call to cv2.polylines(), r may also
+	be an array with one radius for each circle. B is changed and returned.
+	"""
+	xy = np.asarray(xy, dtype=np.int32).reshape(-1, 2)
+	if (len(xy) == 0):
+		return B
+	if (np.ndim(r) > 0):
+		for ((x, y), ri) in zip(xy, np.asarray(r, dtype=np.int32).ravel()):
+			cv2.circle(B, (int(x), int(y)), int(ri), color, thickness)
+		return B
+	circle = cv2.ellipse2Poly((0, 0), (int(r), int(r)), 0, 0, 360, max(5, 90//max(1,int(r))))
+	cv2.polylines(B, list(xy[:,None,:] + circle[None,:,:]), isClosed=True, color=color, thickness=thickness)
+	return B
+
+def houghCircles(G, dp=2.0, minDist=40.0, param1=100.0, param2=60.0, minRadius=20, maxRadius=60):
+	"""Find circles in gray scale image G by cv2.HoughCircles(), return array (N,3) of
+	int (x, y, r), strongest first as OpenCV returns them, N == 0 if none are found.
+	"""
+	C = cv2.HoughCircles(toGray(G), cv2.HOUGH_GRADIENT, dp=dp, minDist=minDist,
+			param1=param1, param2=param2, minRadius=int(minRadius), maxRadius=int(maxRadius))
+	if C is None:
+		return np.zeros((0, 3), dtype=np.int32)
+	return np.int32(np.around(C[0,:,:3]))
+
+def scaleHoughParameters(t, scale):
+	"""Return the HoughCirclesDialog tuple 't' for an image downscaled by 'scale',
+	distance and radius are scaled, and also param2 (accumulator threshold) as
+	the number of votes for a circle is proportional to its circumference.
+	"""
+	(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = t
+	if (scale == 1.0):
+		return t
+	return (dp, max(1.0, minDist*scale), param1, max(1.0, param2*scale), 
+			max(0, int(minRadius*scale)), max(1, int(np.ceil(maxRadius*scale))), maxCircles)
+
+def houghCirclesImage(G, B, t, scale=1.0, color=(255, 0, 255), thickness=2):
+	"""Return a copy of BGR image B with the circles found in gray image G drawn in it,
+	't' is the tuple (dp, minDist, param1, param2, minRadius, maxRadius, maxCircles)
+	as returned by HoughCirclesDialog. Used by the try..() methods for preview.
+	G may be B downscaled by 'scale', then 't' is scaled for G, and the circles
+	found are scaled back and drawn in (full size) B.
+	"""
+	(dp, minDist, param1, param2, minRadius, maxRadius, maxCircles) = scaleHoughParameters(t, scale)
+	C = houghCircles(G, dp, minDist, param1, param2, minRadius, maxRadius)[:maxCircles]
+	if (scale != 1.0):
+		C = np.int32(np.around(C/scale))
+	B = B.copy()
+	drawCircles(B, C[:,:2], C[:,2], color, thickness)
+	return B
+
+def circlesImage(A, dp=2.0, minDist=40.0, param1=100.0, param2=60.0, minRadius=20, maxRadius=60, maxCircles=20):
+	"""Return BGR version of image A with the circles found by cv2.HoughCircles() drawn in it,
+	the arguments are as in HoughCirclesDialog, used as operation 'circles' in a pipeline.
+	"""
+	G = toGray(A)
+	B = cv2.cvtColor(G, cv2.COLOR_GRAY2BGR) if (G is A) else A[:,:,:3]
+	return houghCirclesImage(G, B, (dp, minDist, param1, param2, minRadius, maxRadius, maxCircles))
+
+def blobStats(B, connectivity=8):
+	"""Return (L, stats) for the blobs (connected components) in binary image B, L is the label image
+	(int32, 0 is background) and stats is a dict of arrays, one element for each blob (label 1, 2, ..):
+	'label', 'area', 'x', 'y' (centroid), 'left', 'top', 'width', 'height', 'perimeter', 'circularity'.
+	The perimeter is the number of pixel edges between the blob and other pixels times pi/4, which
+	is close to the length of the boundary of round blobs, and circularity is 4*pi*area/perimeter**2.
+	"""
+	(n, L, S, P) = cv2.connectedComponentsWithStats(np.uint8(B > 0), connectivity=connectivity, ltype=cv2.CV_32S)
+	Z = np.pad(L, 1)   # background all around
+	edges = np.zeros(n, dtype=np.int64)
+	for (a, b) in ((Z[:,1:], Z[:,:-1]), (Z[1:,:], Z[:-1,:])):   # horizontal and vertical neighbours
+		d = (a != b)
+		edges += np.bincount(a[d], minlength=n) + np.bincount(b[d], minlength=n)
+	stats = {'label': np.arange(1, n), 'area': S[1:,cv2.CC_STAT_AREA], 'x': P[1:,0], 'y': P[1:,1],
+			'left': S[1:,cv2.CC_STAT_LEFT], 'top': S[1:,cv2.CC_STAT_TOP],
+			'width': S[1:,cv2.CC_STAT_WIDTH], 'height': S[1:,cv2.CC_STAT_HEIGHT],
+			'perimeter': edges[1:] * (np.pi/4)}
+	stats['circularity'] = 4*np.pi*stats['area'] / np.maximum(stats['perimeter'], 1)**2
+	return (L, stats)
+
+def findDots(G, t=60, area=(50, 10000), circularity=(0.7, 1.2), openSize=3):
+	"""Return (dots, L) for the round dark dots in gray image G, pixels darker than 't' that are
+	opened (morphology) and have area and circularity in the given ranges. 'dots' is the stats dict
+	from blobStats() with only the dots, and L is the label image (also for blobs that are not dots).
+	"""
+	(_, B) = cv2.threshold(G, thresh=t, maxval=255, type=cv2.THRESH_BINARY_INV)
+	if (openSize > 1):
+		B = cv2.morphologyEx(B, cv2.MORPH_OPEN, np.ones((openSize, openSize), np.uint8))
+	(L, stats) = blobStats(B)
+	keep = ((stats['area'] >= area[0]) & (stats['area'] <= area[1]) &
+			(stats['circularity'] > circularity[0]) & (stats['circularity'] < circularity[1]))
+	return ({key: value[keep] for (key, value) in stats.items()}, L)
+
+def dotsImage(dots, L):
+	"""Return binary image (uint8), 0 for the pixels in the dots and 255 elsewhere."""
+	lut = np.full(L.max() + 1, 255, dtype=np.uint8)
+	lut[dots['label']] = 0
+	return lut[L]
+
+def scaledOddSize(n, scale):
+	"""Return filter size n scaled, as odd int >= 1, ex. smoothing size for a downscaled image."""
+	return 2*int(n*scale/2) + 1
+
+def atScale(fun, A, shape, *args, **kwargs):
+	"""Return fun(A, *args, **kwargs) resized to 'shape' (height, width, ..), used to show
+	a preview made from a downscaled image A in the size of the full image.
+	"""
+	B = fun(A, *args, **kwargs)
+	if (B.shape[:2] != tuple(shape[:2])):
+		B = cv2.resize(B, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+	return B
+
+# The operations that can be used in a pipeline, name: (function, [names of arguments])
+# arguments may be given by position or by name (in the pipeline text)
+operations = {
+	'gray':   (toGray, []),
+	'edges':  (toEdges, ['k', 's']),
+	'filter': (lambda A, n=11, ul=1.0, ur=1.0, ll=-1.0, lr=-1.0, s=5:
+	           filterImage(A, filterKernel(n, ul, ur, ll, lr), s), ['n', 'ul', 'ur', 'll', 'lr', 's']),
+	'binary': (lambda A, t=0: toBinary(A, t)[1], ['t']),
+	'otsu':   (lambda A: toBinary(A, 0)[1], []),
+	'resize': (lambda A, w=0, h=0, p=100: resizeImage(A, w, h, p), ['w', 'h', 'p']),
+	'cut':    (cutBlackFrame, []),
+	'rot90':  (rotate90, ['k']),
+	'rotate': (rotateImage, ['angle', 'expand', 'border']),
+	'flip':   (flipImage, ['axis']),
+	'transpose': (transposeImage, []),
+	'circles': (circlesImage, ['dp', 'minDist', 'param1', 'param2', 'minRadius', 'maxRadius', 'maxCircles']),
+	'dots':   (lambda A, t=60: dotsImage(*findDots(toGray(A), t)), ['t']),
+	}
+
+def parsePipeline(text):
+	"""Parse a pipeline given as text into a list of steps, (name, dict of arguments).
+	Steps are separated by '->' (or by ';' or new line), lines starting with '#' are comments.
+	ex.: steps = parsePipeline("gray -> edges(k=3, s=5) -> otsu")
+	     gives [('gray', {}), ('edges', {'k': 3, 's': 5}), ('otsu', {})]
+	Raises ValueError for unknown operations or arguments.
+	"""
+	lines = [line for line in text.splitlines() if not line.strip().startswith('#')]
+	parts = ' -> '.join(lines).replace(';', '->').split('->')
+	steps = []
+	for part in parts:
+		part = part.strip()
+		if (part == ''):
+			continue
+		try:
+			node = ast.parse(part, mode='eval').body
+		except SyntaxError:
+			raise ValueError( f"parsePipeline: can not parse step '{part}'" )
+		if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+			name = node.func.id
+		elif isinstance(node, ast.Name):
+			(name, node) = (node.id, None)
+		else:
+			raise ValueError( f"parsePipeline: step '{part}' is not name or name(arguments)" )
+		if name not in operations:
+			raise ValueError( f"parsePipeline: unknown operation '{name}', use one of {list(operations)}" )
+		argNames = operations[name][1]
+		kwargs = {}
+		if node is not None:
+			if (len(node.args) > len(argNames)):
+				raise ValueError( f"parsePipeline: too many arguments in step '{part}'" )
+			try:
+				for (i, a) in enumerate(node.args):
+					kwargs[argNames[i]] = ast.literal_eval(a)
+				for kw in node.keywords:
+					if kw.arg not in argNames:
+						raise ValueError( f"parsePipeline: '{name}' has no argument '{kw.arg}', use {argNames}" )
+					kwargs[kw.arg] = ast.literal_eval(kw.value)
+			except (SyntaxError, TypeError) as e:   # literal_eval raise ValueError itself
+				raise ValueError( f"parsePipeline: argument in step '{part}' is not a number ({e})" )
+		steps.append((name, kwargs))
+	return steps
+
+def pipelineText(steps):
+	"""Return the text for a list of steps, i.e. the opposite of parsePipeline()."""
+	parts = []
+	for (name, kwargs) in steps:
+		if kwargs:
+			parts.append( name + '(' + ', '.join([f"{k}={v!r}" for (k, v) in kwargs.items()]) + ')' )
+		else:
+			parts.append(name)
+	return ' -> '.join(parts)
+
+def runPipeline(A, steps):
+	"""Apply the steps (as returned by parsePipeline) one by one on image A, return result."""
+	for (name, kwargs) in steps:
+		A = operations[name][0](A, **kwargs)
+	return A
+
+def _loopBbox(A):
+	"""The four loops used by cropEnd() in appImageViewer1.py before, kept for benchFindBbox()."""
+	(left,right,top,bottom) = (0,0,0,0)
+	for column in range(0,A.shape[1]):
+		if (A[:,column,0].max() > 0) or (A[:,column,1].max() > 0) or (A[:,column,2].max() > 0): break
+		else: left += 1
+	for column in range(A.shape[1]-1,-1,-1):
+		if (A[:,column,0].max() > 0) or (A[:,column,1].max() > 0) or (A[:,column,2].max() > 0): break
+		else: right += 1
+	for row in range(0,A.shape[0]):
+		if (A[row,:,0].max() > 0) or (A[row,:,1].max() > 0) or (A[row,:,2].max() > 0): break
+		else: top += 1
+	for row in range(A.shape[0]-1,-1,-1):
+		if (A[row,:,0].max() > 0) or (A[row,:,1].max() > 0) or (A[row,:,2].max() > 0): break
+		else: bottom += 1
+	return (left, top, A.shape[1]-left-right, A.shape[0]-top-bottom)
+
+def benchFindBbox(repeat=3):
+	"""Compare find_nonzero_bbox() and the loops on 20 MP color images (5472 x 3648),
+	with a thin black frame, a wide black frame and a small object on black background.
+	"""
+	import time
+	print("myImageOps.py: benchFindBbox()  # time of finding black frame in 20 MP color image")
+	for (name, frame) in (("thin frame ", 8), ("wide frame ", 800), ("small obj. ", 1700)):
+		A = np.zeros((3648, 5472, 3), dtype=np.uint8)
+		A[frame:-frame, frame:-frame] = 50
+		for (fname, fun) in (("loops", _loopBbox), ("find_nonzero_bbox", find_nonzero_bbox)):
+			t0 = time.perf_counter()
+			for i in range(repeat):
+				box = fun(A)
+			t = (time.perf_counter() - t0)/repeat
+			print( f"  {name} {fname:18s} {1000*t:8.1f} ms   box = {box}" )
+	return
+
+def testAll():
+	"""Simple function for testing the functions in this file."""
+	print("myImageOps.py: testAll()  # test the functions in this file")
+	(x, y) = np.meshgrid(np.arange(320), np.arange(240))
+	A = np.zeros((260, 340, 3), dtype=np.uint8)
+	A[10:250, 10:330] = np.dstack(((x//3) % 256, (y//2) % 256, 128 + 100*((x//40 + y//40) % 2))).astype(np.uint8)
+	for text in ("gray", "cut", "gray -> edges(k=3, s=5) -> otsu", "filter(11, s=3) -> binary(t=100)",
+				 "resize(p=50) -> edges(5, 1)", "rot90(3) -> flip('hv') -> transpose", "rotate(30)",
+				 "rotate(-30, expand=False) -> gray"):
+		steps = parsePipeline(text)
+		B = runPipeline(A, steps)
+		print( f"  {pipelineText(steps):40s} gives array of {B.dtype.name}, shape {str(B.shape)}" )
+	C = np.zeros((200, 300), dtype=np.uint8)
+	C[50:150, 60:240] = 200
+	(xy, R) = findCornersHarris(C, maxCorners=10)
+	print( f"  findCornersHarris on a rectangle gives {len(xy)} corners: {xy.tolist()}" )
+	D = np.full((200, 300), 200, dtype=np.uint8)
+	for (x, y, r) in ((50, 50, 10), (120, 60, 20), (200, 150, 30), (280, 20, 3)):   # the last is too small
+		cv2.circle(D, (x, y), r, 0, -1)
+	cv2.rectangle(D, (20, 120), (120, 130), 0, -1)   # not round
+	(dots, L) = findDots(D)
+	print( f"  findDots finds {len(dots['area'])} of {L.max()} blobs, circularity {dots['circularity'].round(2).tolist()}," +
+			f" centers {np.around(np.stack((dots['x'], dots['y']), axis=1)).astype(int).tolist()}" )
+	for B in (A, A[:,:,0], np.zeros((5,7), dtype=np.uint8)):
+		print( f"  find_nonzero_bbox on shape {str(B.shape):14s} gives {find_nonzero_bbox(B)}" )
+	try:
+		parsePipeline("gray -> blur(3)")
+	except ValueError as e:
+		print( f"  ValueError as expected: {e}" )
+	return
+
+if __name__ == '__main__':
+	if (len(sys.argv) > 1) and (sys.argv[1] == 'bench'):
+		benchFindBbox()
+	else:
+		testAll()
@@ -4,10 +4,11 @@
 # ../ELE610/py3/myImageTools.py 
 #
 #  Some tools for image processing. The functions are:
-#  qimage2np() and np2qimage2np() convert image from Qt to numpy (and back)
-#    as used for appImageViewer*.py, the work is done by the qimage2ndarray 
-#    package if it is available, else simple (and slow) file write and read is used.
-#  smoothFilter()  returns a simple low-pass filter
+#  qimage2np() and np2qimage() convert image from Qt to numpy (and back)
+#    as used for appImageViewer*.py, both work directly on the image memory 
+#    (no copy unless asked for), qimage2ndarray package and files are not needed.
+#    The functions are re-entrant (no temp.png), convertMany() run them in a thread pool.
+#  smoothFilter()  returns a simple low-pass filter (cached, see myKernels.py)
 #
 # Karl Skretting, UiS, February 2019, November 2020 (need Python 3.6 ->), June 2022
 
@@ -15,87 +16,200 @@
 #   >>> from myImageTools import smoothFilter, qimage2np, np2qimage
 #   >>> import myImageTools
 #   (py38) C:\..\py3> python myImageTools.py   # test
+#   (py38) C:\..\py3> python myImageTools.py bench   # time np2qimage
 
 import sys
 import os.path
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5 import sip
 from PyQt5.QtGui import QImage
 import numpy as np
 import cv2
-
-try:
-	import qimage2ndarray as q2n
-	q2n_ok = True
-except ImportError:
-	# raise ImportError( f"{_appFileName}: Requires qimage2ndarray." )
-	print( f"{_appFileName}: Import error for qimage2ndarray. Continue without it." )
-	q2n_ok = False
-#end try, import qimage2ndarray
+from myKernels import smoothKernel
 
 empty_ndarray = np.array([], dtype=np.uint8)
-tempFile = 'temp.png'
-
-def smoothFilter(len=3):
-	"""Generate and returns a small simple low-pass FIR filter with given length (3,5,7 or 9)."""
-	if (len == 3):
-		a = np.array([1,2,1])/4
-	elif (len == 5):
-		a = np.array([1,4,6,4,1])/16
-	elif (len == 7):
-		a = np.array([1,4,6,6,6,4,1])/28
-	elif (len == 9):
-		a = np.array([1,4,6,8,8,8,6,4,1])/46
-	else:			
-		a = np.array([1,2,1])/4
+
+def tempFileName(suffix='.png'):
+	"""Return the name of a new, unique (and empty) temporary file.
+	
+	The conversion functions in this file do not use any files, but if a file is
+	needed, ex. for testing, use this rather than a fixed name like 'temp.png' 
+	so that threads (and several programs) do not overwrite each others files.
+	The file is made in tmpfs (/dev/shm) when available, the caller should remove it.
+	"""
+	tmpDir = '/dev/shm' if os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+	(fd, fName) = tempfile.mkstemp(suffix=suffix, prefix='myImageTools_', dir=tmpDir)
+	os.close(fd)
+	return fName
+#end function tempFileName
+
+def convertMany(fun, images, maxWorkers=None):
+	"""Convert many images, ex. by np2qimage or qimage2np, using a thread pool.
+	
+	The conversion functions here are re-entrant, they have no shared state
+	and no files, so they can run in parallel. Note that QImage (unlike QPixmap) 
+	may be used outside the GUI thread.
+	ex.: qImages = convertMany(lambda B: np2qimage(B, copy=True), arrays)
+	"""
+	with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+		return list(executor.map(fun, images))
+#end function convertMany
+
+def smoothFilter(len=3, kind='binomial', sigma=0.0):
+	"""Returns a small simple low-pass FIR filter with given (odd) length, ex. 3,5,7 or 9.
+	The filter is taken from the kernel bank in myKernels.py, i.e. it is made only once
+	and the returned float32 array is shared (read-only). Other lengths give length 3.
+	kind may be 'binomial' (default), 'gaussian' (with sigma) or 'box'.
+	"""
+	if (len < 3) or ((len % 2) == 0):
+		len = 3
 	#
-	return a 
+	return smoothKernel(len, kind, sigma)
 
-# could these functions be simplified if we include isAllGray?
-def qimage2np(qImage):
+class _QImageBuffer:
+	"""Expose the pixel memory of a QImage through the numpy array interface.
+	The object holds a (shallow) QImage copy, thus a numpy array made from it
+	keeps the QImage data alive, and if the original QImage is changed later it 
+	is detached by Qt and this buffer is not affected.
+	"""
+	def __init__(self, qImage, shape, strides, typestr):
+		self.qImage = QImage(qImage)   # shallow copy, shares pixel data
+		self.__array_interface__ = {
+			'shape': shape,
+			'strides': strides,
+			'typestr': typestr,
+			'data': (int(self.qImage.constBits()), True),   # True: read-only
+			'version': 3 }
+		return
+	#end class _QImageBuffer
+
+def _qimageView(qImage, dtype=np.uint8, channels=1):
+	"""Return a read-only numpy view of the pixel memory in qImage, rows may be padded."""
+	(w, h) = (qImage.width(), qImage.height())
+	itemSize = np.dtype(dtype).itemsize
+	if (channels == 1):
+		(shape, strides) = ((h, w), (qImage.bytesPerLine(), itemSize))
+	else:
+		(shape, strides) = ((h, w, channels), (qImage.bytesPerLine(), channels*itemSize, itemSize))
+	return np.asarray(_QImageBuffer(qImage, shape, strides, np.dtype(dtype).str))
+#end function _qimageView
+
+def qimage2np(qImage, copy=False):
 	"""Converts a QImage object into a numpy array 2D or 3D (for color).
 
-	The best (fastest) way to do this is to use a function that extract the 
-	bytes inside the QImage memory representation. Here we try to use the
-	qimage2ndarray package, but if import of this is unsuccessful an alternative
-	is used; the image is saved in a file and then read by OpenCV function imread.
+	The bytes inside the QImage memory representation are read directly, through
+	QImage.constBits() and QImage.bytesPerLine(), thus padded rows are handled and
+	neither qimage2ndarray nor any file is needed. Channel order is as in OpenCV:
+	  Format_Grayscale8, Format_Alpha8          --> 2D uint8 (Grayscale16 gives uint16)
+	  Format_Indexed8                           --> 2D if color table is gray, else 3D BGR
+	  Format_RGB32, Format_ARGB32(_Premultiplied) --> 3D BGRA (as qimage2ndarray.byte_view)
+	  Format_BGR888                             --> 3D BGR
+	  Format_RGB888, Format_RGBA8888(...)       --> 3D BGR or BGRA, converted copy
+	  other formats are first converted by Qt to Format_ARGB32
+	When no conversion is needed B is a read-only view that keeps the image data 
+	alive, with copy=True (or when conversion is needed) B is an owned, writable array.
 	ex.: B = qimage2np(qImage)
+	     B = qimage2np(qImage, copy=True)
 	
 	Parameters
 	----------
 	qImage: QImage
+	copy: bool, if True the returned array owns (a copy of) the pixel data
 
 	Returns
 	-------
 	B: numpy.ndarray (of uint8) 
 	"""
-	if q2n_ok:
-		if (not qImage.isNull()):
-			B = q2n.byte_view(qImage)   # B may be 2D or 3D (RGBA/BRGA)
-		else:
-			B = empty_ndarray
-	else: 
-		print("qimage2np: qimage2ndarray (q2n) is not imported, make image B (numpy array) by writing and reading a file.")
-		if qImage.save(tempFile,quality=100):   #  True if successfully saved
-			B = cv2.imread(tempFile)
-		else:
-			B = empty_ndarray
-		#
+	if (not isinstance(qImage, QImage)) or qImage.isNull():
+		return empty_ndarray
 	#
+	fmt = qImage.format()
+	little = (sys.byteorder == 'little')
+	if (fmt == QImage.Format_Indexed8):
+		ct = np.array(qImage.colorTable(), dtype=np.uint32)
+		if (ct.size == 0):   # no color table, use index as gray level
+			ct = np.arange(256, dtype=np.uint32)*0x010101 + 0xff000000
+		ct = np.concatenate((ct, np.zeros(max(0, 256-ct.size), dtype=np.uint32)))
+		lut = np.stack(((ct & 0xff), ((ct >> 8) & 0xff), ((ct >> 16) & 0xff)), axis=1).astype(np.uint8)   # BGR
+		I = _qimageView(qImage)
+		if np.all(lut[:,0] == lut[:,1]) and np.all(lut[:,0] == lut[:,2]):
+			return lut[:,0][I]
+		return lut[I]
+	if (fmt in (QImage.Format_Grayscale8, QImage.Format_Alpha8)):
+		B = _qimageView(qImage)
+	elif (fmt == getattr(QImage, 'Format_Grayscale16', -1)):
+		B = _qimageView(qImage, dtype=np.uint16)
+	elif little and (fmt in (QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied)):
+		B = _qimageView(qImage, channels=4)
+	elif (fmt == getattr(QImage, 'Format_BGR888', -1)):
+		B = _qimageView(qImage, channels=3)
+	elif (fmt == QImage.Format_RGB888):
+		return cv2.cvtColor(_qimageView(qImage, channels=3), cv2.COLOR_RGB2BGR)
+	elif (fmt in (QImage.Format_RGBA8888, QImage.Format_RGBX8888, QImage.Format_RGBA8888_Premultiplied)):
+		return cv2.cvtColor(_qimageView(qImage, channels=4), cv2.COLOR_RGBA2BGRA)
+	else:   # Mono, RGB16, RGB30, big endian ARGB32, ...
+		B = qimage2np(qImage.convertToFormat(QImage.Format_ARGB32 if little else QImage.Format_RGBA8888))
+	#
+	if copy and (not B.flags.writeable):
+		B = B.copy()
 	return B
 #end function qimage2np
 
-def np2qimage(B):
+def _qFormatFor(channels, order='BGR'):
+	"""Return the QImage format that has the same byte layout in memory as a numpy 
+	image with the given number of channels, or None if there is no such format.
+	Channel order in numpy images is BGR(A) as in OpenCV, unless order is 'RGB'.
+	Note that (A)RGB32 formats are stored as B,G,R,A bytes on little endian machines.
+	"""
+	if (channels == 1):
+		return QImage.Format_Grayscale8
+	if (channels == 3):
+		if (order == 'RGB'):
+			return QImage.Format_RGB888
+		return getattr(QImage, 'Format_BGR888', None)   # Qt 5.14 ->
+	if (channels == 4):
+		if (order == 'RGB'):
+			return QImage.Format_RGBA8888
+		if (sys.byteorder == 'little'):
+			return QImage.Format_ARGB32
+	return None
+#end function _qFormatFor
+
+def _np2qimageEncoded(B):
+	"""Converts a numpy array to QImage object by encoding it as PNG in memory.
+	This is slower than wrapping the array buffer, but handles any shape OpenCV can 
+	encode, and (unlike the old temp file solution) it never touches the disk.
+	"""
+	try:
+		(ok, buf) = cv2.imencode('.png', B)
+	except cv2.error:
+		ok = False
+	if not ok:
+		print( f"np2qimage: can not make QImage from array of shape {str(B.shape)}, return empty QImage." )
+		return QImage()
+	return QImage.fromData(buf.tobytes(), 'PNG')
+#end function _np2qimageEncoded
+
+def np2qimage(B, order='BGR', copy=False):
 	"""Converts a numpy array to QImage object.
 
-	This is done by gray2qimage() method in qimage2ndarray package but only
-	for gray scale images. For color image, i.e. 3D array B, the image is saved 
-	in a file by OpenCV imwrite() function and then read by when QImage object
-	is created. If B is not an array representing an image, an empty QImage
-	object is returned.
-	ex.: qImage = qimage2np(B)
+	For gray scale (2D) images, and BGR, BGRA, RGB or RGBA (3D) images the QImage 
+	object is made directly on the memory buffer of B, using the row stride of B
+	as bytesPerLine, i.e. no pixel data is copied or converted. The QImage keeps 
+	a reference to the array (B, or a contiguous copy of it if B is not laid out 
+	as Qt needs) so the buffer lives as long as the QImage object does.
+	Note that a shallow QImage copy, ex. QImage(qImage), shares the buffer but not 
+	the reference, use copy=True to get a QImage that owns its pixel data.
+	Other arrays are converted by PNG encoding in memory, and if B is not an array
+	representing an image, an empty QImage object is returned.
+	ex.: qImage = np2qimage(B)
 	
 	Parameters
 	----------
 	B: numpy.ndarray (of uint8) 
+	order: str, 'BGR' (default, as OpenCV) or 'RGB', channel order for 3D B
+	copy: bool, if True the returned QImage owns a deep copy of the pixel data
 	
 	Returns
 	-------
@@ -105,19 +219,65 @@ def np2qimage(B):
 		print("np2qimage: Ignore illegal argument B (not numpy array), return empty QImage.")
 		return QImage()  
 	#
-	if q2n_ok and ((len(B.shape) == 2) or ((len(B.shape) == 3) and (B.shape[2] == 1))):
-		qImage = q2n.gray2qimage(B)   # must be gray for this, and qImage.format = 3 (indexed)
-	elif (len(B.shape) == 2) or (len(B.shape) == 3):   # must be 2D or 3D array 
-		# print( f"np2qimage: write image B (numpy array) to file {tempFile}" )
-		cv2.imwrite(tempFile, B)
-		# print( f"np2qimage: and read it from file {tempFile} into qImage" )
-		qImage = QImage(tempFile)   # read from file
-	else:   # B = empty_ndarray ends here
-		qImage = QImage()   # and returns empty QImage
-	# 
+	if (B.size == 0) or not ((len(B.shape) == 2) or (len(B.shape) == 3)):
+		return QImage()   # B = empty_ndarray ends here
+	#
+	if (B.dtype != np.uint8):
+		B = np.clip(B, 0, 255).astype(np.uint8)
+	#
+	channels = 1 if (len(B.shape) == 2) else B.shape[2]
+	fmt = _qFormatFor(channels, order)
+	if (fmt is None) and (channels in (3,4)):   # old Qt or big endian, swap to the other order
+		B = np.ascontiguousarray(B[:,:,[2,1,0]+list(range(3,channels))])
+		fmt = _qFormatFor(channels, 'BGR' if (order == 'RGB') else 'RGB')
+	if fmt is None:
+		return _np2qimageEncoded(B)
+	#
+	# Qt needs pixels (and bytes within each pixel) to be packed along each row,
+	# rows may be padded, i.e. B.strides[0] may be larger than width*channels
+	if (B.strides[-1] != 1) or ((len(B.shape) == 3) and (B.strides[1] != channels)) or (B.strides[0] < 0):
+		B = np.ascontiguousarray(B)
+	#
+	# B.data is not accepted for padded rows (not contiguous), give Qt the pointer instead
+	(h, w) = B.shape[:2]
+	qImage = QImage(sip.voidptr(B.ctypes.data), w, h, B.strides[0], fmt)
+	if copy:
+		return qImage.copy()
+	qImage._npBuffer = B   # keep the array alive as long as qImage exists
 	return qImage
 #end function np2qimage
 
+def benchNp2qimage(repeat=10):
+	"""Compare time for np2qimage() with the old file based conversion, 
+	i.e. cv2.imwrite() followed by QImage(file), on HD and 4K frames.
+	"""
+	import time
+	print("myImageTools.py: benchNp2qimage()  # compare np2qimage with file write and read")
+	rng = np.random.default_rng(0)
+	fName = tempFileName('.png')
+	for (w, h) in ((1280, 720), (3840, 2160)):
+		B = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+		t0 = time.perf_counter()
+		for i in range(repeat):
+			cv2.imwrite(fName, B)
+			qImage = QImage(fName)
+		tFile = (time.perf_counter() - t0)/repeat
+		t0 = time.perf_counter()
+		for i in range(repeat):
+			qImage = np2qimage(B)
+		tView = (time.perf_counter() - t0)/repeat
+		t0 = time.perf_counter()
+		for i in range(repeat):
+			qImage = np2qimage(B, copy=True)
+		tCopy = (time.perf_counter() - t0)/repeat
+		print( (f"  ({w}x{h}) file: {1000*tFile:8.2f} ms,  view: {1000*tView:8.3f} ms," + 
+		        f"  copy: {1000*tCopy:8.3f} ms,  speedup (view) {tFile/max(tView,1e-9):8.0f}x") )
+	#
+	if os.path.exists(fName):
+		os.remove(fName)
+	return
+#end function benchNp2qimage
+
 def testAll():
 	"""Simple function for testing the three functions in this file."""
 	print("myImageTools.py: testAll()  # test the three functions in this file")
@@ -131,18 +291,19 @@ def testAll():
 	# or the simple way: f"  returned values are: {str(tuple(b))}"
 	#
 	ok = True
-	if not os.path.exists(tempFile):
-		print( f"The file {tempFile} does not exist" )
-		ok = False
+	fName = tempFileName('.png')
+	(x, y) = np.meshgrid(np.arange(640), np.arange(480))
+	cv2.imwrite(fName, np.dstack(((x//3) % 256, (y//2) % 256, (x+y) % 256)).astype(np.uint8))
 	#
 	if ok:
-		print( "Read image B from file using OpenCV imread" ) 
+		print( f"Read image B from file {fName} using OpenCV imread" ) 
 		try:
-			B = cv2.imread(tempFile)
+			B = cv2.imread(fName)
 		except:
 			print("  error when using cv2.imread()") 
 			B = []
 		#
+		os.remove(fName)
 		if isinstance(B, np.ndarray):
 			print(f"  B is np.ndarray of {B.dtype.name}, shape {B.shape}.") 
 		else:
@@ -169,19 +330,38 @@ def testAll():
 		# 
 	if ok:
 		if (isinstance(B, np.ndarray) and (len(B.shape)==3) and (B.shape[2]==3) and
-			isinstance(C, np.ndarray) and (len(C.shape)==3) and (C.shape[2]==4) ):
+			isinstance(C, np.ndarray) and (len(C.shape)==3) and (C.shape[2]>=3) ):
 			xy = (x,y) = (243,421)  # xy: tuple, x,y: int
 			if ((0 <= x) and (x < B.shape[0]) and (x < C.shape[0]) and
 				(0 <= y) and (y < B.shape[1]) and (y < C.shape[1]) ):
 				print( (f"  B[{x},{y}] = [{B[x,y,0]},{B[x,y,1]},{B[x,y,2]}]," +
-				        f"  C[{x},{y}] = [{C[x,y,0]},{C[x,y,1]},{C[x,y,2]},{C[x,y,3]}]") )
+				        f"  C[{x},{y}] = {str([int(v) for v in C[x,y,:]])}") )
 			#
+			print( f"  C equals B: {np.array_equal(B, C[:,:,:3])}" )
+		#
+	if ok:
+		print( "Make qImage from views of B using np2qimage, rows are padded or not contiguous" )
+		views = {'ROI B[:,10:110]': B[:,10:110], 'row step B[::2]': B[::2],
+				'gray ROI G[:,10:110]': np.ascontiguousarray(B[:,:,1])[:,10:110]}
+		for (name, V) in views.items():
+			C = qimage2np(np2qimage(V))
+			C = C[:,:,:3] if (len(C.shape) == 3) else C
+			print( f"  {name} strides {V.strides}: C equals view: {np.array_equal(V, C)}" )
 		#
+	if ok:
+		print( "Convert 16 images back and forth in a thread pool using convertMany" )
+		arrays = [np.roll(B, 7*i, axis=1) for i in range(16)]
+		qImages = convertMany(lambda A: np2qimage(A, copy=True), arrays)
+		arrays2 = convertMany(lambda q: qimage2np(q, copy=True), qImages)
+		print( f"  all 16 round-trips are equal: {all(np.array_equal(A, A2) for (A, A2) in zip(arrays, arrays2))}" )
 	#end if
 	#
 	return
 
 # This is the standard boilerplate that calls the main() function.
 if __name__ == '__main__':
-	testAll()
+	if (len(sys.argv) >= 2) and (sys.argv[1] == 'bench'):
+		benchNp2qimage()
+	else:
+		testAll()
 
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ../ELE610/py3/myKernels.py
+#
+#  A bank of small separable (1D) filter kernels, each kernel is made once and
+#  then cached, so that dialogs calling try..() for every slider tick do not
+#  rebuild the same arrays. All kernels are float32 and read-only. The functions are:
+#  binomialKernel(), gaussianKernel(), boxKernel()  low-pass kernels of any odd length
+#  smoothKernel()   the low-pass filter used by smoothFilter() in myImageTools.py
+#  sobelKernels()   the two 1D kernels that make up a Sobel filter
+#  smoothSobelMagnitude()  smoothing and Sobel gradient magnitude, fused kernels,
+#                   i.e. only one cv2.sepFilter2D() pass for each gradient direction
+
+# Example on how to use file:
+#   >>> from myKernels import smoothKernel, smoothSobelMagnitude
+#   (py38) C:\..\py3> python myKernels.py   # test
+
+import sys
+from functools import lru_cache
+import numpy as np
+import cv2
+
+def _readOnly(a):
+	"""Make 'a' a read-only float32 array, as it is shared by all users of the cache."""
+	a = np.ascontiguousarray(a, dtype=np.float32)
+	a.setflags(write=False)
+	return a
+
+def _oddLength(n):
+	"""Return 'n' as an odd int >= 1, even values are rounded up."""
+	n = max(1, int(n))
+	return n if (n % 2) else n+1
+
+@lru_cache(maxsize=None)
+def binomialKernel(n=3):
+	"""Return normalized binomial low-pass kernel of odd length n, ex. n=5: [1,4,6,4,1]/16"""
+	n = _oddLength(n)
+	a = np.ones(1)
+	for i in range(n-1):
+		a = np.convolve(a, [1,1])
+	return _readOnly(a/a.sum())
+
+@lru_cache(maxsize=None)
+def gaussianKernel(n=3, sigma=0.0):
+	"""Return normalized Gaussian low-pass kernel of odd length n and standard deviation sigma.
+	If sigma <= 0 it is computed from n as in OpenCV, sigma = 0.3*((n-1)*0.5 - 1) + 0.8
+	"""
+	n = _oddLength(n)
+	return _readOnly(cv2.getGaussianKernel(n, float(sigma), cv2.CV_32F).ravel())
+
+@lru_cache(maxsize=None)
+def boxKernel(n=3):
+	"""Return normalized box (moving average) kernel of odd length n."""
+	n = _oddLength(n)
+	return _readOnly(np.ones(n)/n)
+
+# The filters of length 7 and 9 that smoothFilter() always has used, they are kept
+# so that images made before look the same, other lengths are binomial.
+_legacySmooth = { 7: [1,4,6,6,6,4,1], 9: [1,4,6,8,8,8,6,4,1] }
+
+@lru_cache(maxsize=None)
+def smoothKernel(n=3, kind='binomial', sigma=0.0):
+	"""Return the cached low-pass kernel of (odd) length n, kind is 'binomial', 'gaussian' or 'box'.
+	For kind 'binomial' and n equal 7 or 9 the old smoothFilter() values are returned.
+	"""
+	if (kind == 'gaussian'):
+		return gaussianKernel(n, sigma)
+	if (kind == 'box'):
+		return boxKernel(n)
+	if (n in _legacySmooth):
+		a = np.array(_legacySmooth[n], dtype=np.float64)
+		return _readOnly(a/a.sum())
+	return binomialKernel(n)
+
+@lru_cache(maxsize=None)
+def sobelKernels(dx=1, dy=0, ksize=3):
+	"""Return (kx, ky), the 1D kernels for a Sobel filter, as cv2.getDerivKernels(..)."""
+	(kx, ky) = cv2.getDerivKernels(dx, dy, ksize, normalize=False, ktype=cv2.CV_32F)
+	return (_readOnly(kx.ravel()), _readOnly(ky.ravel()))
+
+@lru_cache(maxsize=None)
+def smoothSobelKernels(dx=1, dy=0, ksize=3, smooth=1, kind='binomial', sigma=0.0):
+	"""Return (kx, ky), the Sobel kernels convolved with the low-pass kernel of length smooth."""
+	(kx, ky) = sobelKernels(dx, dy, ksize)
+	if (smooth > 1):
+		a = smoothKernel(smooth, kind, sigma)
+		(kx, ky) = (np.convolve(kx, a), np.convolve(ky, a))
+	return (_readOnly(kx), _readOnly(ky))
+
+def smoothSobelMagnitude(A, ksize=3, smooth=1, kind='binomial', sigma=0.0):
+	"""Return the gradient magnitude of the smoothed (gray scale) image A, as float32.
+
+	Smoothing and Sobel filter are both linear and separable, so their 1D kernels
+	are convolved (and cached) and each gradient direction is a single pass of
+	cv2.sepFilter2D(). Note that this smooths before the magnitude is computed,
+	while toEdges() in appImageViewer1.py smooths the magnitude image.
+	ex.: E = smoothSobelMagnitude(A, ksize=3, smooth=5)
+	"""
+	(kx, ky) = smoothSobelKernels(1, 0, ksize, smooth, kind, sigma)
+	Ex = cv2.sepFilter2D(A, ddepth=cv2.CV_32F, kernelX=kx, kernelY=ky)
+	(kx, ky) = smoothSobelKernels(0, 1, ksize, smooth, kind, sigma)
+	Ey = cv2.sepFilter2D(A, ddepth=cv2.CV_32F, kernelX=kx, kernelY=ky)
+	return cv2.magnitude(Ex, Ey)
+
+def testAll():
+	"""Simple function for testing the functions in this file."""
+	print("myKernels.py: testAll()  # test the functions in this file")
+	for n in (3, 5, 7, 9, 11):
+		print( f"  smoothKernel({n}) = (" + " ".join([f"{x:.4f}" for x in smoothKernel(n)]) + ")" )
+	print( f"  gaussianKernel(7, 1.5) = (" + " ".join([f"{x:.4f}" for x in gaussianKernel(7, 1.5)]) + ")" )
+	print( f"  smoothKernel(9) is cached: {smoothKernel(9) is smoothKernel(9)}" )
+	A = np.zeros((64, 64), dtype=np.uint8)
+	A[16:48, 16:48] = 200
+	E1 = smoothSobelMagnitude(A, ksize=3, smooth=5)
+	Ex = cv2.sepFilter2D(cv2.Sobel(A, cv2.CV_32F, 1, 0, ksize=3), -1, smoothKernel(5), smoothKernel(5))
+	Ey = cv2.sepFilter2D(cv2.Sobel(A, cv2.CV_32F, 0, 1, ksize=3), -1, smoothKernel(5), smoothKernel(5))
+	E2 = cv2.magnitude(Ex, Ey)
+	print( f"  fused and two-step smooth+Sobel differ by at most {np.abs(E1-E2)[8:-8,8:-8].max():.4f}" )
+	return
+
+if __name__ == '__main__':
+	testAll()
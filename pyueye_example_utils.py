@@ -33,6 +33,7 @@
 from pyueye import ueye
 from threading import Thread
 from ctypes import byref
+import numpy as np
 
 def get_bits_per_pixel(color_mode):
 	"""
@@ -63,6 +64,37 @@ def get_bits_per_pixel(color_mode):
 	} [color_mode]
 
 
+def frame_view(array, width, height, bits, pitch):
+	"""
+	returns numpy view (height, width) or (height, width, channels) of the image in 'array',
+	1D uint8 array of height*pitch bytes as from ueye.get_data(), each row is 'pitch' bytes
+	and may be padded (pitch > width*bytes per pixel), no copy is made.
+	8, 24 and 32 bits give uint8: mono, packed RGB/BGR and RGBA/BGRA (and other 32 bit modes),
+	16, 48 and 64 bits give uint16: mono/raw 10-16 bits (or the raw 16 bit words of packed
+	modes as BGR565 and UYVY), and RGB/RGBA 12 bits unpacked.
+	"""
+	(width, height, bits, pitch) = (_value(width), _value(height), _value(bits), _value(pitch))
+	rows = array[:height*pitch].reshape(height, pitch)[:, :width*((bits + 7)//8)]
+	if bits in (16, 48, 64):
+		rows = rows.view(np.uint16)
+	channels = rows.shape[1] // width
+	return rows.reshape(height, width, channels) if (channels > 1) else rows
+
+
+def wrap_image(mem_ptr, width, height, bits, pitch, copy=False):
+	"""
+	returns numpy view (see frame_view()) of the image memory 'mem_ptr' with the given
+	width and height (the AOI), bits per pixel and pitch (from ueye.is_InquireImageMem()),
+	a copy of the memory if 'copy'
+	"""
+	array = ueye.get_data(mem_ptr, width, height, bits, pitch, copy)
+	return frame_view(array, width, height, bits, pitch)
+
+
+def _value(v):
+	return int(v.value) if hasattr(v, 'value') else int(v)
+
+
 class uEyeException(Exception):
 	def __init__(self, error_code):
 		self.error_code = error_code
@@ -101,9 +133,18 @@ class MemoryInfo:
 
 
 class ImageData:
-	def __init__(self, h_cam, img_buff):
+	""" The image in a (locked) image memory. With copy=False 'array' is a view of the
+	memory, no copy, and it is valid only until unlock(), then it is set to None.
+	Use it as a context manager to unlock the memory at the end of the block:
+		with ImageData(cam.handle(), img_buff, copy=False) as image_data:
+			if not image_data.is_blank():
+				img = image_data.as_1d_image().copy()
+	"""
+	def __init__(self, h_cam, img_buff, copy=True):
 		self.h_cam = h_cam
 		self.img_buff = img_buff
+		self.copy = copy
+		self.locked = True
 		self.mem_info = MemoryInfo(h_cam, img_buff)
 		self.color_mode = ueye.is_SetColorMode(h_cam, ueye.IS_GET_COLOR_MODE)
 		self.bits_per_pixel = get_bits_per_pixel(self.color_mode)
@@ -112,21 +153,35 @@ class ImageData:
 								   self.mem_info.height,
 								   self.mem_info.bits,
 								   self.mem_info.pitch,
-								   True)
+								   copy)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, _type, value, traceback):
+		self.unlock()
+
 	def __str__(self):
 		m = self.mem_info
 		return 'ImageData object: w = %i, h = %i, bits = %i, pitch = %i' % (m.width, m.height, m.bits, m.pitch)
 		
 	def as_1d_image(self):  # or as_cv_image() ??
-		channels = int((7 + self.bits_per_pixel) / 8)
-		import numpy
-		if channels > 1:
-			return numpy.reshape(self.array, (self.mem_info.height, self.mem_info.width, channels))
-		else:
-			return numpy.reshape(self.array, (self.mem_info.height, self.mem_info.width))
+		""" numpy view (height, width, channels), or (height, width) for mono, rows may be padded """
+		m = self.mem_info
+		return frame_view(self.array, m.width, m.height, m.bits, m.pitch)
 		
+	def is_blank(self, step=16):
+		""" True if all pixels are equal (ex. all black), tested for every 'step' row and column only """
+		image = self.as_1d_image()[::step, ::step]
+		return bool(image.min() == image.max())
+
 	def unlock(self):
-		check(ueye.is_UnlockSeqBuf(self.h_cam, self.img_buff.mem_id, self.img_buff.mem_ptr))
+		""" Unlock the image memory (once), a view (copy=False) is not valid after this """
+		if self.locked:
+			self.locked = False
+			if not self.copy:
+				self.array = None
+			check(ueye.is_UnlockSeqBuf(self.h_cam, self.img_buff.mem_id, self.img_buff.mem_ptr))
 
 class Rect:
 	def __init__(self, x=0, y=0, width=0, height=0):
@@ -162,7 +217,7 @@ class FrameThread(Thread):
 										   img_buffer.mem_ptr,
 										   img_buffer.mem_id)
 			if ret == ueye.IS_SUCCESS:
-				self.notify( ImageData(self.cam.handle(), img_buffer) )
+				self.notify( ImageData(self.cam.handle(), img_buffer, self.copy) )
 
 			#break
 